@@ -26,6 +26,13 @@ class Settings(BaseSettings):
     # Payload CMS Configuration
     payload_api_url: str = "http://localhost:3001/api"
     payload_api_secret: str = ""
+    payload_http2: bool = False  # Requires the h2 package (httpx[http2])
+    payload_max_connections: int = 20
+    payload_max_keepalive_connections: int = 10
+    payload_keepalive_expiry: float = 30.0
+    payload_fetch_concurrency: int = 4  # Pages fetched in parallel per collection
+    payload_fetch_profiles: bool = True  # Fetch only mapped fields (select/depth/populate)
+    payload_stream_buffer: int = 16  # Parsed documents buffered per prefetched page (uses ijson if installed)
     
     # Database Configuration
     database_url: Optional[str] = None
@@ -37,9 +44,54 @@ class Settings(BaseSettings):
     batch_size: int = 50
     max_retries: int = 3
     
+    # Ingest Concurrency (shared by all collections and globals in a sync)
+    ingest_source_concurrency: int = 4  # Collections/globals processed at once
+    ingest_process_concurrency: int = 2  # Threads chunking documents
+    ingest_embed_concurrency: int = 2  # Batches being embedded and upserted
+    ingest_document_batch: int = 10  # Streamed documents handed to processing at once
+    
+    # Embedding Backend Concurrency (adaptive: grows while latency holds, halves on errors)
+    embed_min_concurrency: int = 1
+    embed_max_concurrency: int = 8
+    embed_initial_concurrency: int = 2
+    embed_search_reserved: int = 1  # Requests always available to search queries
+    embed_latency_tolerance: float = 2.0  # Latency above this multiple of the baseline shrinks the limit
+    embed_timeout: float = 60.0  # Seconds per embedding request
+    
+    # Ingest Job Queue (persisted in the state database)
+    ingest_mode: str = "inline"  # "inline" (API runs jobs), "subprocess" (API starts ingest_worker.py) or "api" (run it yourself)
+    job_poll_interval: float = 1.0  # Seconds between queue checks for jobs queued by another process
+    job_progress_interval: float = 2.0  # Seconds between progress snapshots saved for the jobs API
+    job_workers: int = 1  # Workers taking any job, webhook jobs first
+    job_realtime_workers: int = 1  # Extra workers reserved for webhook jobs
+    job_retry_base_delay: float = 5.0  # Seconds, doubled per attempt (attempts = MAX_RETRIES + 1)
+    job_retry_max_delay: float = 300.0
+    job_retention_days: int = 7  # Finished jobs are pruned at startup after this
+    
+    # Scheduled Sync (seconds between runs, 0 disables)
+    delta_sync_interval: int = 0
+    reconcile_interval: int = 0
+    
+    # Orphan Cleanup (vectors of documents that no longer exist in the CMS)
+    orphan_gc_batch_size: int = 100  # Documents deleted per request
+    orphan_gc_max_deletes: int = 500  # More orphans than this aborts the cleanup
+    orphan_gc_max_fraction: float = 0.2  # ...as does more than this share of the indexed documents
+    
+    # Table Chunking Configuration (see TABLE_CHUNKING)
+    table_window_max_tokens: int = 400
+    table_row_mode_max_rows: int = 8
+    
+    # Near-Duplicate Detection ("off", "skip" or "alias")
+    near_duplicate_mode: str = "alias"
+    near_duplicate_threshold: float = 0.9
+    minhash_num_perm: int = 64
+    minhash_bands: int = 16
+    
     # Webhook Configuration
     webhook_secret: Optional[str] = None
     webhook_timeout: int = 30
+    webhook_inline_max_bytes: int = 8 * 1024 * 1024  # Cap on a decoded inline document
+    webhook_quiet_window: float = 2.0  # Seconds a webhook job waits for further saves of the same source
     
     # Logging Configuration
     log_level: str = "INFO"
@@ -48,6 +100,15 @@ class Settings(BaseSettings):
     # Cache Configuration
     redis_url: Optional[str] = None
     cache_ttl: int = 3600
+    search_cache_size: int = 1000  # Cached /search results kept in memory (0 disables the cache)
+    search_cache_max_bytes: int = 64 * 1024 * 1024  # Approximate JSON size of all cached results
+    search_cache_persist: bool = False  # Also keep results in a local SQLite file across restarts
+    search_cache_db_path: str = "data/search_cache.db"
+    search_cache_persist_size: int = 10000
+    
+    # Local State Configuration (SQLite file for metadata and ingest state)
+    state_db_path: str = "data/vector_state.db"
+    metadata_cache_size: int = 2048
     
     # Environment
     environment: str = "development"
@@ -76,90 +137,118 @@ class Settings(BaseSettings):
 settings = Settings()
 
 # Content type mappings
+# "content_fields" are the top-level CMS fields the processor reads; together with
+# "fetch_depth" and "relations" they define the fetch profile (Payload select/depth/
+# populate) so bulk fetches only transfer what gets indexed. "relations" maps a
+# relationship/upload field name to the related collection and the fields kept from it.
 COLLECTION_MAPPINGS = {
     "announcements": {
         "category": "administrative",
         "priority": "high",
         "audience": ["all_students", "faculty"],
-        "content_fields": ["title", "content", "excerpt"]
+        "content_fields": ["title", "content", "priority"]
     },
     "blog-posts": {
         "category": "academic",
         "priority": "medium",
         "audience": ["current_students", "prospective_students"],
-        "content_fields": ["title", "content", "excerpt", "meta"]
+        "content_fields": ["title", "slug", "excerpt", "content"]
     },
     "testimonials": {
         "category": "social_proof",
         "priority": "medium",
         "audience": ["prospective_students", "parents"],
-        "content_fields": ["name", "testimonial", "position", "company"]
+        "content_fields": ["quote", "authorName", "authorTitle"]
     },
     "coe": {
         "category": "academic",
         "priority": "high",
         "audience": ["current_students", "faculty"],
-        "content_fields": ["title", "description", "objectives", "activities"]
+        "content_fields": ["title", "description"]
     },
     "departments": {
         "category": "academic",
         "priority": "high",
         "audience": ["prospective_students", "current_students"],
-        "content_fields": ["name", "description", "vision", "mission"]
+        "content_fields": ["name", "code", "slug", "shortName", "description"]
     },
     "department-sections": {
         "category": "academic",
         "priority": "high",
         "audience": ["prospective_students", "current_students"],
-        "content_fields": ["dynamicSections"]
+        "content_fields": ["department", "title", "dynamicSections"],
+        "fetch_depth": 1,
+        "relations": {
+            "department": {"collection": "departments", "fields": ["name"]},
+            "image": {"collection": "media", "fields": ["alt"]}
+        }
     },
     "dynamic-pages": {
         "category": "general",
         "priority": "medium",
         "audience": ["all"],
-        "content_fields": ["title", "content", "sections"]
+        "content_fields": ["pageTitle", "slug", "category", "heroTitle", "heroSubtitle", "sections"]
     }
 }
 
+# Every global page shares the same shape (see the CMS createGlobalPageConfig)
+_GLOBAL_PAGE_FIELDS = ["heroTitle", "heroSubtitle", "sections"]
+
 GLOBAL_MAPPINGS = {
     "about": {
         "category": "institutional",
         "priority": "high",
         "audience": ["prospective_students", "parents"],
-        "content_fields": ["content", "vision", "mission", "history"]
+        "content_fields": _GLOBAL_PAGE_FIELDS,
+        "fetch_depth": 1,
+        "relations": {
+            "image": {"collection": "media", "fields": ["alt", "filename", "url"]}
+        }
     },
     "admissions": {
         "category": "admission",
         "priority": "high",
         "audience": ["prospective_students", "parents"],
-        "content_fields": ["eligibilityCriteria", "applicationProcess", "fees"]
+        "content_fields": _GLOBAL_PAGE_FIELDS
     },
     "research": {
         "category": "academic",
         "priority": "medium",
         "audience": ["faculty", "research_scholars"],
-        "content_fields": ["researchAreas", "publications", "projects"]
+        "content_fields": _GLOBAL_PAGE_FIELDS
     },
     "placement": {
         "category": "placement",
         "priority": "high",
         "audience": ["current_students", "alumni"],
-        "content_fields": ["companies", "statistics", "process"]
+        "content_fields": _GLOBAL_PAGE_FIELDS
     },
     "academics": {
         "category": "academic",
         "priority": "high",
         "audience": ["current_students", "prospective_students"],
-        "content_fields": ["programs", "curriculum", "regulations"]
+        "content_fields": _GLOBAL_PAGE_FIELDS
     },
     "facilities": {
         "category": "facility",
         "priority": "medium",
         "audience": ["current_students", "prospective_students"],
-        "content_fields": ["infrastructure", "amenities", "services"]
+        "content_fields": _GLOBAL_PAGE_FIELDS
     }
 }
 
+# Table chunking per table type (from ContentProcessor._classify_table_type).
+# "window" groups consecutive rows into token-budgeted chunks with the header
+# context repeated once per window; "row" embeds every row separately.
+# Tables with at most settings.table_row_mode_max_rows rows always use "row".
+TABLE_CHUNKING = {
+    "faculty_list": {"mode": "window"},
+    "course_curriculum": {"mode": "window", "max_tokens": 500},
+    "lab_equipment": {"mode": "window"},
+    "placement_stats": {"mode": "window"},
+    "general_table": {"mode": "window"}
+}
+
 # Department mappings
 DEPARTMENT_KEYWORDS = {
     "CSE": ["computer", "software", "programming", "AI", "ML", "data science", "algorithms"],
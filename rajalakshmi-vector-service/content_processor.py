@@ -7,84 +7,96 @@ import re
 import uuid
 import logging
 from datetime import datetime
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Iterator, Optional, Tuple
 from dataclasses import dataclass
-from bs4 import BeautifulSoup
-import html2text
-from markdownify import markdownify
 
-from config import settings, COLLECTION_MAPPINGS, GLOBAL_MAPPINGS, DEPARTMENT_KEYWORDS
-
-from config import settings, COLLECTION_MAPPINGS, GLOBAL_MAPPINGS, DEPARTMENT_KEYWORDS
+from config import settings, COLLECTION_MAPPINGS, GLOBAL_MAPPINGS, DEPARTMENT_KEYWORDS, TABLE_CHUNKING
 
 
 logger = logging.getLogger(__name__)
 
+# Metadata fields kept on every point so Qdrant filters keep working.
+# Everything else in the shared metadata is stored once per metadata_ref.
+INDEXED_METADATA_FIELDS = ("content_type", "department", "category")
+
+# Bump whenever chunking or metadata extraction changes so stored
+# source fingerprints no longer match and documents are reprocessed.
+PROCESSOR_VERSION = "3"
+
 
-@dataclass
+@dataclass(slots=True)
 class ContentChunk:
-    """Represents a processed content chunk ready for embedding"""
+    """Represents a processed content chunk ready for embedding (slotted, no per-instance __dict__)"""
     chunk_id: str
     content: str
-    metadata: Dict[str, Any]
+    metadata: Dict[str, Any]  # Chunk-specific fields plus the indexed fields
     source_id: str
     source_type: str  # 'collection' or 'global'
     content_type: str
     chunk_index: int
     total_chunks: int
+    document_key: str = ""
+    metadata_ref: Optional[str] = None  # Key of the shared metadata in the metadata store
+    shared_metadata: Optional[Dict[str, Any]] = None  # Shared by reference between chunks
+    canonical_id: Optional[str] = None  # Set when the chunk aliases a near-duplicate point
 
 
 class ContentProcessor:
     """Main content processor for Payload CMS data"""
     
     def __init__(self):
-        self.html_converter = html2text.HTML2Text()
-        self.html_converter.ignore_links = False
-        self.html_converter.ignore_images = True
-        self.html_converter.ignore_emphasis = False
-        
-    def process_webhook_payload(self, payload: Dict[str, Any]) -> List[ContentChunk]:
+        self._html_converter = None
+    
+    @property
+    def html_converter(self):
+        """HTML to markdown converter, built (and html2text imported) on first use"""
+        if self._html_converter is None:
+            import html2text
+            self._html_converter = html2text.HTML2Text()
+            self._html_converter.ignore_links = False
+            self._html_converter.ignore_images = True
+            self._html_converter.ignore_emphasis = False
+        return self._html_converter
+        
+    def iter_webhook_payload(self, payload: Dict[str, Any]) -> Iterator[ContentChunk]:
         """
-        Process incoming webhook payload and return content chunks
+        Process incoming webhook payload and yield content chunks incrementally
         
         Args:
             payload: Webhook payload from Payload CMS
             
-        Returns:
-            List of processed content chunks
+        Yields:
+            Processed content chunks, one at a time
+        
+        Errors raised while processing propagate to the consumer, so a
+        document that fails part-way is not recorded as stored.
         """
-        try:
-            # Determine if it's a collection or global
-            is_collection = 'collection' in payload
-            is_global = 'global' in payload
-            content_type = payload.get('collection') or payload.get('global')
-            data = payload.get('data', {})
-            
-            logger.info(f"Processing {content_type} content for {payload.get('operation', 'unknown')} operation")
-            logger.info(f"Payload keys: {list(payload.keys())}")
-            logger.info(f"Is collection: {is_collection}, Is global: {is_global}")
-            logger.info(f"Content type: {content_type}")
-            
-            if not content_type:
-                logger.error("No content type found in payload")
-                return []
-            
-            # Process based on content type
-            if is_collection:
-                logger.info(f"Processing as collection: {content_type}")
-                return self._process_collection_content(content_type, data)
-            elif is_global:
-                logger.info(f"Processing as global: {content_type}")
-                return self._process_global_content(content_type, data)
-            else:
-                logger.error("Could not determine if payload is collection or global")
-                return []
-                
-        except Exception as e:
-            logger.error(f"Error processing webhook payload: {str(e)}")
-            return []
+        # Determine if it's a collection or global
+        is_collection = 'collection' in payload
+        is_global = 'global' in payload
+        content_type = payload.get('collection') or payload.get('global')
+        data = payload.get('data', {})
+        
+        logger.info(f"Processing {content_type} content for {payload.get('operation', 'unknown')} operation")
+        logger.info(f"Payload keys: {list(payload.keys())}")
+        logger.info(f"Is collection: {is_collection}, Is global: {is_global}")
+        logger.info(f"Content type: {content_type}")
+        
+        if not content_type:
+            logger.error("No content type found in payload")
+            return
+        
+        # Process based on content type
+        if is_collection:
+            logger.info(f"Processing as collection: {content_type}")
+            yield from self._process_collection_content(content_type, data)
+        elif is_global:
+            logger.info(f"Processing as global: {content_type}")
+            yield from self._process_global_content(content_type, data)
+        else:
+            logger.error("Could not determine if payload is collection or global")
     
-    def _process_collection_content(self, collection_type: str, data: Dict[str, Any]) -> List[ContentChunk]:
+    def _process_collection_content(self, collection_type: str, data: Dict[str, Any]) -> Iterator[ContentChunk]:
         """Process collection-based content"""
         
         if collection_type == "announcements":
@@ -105,7 +117,7 @@ class ContentProcessor:
             logger.warning(f"Unknown collection type: {collection_type}")
             return self._process_generic_content(collection_type, data, "collection")
     
-    def _process_global_content(self, global_type: str, data: Dict[str, Any]) -> List[ContentChunk]:
+    def _process_global_content(self, global_type: str, data: Dict[str, Any]) -> Iterator[ContentChunk]:
         """Process global-based content"""
         
         if global_type == "admissions":
@@ -124,10 +136,22 @@ class ContentProcessor:
             logger.warning(f"Unknown global type: {global_type}")
             return self._process_generic_content(global_type, data, "global")
     
-    def _process_announcement(self, data: Dict[str, Any]) -> List[ContentChunk]:
+    def document_key(self, source_type: str, content_type: str, doc_id: Optional[str] = None) -> str:
+        """Build the key identifying a source document (globals have no document ID)"""
+        if source_type == "collection" and doc_id:
+            return f"{source_type}:{content_type}:{doc_id}"
+        return f"{source_type}:{content_type}"
+    
+    def _chunk_metadata(self, shared_metadata: Dict[str, Any], chunk_fields: Dict[str, Any]) -> Dict[str, Any]:
+        """Build per-chunk metadata: indexed fields from the shared metadata plus chunk-specific fields"""
+        chunk_metadata = {
+            key: shared_metadata[key] for key in INDEXED_METADATA_FIELDS if key in shared_metadata
+        }
+        chunk_metadata.update(chunk_fields)
+        return chunk_metadata
+    
+    def _process_announcement(self, data: Dict[str, Any]) -> Iterator[ContentChunk]:
         """Process announcement content"""
-        chunks = []
-        
         # Extract main content
         title = data.get('title', '')
         content = data.get('content', '')
@@ -156,17 +180,18 @@ class ContentProcessor:
             "search_boost": 1.2
         }
         
+        document_key = self.document_key("collection", "announcements", data.get('id'))
+        
         # Create chunks
         content_chunks = self._chunk_text(full_content)
         for i, chunk_content in enumerate(content_chunks):
-            chunk_metadata = metadata.copy()
-            chunk_metadata.update({
+            chunk_metadata = self._chunk_metadata(metadata, {
                 "chunk_index": i,
                 "total_chunks": len(content_chunks),
                 "content_length": len(chunk_content)
             })
             
-            chunks.append(ContentChunk(
+            yield ContentChunk(
                 chunk_id=str(uuid.uuid4()),
                 content=chunk_content,
                 metadata=chunk_metadata,
@@ -174,19 +199,19 @@ class ContentProcessor:
                 source_type="collection",
                 content_type="announcements",
                 chunk_index=i,
-                total_chunks=len(content_chunks)
-            ))
-        
-        return chunks
+                total_chunks=len(content_chunks),
+                document_key=document_key,
+                metadata_ref=document_key,
+                shared_metadata=metadata
+            )
     
-    def _process_department_section(self, data: Dict[str, Any]) -> List[ContentChunk]:
+    def _process_department_section(self, data: Dict[str, Any]) -> Iterator[ContentChunk]:
         """Process department section with dynamic content"""
-        chunks = []
-        
         # Extract department information
         department_data = data.get('department', {})
         department_name = department_data.get('name', 'General') if isinstance(department_data, dict) else str(department_data)
         section_title = data.get('title', 'Department Section')
+        document_key = self.document_key("collection", "department-sections", data.get('id'))
         
         # Process dynamic sections
         dynamic_sections = data.get('dynamicSections', [])
@@ -195,7 +220,7 @@ class ContentProcessor:
             section_type = section.get('contentType', 'unknown')
             
             if section_type == 'richText':
-                chunks.extend(self._process_rich_text_section(section, department_name, section_title, section_idx))
+                yield from self._process_rich_text_section(section, department_name, section_title, section_idx, document_key)
                 
                 # ENHANCED: Extract links from rich text sections
                 if 'content' in section:
@@ -207,28 +232,26 @@ class ContentProcessor:
                                 section_links, 
                                 f"dept-section-{section_idx}", 
                                 "collection", 
-                                "department-sections"
+                                "department-sections",
+                                document_key
                             )
-                            chunks.extend(link_chunks)
+                            yield from link_chunks
                             
             elif section_type == 'table':
-                chunks.extend(self._process_table_section(section, department_name, section_title, section_idx))
+                yield from self._process_table_section(section, department_name, section_title, section_idx, document_key)
             elif section_type == 'dynamicTable':
-                chunks.extend(self._process_dynamic_table_section(section, department_name, section_title, section_idx))
+                yield from self._process_dynamic_table_section(section, department_name, section_title, section_idx, document_key)
             elif section_type == 'multipleTables':
-                chunks.extend(self._process_multiple_tables_section(section, department_name, section_title, section_idx))
+                yield from self._process_multiple_tables_section(section, department_name, section_title, section_idx, document_key)
             else:
                 # Generic section processing
                 content = str(section.get('content', ''))
                 if content:
-                    chunks.extend(self._create_section_chunks(content, department_name, section_title, section_type, section_idx))
-        
-        return chunks
+                    yield from self._create_section_chunks(content, department_name, section_title, section_type, section_idx, document_key)
     
-    def _process_rich_text_section(self, section: Dict[str, Any], department: str, section_title: str, section_idx: int) -> List[ContentChunk]:
+    def _process_rich_text_section(self, section: Dict[str, Any], department: str, section_title: str, section_idx: int,
+                                   document_key: str = "") -> Iterator[ContentChunk]:
         """Process rich text content section"""
-        chunks = []
-        
         content = section.get('content', '')
         clean_content = self._clean_html_content(content)
         
@@ -252,18 +275,19 @@ class ContentProcessor:
             "search_boost": 1.0
         }
         
+        metadata_ref = f"{document_key}#section-{section_idx}"
+        
         # Create chunks
         content_chunks = self._chunk_text(contextual_content)
         for i, chunk_content in enumerate(content_chunks):
-            chunk_metadata = base_metadata.copy()
-            chunk_metadata.update({
+            chunk_metadata = self._chunk_metadata(base_metadata, {
                 "chunk_index": i,
                 "total_chunks": len(content_chunks),
                 "content_length": len(chunk_content),
                 "section_index": section_idx
             })
             
-            chunks.append(ContentChunk(
+            yield ContentChunk(
                 chunk_id=str(uuid.uuid4()),
                 content=chunk_content,
                 metadata=chunk_metadata,
@@ -271,15 +295,15 @@ class ContentProcessor:
                 source_type="collection",
                 content_type="department-sections",
                 chunk_index=i,
-                total_chunks=len(content_chunks)
-            ))
-        
-        return chunks
+                total_chunks=len(content_chunks),
+                document_key=document_key,
+                metadata_ref=metadata_ref,
+                shared_metadata=base_metadata
+            )
     
-    def _process_table_section(self, section: Dict[str, Any], department: str, section_title: str, section_idx: int) -> List[ContentChunk]:
+    def _process_table_section(self, section: Dict[str, Any], department: str, section_title: str, section_idx: int,
+                               document_key: str = "") -> Iterator[ContentChunk]:
         """Process table content section"""
-        chunks = []
-        
         table_config = section.get('tableConfig', {})
         table_title = section.get('title', 'Table')
         
@@ -290,54 +314,13 @@ class ContentProcessor:
         # Create table summary
         table_summary = f"Table: {table_title}\nColumns: {', '.join(headers)}\nTotal rows: {len(rows)}"
         
-        # Process individual rows
-        for row_idx, row in enumerate(rows):
-            row_content = []
-            for col_idx, cell in enumerate(row):
-                if col_idx < len(headers):
-                    row_content.append(f"{headers[col_idx]}: {cell}")
-            
-            row_text = f"Department: {department}. Table: {table_title}. Row {row_idx + 1}: {'; '.join(row_content)}"
-            
-            # Create metadata for row
-            row_metadata = {
-                "source_type": "collection",
-                "source_collection": "department-sections",
-                "document_title": section_title,
-                "section_title": table_title,
-                "content_type": "table",
-                "table_type": self._classify_table_type(table_title, headers),
-                "department": department,
-                "category": "academic",
-                "section_type": "tabular_data",
-                "table_headers": headers,
-                "row_index": row_idx,
-                "total_rows": len(rows),
-                "language": "en",
-                "last_updated": datetime.now().isoformat(),
-                "is_active": True,
-                "searchable_keywords": self._extract_keywords(row_text),
-                "search_boost": 0.9
-            }
-            
-            chunks.append(ContentChunk(
-                chunk_id=str(uuid.uuid4()),
-                content=row_text,
-                metadata=row_metadata,
-                source_id=f"table-{section_idx}-row-{row_idx}",
-                source_type="collection",
-                content_type="department-sections",
-                chunk_index=row_idx,
-                total_chunks=len(rows)
-            ))
-        
-        # Add table summary chunk
-        summary_metadata = {
+        # Table-level metadata, stored once and shared by every row
+        table_metadata = {
             "source_type": "collection",
             "source_collection": "department-sections",
             "document_title": section_title,
             "section_title": table_title,
-            "content_type": "table_summary",
+            "content_type": "table",
             "table_type": self._classify_table_type(table_title, headers),
             "department": department,
             "category": "academic",
@@ -346,12 +329,59 @@ class ContentProcessor:
             "total_rows": len(rows),
             "language": "en",
             "last_updated": datetime.now().isoformat(),
-            "is_active": True,
+            "is_active": True
+        }
+        metadata_ref = f"{document_key}#table-{section_idx}"
+        
+        # Group rows into token-budgeted windows for larger tables, otherwise embed each row
+        if self._use_row_windows(table_metadata["table_type"], len(rows)):
+            row_lines = []
+            for row_idx, row in enumerate(rows):
+                row_content = [f"{headers[col_idx]}: {cell}" for col_idx, cell in enumerate(row) if col_idx < len(headers)]
+                row_lines.append((row_idx, f"Row {row_idx + 1}: {'; '.join(row_content)}"))
+            
+            yield from self._create_table_window_chunks(
+                row_lines, department, table_title, headers, table_metadata, metadata_ref,
+                f"table-{section_idx}", "table_rows", document_key
+            )
+        else:
+            for row_idx, row in enumerate(rows):
+                row_content = []
+                for col_idx, cell in enumerate(row):
+                    if col_idx < len(headers):
+                        row_content.append(f"{headers[col_idx]}: {cell}")
+                
+                row_text = f"Department: {department}. Table: {table_title}. Row {row_idx + 1}: {'; '.join(row_content)}"
+                
+                # Create metadata for row
+                row_metadata = self._chunk_metadata(table_metadata, {
+                    "row_index": row_idx,
+                    "searchable_keywords": self._extract_keywords(row_text),
+                    "search_boost": 0.9
+                })
+                
+                yield ContentChunk(
+                    chunk_id=str(uuid.uuid4()),
+                    content=row_text,
+                    metadata=row_metadata,
+                    source_id=f"table-{section_idx}-row-{row_idx}",
+                    source_type="collection",
+                    content_type="department-sections",
+                    chunk_index=row_idx,
+                    total_chunks=len(rows),
+                    document_key=document_key,
+                    metadata_ref=metadata_ref,
+                    shared_metadata=table_metadata
+                )
+        
+        # Add table summary chunk
+        summary_metadata = self._chunk_metadata(table_metadata, {
+            "content_type": "table_summary",
             "searchable_keywords": self._extract_keywords(table_summary),
             "search_boost": 1.1
-        }
+        })
         
-        chunks.append(ContentChunk(
+        yield ContentChunk(
             chunk_id=str(uuid.uuid4()),
             content=f"Department: {department}. {table_summary}",
             metadata=summary_metadata,
@@ -359,15 +389,14 @@ class ContentProcessor:
             source_type="collection",
             content_type="department-sections",
             chunk_index=0,
-            total_chunks=1
-        ))
-        
-        return chunks
+            total_chunks=1,
+            document_key=document_key,
+            metadata_ref=metadata_ref,
+            shared_metadata=table_metadata
+        )
     
-    def _process_generic_content(self, content_type: str, data: Dict[str, Any], source_type: str) -> List[ContentChunk]:
+    def _process_generic_content(self, content_type: str, data: Dict[str, Any], source_type: str) -> Iterator[ContentChunk]:
         """Generic content processing for unknown types"""
-        chunks = []
-        
         # Extract text content from all fields
         text_content = []
         for key, value in data.items():
@@ -378,7 +407,7 @@ class ContentProcessor:
                     text_content.append(f"{key}: {value}")
         
         if not text_content:
-            return chunks
+            return
         
         full_content = "\n".join(text_content)
         clean_content = self._clean_html_content(full_content)
@@ -398,17 +427,18 @@ class ContentProcessor:
             "search_boost": 0.8
         }
         
+        document_key = self.document_key(source_type, content_type, data.get('id'))
+        
         # Create chunks
         content_chunks = self._chunk_text(clean_content)
         for i, chunk_content in enumerate(content_chunks):
-            chunk_metadata = metadata.copy()
-            chunk_metadata.update({
+            chunk_metadata = self._chunk_metadata(metadata, {
                 "chunk_index": i,
                 "total_chunks": len(content_chunks),
                 "content_length": len(chunk_content)
             })
             
-            chunks.append(ContentChunk(
+            yield ContentChunk(
                 chunk_id=str(uuid.uuid4()),
                 content=chunk_content,
                 metadata=chunk_metadata,
@@ -416,10 +446,11 @@ class ContentProcessor:
                 source_type=source_type,
                 content_type=content_type,
                 chunk_index=i,
-                total_chunks=len(content_chunks)
-            ))
-        
-        return chunks
+                total_chunks=len(content_chunks),
+                document_key=document_key,
+                metadata_ref=document_key,
+                shared_metadata=metadata
+            )
     
     def _chunk_text(self, text: str, chunk_size: int = None, overlap: int = None) -> List[str]:
         """Split text into overlapping chunks"""
@@ -466,7 +497,8 @@ class ContentProcessor:
         
         # Convert HTML to markdown first, then to plain text
         try:
-            # Use BeautifulSoup to clean HTML
+            # Use BeautifulSoup to clean HTML (imported on first use, so search-only processes never load it)
+            from bs4 import BeautifulSoup
             soup = BeautifulSoup(content, 'html.parser')
             
             # Remove script and style elements
@@ -651,6 +683,70 @@ class ContentProcessor:
         else:
             return "general_table"
     
+    def _use_row_windows(self, table_type: str, row_count: int) -> bool:
+        """Whether a table should be chunked into row windows instead of one chunk per row"""
+        if row_count <= settings.table_row_mode_max_rows:
+            return False
+        return TABLE_CHUNKING.get(table_type, {}).get("mode", "row") == "window"
+    
+    def _estimate_tokens(self, text: str) -> int:
+        """Rough token estimate (about four characters per token)"""
+        return max(1, len(text) // 4)
+    
+    def _create_table_window_chunks(self, row_lines: List[Tuple[int, str]], department: str, table_title: str,
+                                    headers: List[str], table_metadata: Dict[str, Any], metadata_ref: str,
+                                    source_prefix: str, content_type: str, document_key: str,
+                                    chunk_index_offset: int = 0) -> Iterator[ContentChunk]:
+        """Group consecutive rows into token-budgeted windows, repeating the header context once per window"""
+        table_type = table_metadata.get("table_type", "general_table")
+        max_tokens = TABLE_CHUNKING.get(table_type, {}).get("max_tokens", settings.table_window_max_tokens)
+        header_context = f"Department: {department}. Table: {table_title}. Columns: {', '.join(headers)}."
+        header_tokens = self._estimate_tokens(header_context)
+        
+        windows = []
+        current = []
+        current_tokens = header_tokens
+        for row_idx, row_line in row_lines:
+            row_tokens = self._estimate_tokens(row_line)
+            if current and current_tokens + row_tokens > max_tokens:
+                windows.append(current)
+                current = []
+                current_tokens = header_tokens
+            current.append((row_idx, row_line))
+            current_tokens += row_tokens
+        if current:
+            windows.append(current)
+        
+        logger.debug(f"Table '{table_title}' ({table_type}): {len(row_lines)} rows -> {len(windows)} windows")
+        
+        for window_idx, window in enumerate(windows):
+            window_text = header_context + "\n" + "\n".join(row_line for _, row_line in window)
+            row_start = window[0][0]
+            row_end = window[-1][0]
+            
+            window_metadata = self._chunk_metadata(table_metadata, {
+                "content_type": content_type,
+                "row_start": row_start,
+                "row_end": row_end,
+                "row_count": len(window),
+                "searchable_keywords": self._extract_keywords(window_text),
+                "search_boost": 0.9
+            })
+            
+            yield ContentChunk(
+                chunk_id=str(uuid.uuid4()),
+                content=window_text,
+                metadata=window_metadata,
+                source_id=f"{source_prefix}-rows-{row_start}-{row_end}",
+                source_type="collection",
+                content_type="department-sections",
+                chunk_index=window_idx + chunk_index_offset,
+                total_chunks=len(windows) + chunk_index_offset,
+                document_key=document_key,
+                metadata_ref=metadata_ref,
+                shared_metadata=table_metadata
+            )
+    
     def _detect_department(self, content: str) -> Optional[str]:
         """Detect department from content"""
         content_lower = content.lower()
@@ -662,10 +758,8 @@ class ContentProcessor:
         return None
     
     def _create_section_chunks(self, content: str, department: str, section_title: str, 
-                             content_type: str, section_idx: int) -> List[ContentChunk]:
+                             content_type: str, section_idx: int, document_key: str = "") -> Iterator[ContentChunk]:
         """Create chunks for generic section content"""
-        chunks = []
-        
         clean_content = self._clean_html_content(content)
         contextual_content = f"Department: {department}. Section: {section_title}. Content: {clean_content}"
         
@@ -684,18 +778,19 @@ class ContentProcessor:
             "search_boost": 0.9
         }
         
+        metadata_ref = f"{document_key}#section-{section_idx}"
+        
         # Create chunks
         content_chunks = self._chunk_text(contextual_content)
         for i, chunk_content in enumerate(content_chunks):
-            chunk_metadata = base_metadata.copy()
-            chunk_metadata.update({
+            chunk_metadata = self._chunk_metadata(base_metadata, {
                 "chunk_index": i,
                 "total_chunks": len(content_chunks),
                 "content_length": len(chunk_content),
                 "section_index": section_idx
             })
             
-            chunks.append(ContentChunk(
+            yield ContentChunk(
                 chunk_id=str(uuid.uuid4()),
                 content=chunk_content,
                 metadata=chunk_metadata,
@@ -703,40 +798,39 @@ class ContentProcessor:
                 source_type="collection",
                 content_type="department-sections",
                 chunk_index=i,
-                total_chunks=len(content_chunks)
-            ))
-        
-        return chunks
+                total_chunks=len(content_chunks),
+                document_key=document_key,
+                metadata_ref=metadata_ref,
+                shared_metadata=base_metadata
+            )
     
     # Placeholder methods for other content types
-    def _process_blog_post(self, data: Dict[str, Any]) -> List[ContentChunk]:
+    def _process_blog_post(self, data: Dict[str, Any]) -> Iterator[ContentChunk]:
         """Process blog post content"""
         return self._process_generic_content("blog-posts", data, "collection")
     
-    def _process_testimonial(self, data: Dict[str, Any]) -> List[ContentChunk]:
+    def _process_testimonial(self, data: Dict[str, Any]) -> Iterator[ContentChunk]:
         """Process testimonial content"""
         return self._process_generic_content("testimonials", data, "collection")
     
-    def _process_department(self, data: Dict[str, Any]) -> List[ContentChunk]:
+    def _process_department(self, data: Dict[str, Any]) -> Iterator[ContentChunk]:
         """Process department content"""
         return self._process_generic_content("departments", data, "collection")
     
-    def _process_coe(self, data: Dict[str, Any]) -> List[ContentChunk]:
+    def _process_coe(self, data: Dict[str, Any]) -> Iterator[ContentChunk]:
         """Process COE content"""
         return self._process_generic_content("coe", data, "collection")
     
-    def _process_dynamic_page(self, data: Dict[str, Any]) -> List[ContentChunk]:
+    def _process_dynamic_page(self, data: Dict[str, Any]) -> Iterator[ContentChunk]:
         """Process dynamic page content"""
         return self._process_generic_content("dynamic-pages", data, "collection")
     
-    def _process_admissions(self, data: Dict[str, Any]) -> List[ContentChunk]:
+    def _process_admissions(self, data: Dict[str, Any]) -> Iterator[ContentChunk]:
         """Process admissions global content"""
         return self._process_generic_content("admissions", data, "global")
     
-    def _process_about(self, data: Dict[str, Any]) -> List[ContentChunk]:
+    def _process_about(self, data: Dict[str, Any]) -> Iterator[ContentChunk]:
         """Process about global content"""
-        chunks = []
-        
         # Extract meaningful content from about data
         content_parts = []
         
@@ -817,7 +911,8 @@ class ContentProcessor:
         
         # If no meaningful content found, fallback to generic processing
         if not content_parts:
-            return self._process_generic_content("about", data, "global")
+            yield from self._process_generic_content("about", data, "global")
+            return
         
         # Combine all content
         full_content = "\n\n".join(content_parts)
@@ -837,17 +932,18 @@ class ContentProcessor:
             "search_boost": 1.2
         }
         
+        document_key = self.document_key("global", "about")
+        
         # Create chunks
         content_chunks = self._chunk_text(full_content)
         for i, chunk_content in enumerate(content_chunks):
-            chunk_metadata = metadata.copy()
-            chunk_metadata.update({
+            chunk_metadata = self._chunk_metadata(metadata, {
                 "chunk_index": i,
                 "total_chunks": len(content_chunks),
                 "content_length": len(chunk_content)
             })
             
-            chunks.append(ContentChunk(
+            yield ContentChunk(
                 chunk_id=str(uuid.uuid4()),
                 content=chunk_content,
                 metadata=chunk_metadata,
@@ -855,8 +951,11 @@ class ContentProcessor:
                 source_type="global",
                 content_type="about",
                 chunk_index=i,
-                total_chunks=len(content_chunks)
-            ))
+                total_chunks=len(content_chunks),
+                document_key=document_key,
+                metadata_ref=document_key,
+                shared_metadata=metadata
+            )
 
         # ENHANCED: Extract and process links separately
         all_links = []
@@ -871,31 +970,28 @@ class ContentProcessor:
         
         # Create link chunks if any links were found
         if all_links:
-            link_chunks = self._create_link_chunks(all_links, "about", "global", "about")
-            chunks.extend(link_chunks)
-
-        return chunks
+            link_chunks = self._create_link_chunks(all_links, "about", "global", "about", document_key)
+            yield from link_chunks
     
-    def _process_academics(self, data: Dict[str, Any]) -> List[ContentChunk]:
+    def _process_academics(self, data: Dict[str, Any]) -> Iterator[ContentChunk]:
         """Process academics global content"""
         return self._process_generic_content("academics", data, "global")
     
-    def _process_placement(self, data: Dict[str, Any]) -> List[ContentChunk]:
+    def _process_placement(self, data: Dict[str, Any]) -> Iterator[ContentChunk]:
         """Process placement global content"""
         return self._process_generic_content("placement", data, "global")
     
-    def _process_research(self, data: Dict[str, Any]) -> List[ContentChunk]:
+    def _process_research(self, data: Dict[str, Any]) -> Iterator[ContentChunk]:
         """Process research global content"""
         return self._process_generic_content("research", data, "global")
     
-    def _process_facilities(self, data: Dict[str, Any]) -> List[ContentChunk]:
+    def _process_facilities(self, data: Dict[str, Any]) -> Iterator[ContentChunk]:
         """Process facilities global content"""
         return self._process_generic_content("facilities", data, "global")
     
-    def _process_dynamic_table_section(self, section: Dict[str, Any], department: str, section_title: str, section_idx: int) -> List[ContentChunk]:
+    def _process_dynamic_table_section(self, section: Dict[str, Any], department: str, section_title: str, section_idx: int,
+                                       document_key: str = "") -> Iterator[ContentChunk]:
         """Process dynamic table section with enhanced handling"""
-        chunks = []
-        
         # Get the dynamic table configuration
         table_config = section.get('dynamicTableConfig', {})
         table_title = section.get('title', 'Dynamic Table')
@@ -906,7 +1002,7 @@ class ContentProcessor:
         variant = table_config.get('variant', 'default')
         
         if not columns:
-            return chunks
+            return
         
         # Create table summary
         headers = [col.get('label', col.get('key', '')) for col in columns if col.get('label') or col.get('key')]
@@ -915,8 +1011,8 @@ class ContentProcessor:
         # Process table structure information
         structure_content = f"Department: {department}. Section: {section_title}. {table_summary}"
         
-        # Create metadata for table structure
-        structure_metadata = {
+        # Table-level metadata, stored once and shared by the structure and row chunks
+        table_metadata = {
             "source_type": "collection",
             "source_collection": "department-sections",
             "document_title": section_title,
@@ -931,12 +1027,17 @@ class ContentProcessor:
             "total_rows": len(rows),
             "language": "en",
             "last_updated": datetime.now().isoformat(),
-            "is_active": True,
+            "is_active": True
+        }
+        metadata_ref = f"{document_key}#dynamic-table-{section_idx}"
+        
+        # Create metadata for table structure
+        structure_metadata = self._chunk_metadata(table_metadata, {
             "searchable_keywords": self._extract_keywords(structure_content),
             "search_boost": 1.0
-        }
+        })
         
-        chunks.append(ContentChunk(
+        yield ContentChunk(
             chunk_id=str(uuid.uuid4()),
             content=structure_content,
             metadata=structure_metadata,
@@ -944,57 +1045,77 @@ class ContentProcessor:
             source_type="collection",
             content_type="department-sections",
             chunk_index=0,
-            total_chunks=1
-        ))
-        
-        # Process individual rows if they exist and have data
-        for row_idx, row in enumerate(rows):
-            row_data = row.get('rowData', [])
-            if not row_data:
-                continue
-                
-            row_content = []
-            for col_idx, cell_value in enumerate(row_data):
-                if col_idx < len(headers) and cell_value:
-                    row_content.append(f"{headers[col_idx]}: {cell_value}")
+            total_chunks=1,
+            document_key=document_key,
+            metadata_ref=metadata_ref,
+            shared_metadata=table_metadata
+        )
+        
+        # Group rows into token-budgeted windows for larger tables, otherwise embed each row
+        if self._use_row_windows(table_metadata["table_type"], len(rows)):
+            row_lines = []
+            for row_idx, row in enumerate(rows):
+                row_content = [
+                    f"{headers[col_idx]}: {cell_value}"
+                    for col_idx, cell_value in enumerate(row.get('rowData', []))
+                    if col_idx < len(headers) and cell_value
+                ]
+                if row_content:
+                    row_lines.append((row_idx, f"Row {row_idx + 1}: {'; '.join(row_content)}"))
             
-            if row_content:
-                row_text = f"Department: {department}. Table: {table_title}. Row {row_idx + 1}: {'; '.join(row_content)}"
-                
-                # Create metadata for row
-                row_metadata = structure_metadata.copy()
-                row_metadata.update({
-                    "content_type": "dynamic_table_row",
-                    "row_index": row_idx,
-                    "searchable_keywords": self._extract_keywords(row_text),
-                    "search_boost": 0.9
-                })
+            yield from self._create_table_window_chunks(
+                row_lines, department, table_title, headers, table_metadata, metadata_ref,
+                f"dynamic-table-{section_idx}", "dynamic_table_rows", document_key, chunk_index_offset=1
+            )
+        else:
+            # Process individual rows if they exist and have data
+            for row_idx, row in enumerate(rows):
+                row_data = row.get('rowData', [])
+                if not row_data:
+                    continue
+                    
+                row_content = []
+                for col_idx, cell_value in enumerate(row_data):
+                    if col_idx < len(headers) and cell_value:
+                        row_content.append(f"{headers[col_idx]}: {cell_value}")
                 
-                chunks.append(ContentChunk(
-                    chunk_id=str(uuid.uuid4()),
-                    content=row_text,
-                    metadata=row_metadata,
-                    source_id=f"dynamic-table-{section_idx}-row-{row_idx}",
-                    source_type="collection",
-                    content_type="department-sections",
-                    chunk_index=row_idx + 1,
-                    total_chunks=len(rows) + 1
-                ))
-        
-        return chunks
+                if row_content:
+                    row_text = f"Department: {department}. Table: {table_title}. Row {row_idx + 1}: {'; '.join(row_content)}"
+                    
+                    # Create metadata for row
+                    row_metadata = self._chunk_metadata(table_metadata, {
+                        "content_type": "dynamic_table_row",
+                        "row_index": row_idx,
+                        "searchable_keywords": self._extract_keywords(row_text),
+                        "search_boost": 0.9
+                    })
+                    
+                    yield ContentChunk(
+                        chunk_id=str(uuid.uuid4()),
+                        content=row_text,
+                        metadata=row_metadata,
+                        source_id=f"dynamic-table-{section_idx}-row-{row_idx}",
+                        source_type="collection",
+                        content_type="department-sections",
+                        chunk_index=row_idx + 1,
+                        total_chunks=len(rows) + 1,
+                        document_key=document_key,
+                        metadata_ref=metadata_ref,
+                        shared_metadata=table_metadata
+                    )
     
-    def _process_multiple_tables_section(self, section: Dict[str, Any], department: str, section_title: str, section_idx: int) -> List[ContentChunk]:
+    def _process_multiple_tables_section(self, section: Dict[str, Any], department: str, section_title: str, section_idx: int,
+                                         document_key: str = "") -> Iterator[ContentChunk]:
         """Process multiple tables section with enhanced handling"""
-        chunks = []
         tables_config = section.get('multipleTablesConfig', [])
         
         if not tables_config:
-            return chunks
+            return
         
         # Create summary chunk for the multiple tables section
         summary_content = f"Department: {department}. Section: {section_title}. Contains {len(tables_config)} tables"
         
-        summary_metadata = {
+        section_metadata = {
             "source_type": "collection",
             "source_collection": "department-sections",
             "document_title": section_title,
@@ -1006,12 +1127,14 @@ class ContentProcessor:
             "table_count": len(tables_config),
             "language": "en",
             "last_updated": datetime.now().isoformat(),
-            "is_active": True,
+            "is_active": True
+        }
+        summary_metadata = self._chunk_metadata(section_metadata, {
             "searchable_keywords": self._extract_keywords(summary_content),
             "search_boost": 1.0
-        }
+        })
         
-        chunks.append(ContentChunk(
+        yield ContentChunk(
             chunk_id=str(uuid.uuid4()),
             content=summary_content,
             metadata=summary_metadata,
@@ -1019,8 +1142,11 @@ class ContentProcessor:
             source_type="collection",
             content_type="department-sections",
             chunk_index=0,
-            total_chunks=1
-        ))
+            total_chunks=1,
+            document_key=document_key,
+            metadata_ref=f"{document_key}#multiple-tables-{section_idx}",
+            shared_metadata=section_metadata
+        )
         
         # Process each table in the multiple tables configuration
         for table_idx, table in enumerate(tables_config):
@@ -1038,14 +1164,16 @@ class ContentProcessor:
                         {'dynamicTableConfig': table['dynamicTableConfig'], 'title': table_section['title']}, 
                         department, 
                         section_title, 
-                        f"{section_idx}-{table_idx}"
+                        f"{section_idx}-{table_idx}",
+                        document_key
                     )
                 elif 'tableConfig' in table and table['tableConfig']:
                     table_chunks = self._process_table_section(
                         {'tableConfig': table['tableConfig'], 'title': table_section['title']}, 
                         department, 
                         section_title, 
-                        f"{section_idx}-{table_idx}"
+                        f"{section_idx}-{table_idx}",
+                        document_key
                     )
                 else:
                     # Generic table processing
@@ -1055,12 +1183,11 @@ class ContentProcessor:
                         department, 
                         section_title, 
                         "table", 
-                        f"{section_idx}-{table_idx}"
+                        f"{section_idx}-{table_idx}",
+                        document_key
                     )
                 
-                chunks.extend(table_chunks)
-        
-        return chunks
+                yield from table_chunks
 
     def _extract_links_from_content(self, content_data: Dict[str, Any]) -> List[Dict[str, str]]:
         """Extract all links from content for separate indexing"""
@@ -1103,9 +1230,20 @@ class ContentProcessor:
         
         return links
 
-    def _create_link_chunks(self, links: List[Dict[str, str]], source_id: str, source_type: str, content_type: str) -> List[ContentChunk]:
+    def _create_link_chunks(self, links: List[Dict[str, str]], source_id: str, source_type: str, content_type: str,
+                            document_key: str = "") -> Iterator[ContentChunk]:
         """Create separate chunks for links found in content"""
-        chunks = []
+        # Fields common to every link of the source, stored once
+        links_metadata = {
+            "source_type": source_type,
+            f"source_{source_type}": content_type,
+            "content_type": "link_reference",
+            "category": "reference",
+            "language": "en",
+            "last_updated": datetime.now().isoformat(),
+            "is_active": True
+        }
+        metadata_ref = f"{document_key}#links-{source_id}"
         
         for i, link in enumerate(links):
             if not link['url']:
@@ -1115,25 +1253,18 @@ class ContentProcessor:
             if link['link_type']:
                 link_content += f" (Type: {link['link_type']})"
             
-            link_metadata = {
-                "source_type": source_type,
-                f"source_{source_type}": content_type,
+            link_metadata = self._chunk_metadata(links_metadata, {
                 "source_id": f"{source_id}-link-{i}",
                 "document_title": f"Link: {link['text']}",
-                "content_type": "link_reference",
-                "category": "reference",
                 "link_url": link['url'],
                 "link_text": link['text'],
                 "link_type": link['link_type'],
                 "opens_new_tab": link['new_tab'],
-                "language": "en",
-                "last_updated": datetime.now().isoformat(),
-                "is_active": True,
                 "searchable_keywords": self._extract_keywords(link['text']),
                 "search_boost": 0.8
-            }
+            })
             
-            chunks.append(ContentChunk(
+            yield ContentChunk(
                 chunk_id=str(uuid.uuid4()),
                 content=link_content,
                 metadata=link_metadata,
@@ -1141,7 +1272,8 @@ class ContentProcessor:
                 source_type=source_type,
                 content_type=content_type,
                 chunk_index=i,
-                total_chunks=len(links)
-            ))
-        
-        return chunks
+                total_chunks=len(links),
+                document_key=document_key,
+                metadata_ref=metadata_ref,
+                shared_metadata=links_metadata
+            )
@@ -0,0 +1,175 @@
+"""
+Adaptive concurrency for the embedding backend of Rajalakshmi Vector Service
+AIMD limit on in-flight embedding requests, with capacity reserved for search queries
+"""
+
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Dict, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Request priorities: query embeddings for search, and batches from ingest
+SEARCH = "search"
+BULK = "bulk"
+PRIORITIES = (SEARCH, BULK)
+
+# Request outcomes; only errors and timeouts count as backend overload
+SUCCESS = "success"
+ERROR = "error"
+TIMEOUT = "timeout"
+IGNORED = "ignored"
+
+# Latencies kept per priority for percentiles
+LATENCY_WINDOW = 200
+
+# Per success the latency baseline may rise by this factor, so a backend that
+# became permanently slower is re-learned instead of throttled forever
+BASELINE_DRIFT = 1.01
+
+
+class AdaptiveLimiter:
+    """
+    Additive-increase / multiplicative-decrease limit on concurrent requests
+
+    While the limit is in use and smoothed latency stays within
+    latency_tolerance x the baseline (the lowest smoothed latency seen), every
+    success grows the limit by 1/limit, about one request per round of
+    in-flight requests. Errors and timeouts halve it and latency above the
+    tolerance shrinks it by 10%, at most once per observed latency so a burst
+    of failures from one round counts once.
+
+    Bulk requests may use at most limit - search_reserved slots and queue
+    behind waiting searches; search always has search_reserved slots of its
+    own, even when bulk has the whole limit.
+    """
+
+    def __init__(self, min_limit: int = 1, max_limit: int = 8, initial_limit: int = 2,
+                 search_reserved: int = 1, latency_tolerance: float = 2.0):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(max(initial_limit, self.min_limit), self.max_limit))
+        self.search_reserved = max(0, search_reserved)
+        self.latency_tolerance = latency_tolerance
+        self.in_flight = {priority: 0 for priority in PRIORITIES}
+        self.waiting = {priority: 0 for priority in PRIORITIES}
+        self.latency = {
+            priority: {"ewma": None, "baseline": None, "recent": deque(maxlen=LATENCY_WINDOW)}
+            for priority in PRIORITIES
+        }
+        self.counts = {"requests": 0, "errors": 0, "timeouts": 0, "decreases": 0}
+        self._last_decrease = 0.0
+        self._condition: Optional[asyncio.Condition] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_condition(self) -> asyncio.Condition:
+        """One condition per event loop (the limiter outlives loops in tests and scripts)"""
+        loop = asyncio.get_running_loop()
+        if self._condition is None or self._loop is not loop:
+            self._condition = asyncio.Condition()
+            self._loop = loop
+        return self._condition
+
+    def _admits(self, priority: str) -> bool:
+        limit = int(self.limit)
+        total = sum(self.in_flight.values())
+        if priority == SEARCH:
+            return total < limit or self.in_flight[SEARCH] < self.search_reserved
+        return (not self.waiting[SEARCH]
+                and total < limit
+                and self.in_flight[BULK] < max(1, limit - self.search_reserved))
+
+    async def acquire(self, priority: str = BULK):
+        """Wait for a request slot"""
+        condition = self._get_condition()
+        async with condition:
+            self.waiting[priority] += 1
+            try:
+                await condition.wait_for(lambda: self._admits(priority))
+            finally:
+                self.waiting[priority] -= 1
+            self.in_flight[priority] += 1
+
+    async def release(self, priority: str, latency: float, outcome: str):
+        """Free a slot and adapt the limit to how the request went"""
+        condition = self._get_condition()
+        async with condition:
+            saturated = sum(self.in_flight.values()) >= int(self.limit)
+            self.in_flight[priority] -= 1
+            self._observe(priority, latency, outcome, saturated)
+            condition.notify_all()
+
+    def _observe(self, priority: str, latency: float, outcome: str, saturated: bool):
+        if outcome == IGNORED:
+            return
+        self.counts["requests"] += 1
+        if outcome != SUCCESS:
+            self.counts["timeouts" if outcome == TIMEOUT else "errors"] += 1
+            self._decrease(0.5, latency, outcome)
+            return
+
+        stats = self.latency[priority]
+        stats["recent"].append(latency)
+        ewma = latency if stats["ewma"] is None else 0.8 * stats["ewma"] + 0.2 * latency
+        stats["ewma"] = ewma
+        stats["baseline"] = ewma if stats["baseline"] is None else min(stats["baseline"] * BASELINE_DRIFT, ewma)
+        if ewma > stats["baseline"] * self.latency_tolerance:
+            self._decrease(0.9, ewma, f"{priority} latency {ewma * 1000:.0f}ms")
+        elif saturated and self.limit < self.max_limit:
+            self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+
+    def _decrease(self, factor: float, window: float, reason: str):
+        now = time.monotonic()
+        window = max(window, *(stats["ewma"] or 0.0 for stats in self.latency.values()))
+        if now - self._last_decrease < window or self.limit <= self.min_limit:
+            return
+        self._last_decrease = now
+        self.limit = max(float(self.min_limit), self.limit * factor)
+        self.counts["decreases"] += 1
+        logger.warning(f"Embedding concurrency limit lowered to {int(self.limit)} ({reason})")
+
+    def stats(self) -> Dict[str, Any]:
+        """Current limit, in-flight/waiting requests and observed latencies (ms)"""
+        def latency_stats(stats: Dict[str, Any]) -> Dict[str, Any]:
+            recent = sorted(stats["recent"])
+            def ms(value: Optional[float]) -> Optional[float]:
+                return round(value * 1000, 1) if value is not None else None
+            return {
+                "ewma_ms": ms(stats["ewma"]),
+                "baseline_ms": ms(stats["baseline"]),
+                "p50_ms": ms(recent[len(recent) // 2]) if recent else None,
+                "p95_ms": ms(recent[int(len(recent) * 0.95)]) if recent else None,
+                "samples": len(recent)
+            }
+
+        return {
+            "limit": int(self.limit),
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "search_reserved": self.search_reserved,
+            "in_flight": dict(self.in_flight),
+            "waiting": dict(self.waiting),
+            "latency": {priority: latency_stats(stats) for priority, stats in self.latency.items()},
+            **self.counts
+        }
+
+
+_limiter: Optional[AdaptiveLimiter] = None
+
+
+def get_embedding_limiter() -> AdaptiveLimiter:
+    """The process-wide limiter, shared by every EmbeddingGenerator (created on first use)"""
+    global _limiter
+    if _limiter is None:
+        _limiter = AdaptiveLimiter(
+            min_limit=settings.embed_min_concurrency,
+            max_limit=settings.embed_max_concurrency,
+            initial_limit=settings.embed_initial_concurrency,
+            search_reserved=settings.embed_search_reserved,
+            latency_tolerance=settings.embed_latency_tolerance
+        )
+    return _limiter
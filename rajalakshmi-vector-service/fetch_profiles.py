@@ -0,0 +1,88 @@
+"""
+CMS fetch profiles for Rajalakshmi Vector Service
+Derives Payload select/depth/populate parameters from COLLECTION_MAPPINGS and GLOBAL_MAPPINGS
+"""
+
+from typing import Any, Dict, Optional
+
+from config import settings, COLLECTION_MAPPINGS, GLOBAL_MAPPINGS
+
+# Always fetched (id is always returned): updatedAt drives delta sync and last_updated
+# metadata, createdAt orders reindex checkpoints, and the generic processor puts every
+# top-level string field, timestamps included, into the chunk text
+EXTRA_FIELDS = ("createdAt", "updatedAt")
+
+# Globals also return their slug, which the generic processor indexes as well
+GLOBAL_EXTRA_FIELDS = ("globalType",)
+
+# Depth used when no profile applies (unmapped content or profiles disabled)
+DEFAULT_DEPTH = 2
+
+
+def get_fetch_profile(content_type: str, source_type: str = "collection") -> Optional[Dict[str, Any]]:
+    """Return {"select", "depth", "relations"} for mapped content, or None to fetch everything"""
+    if not settings.payload_fetch_profiles:
+        return None
+
+    mappings = COLLECTION_MAPPINGS if source_type == "collection" else GLOBAL_MAPPINGS
+    mapping = mappings.get(content_type)
+    if not mapping or not mapping.get("content_fields"):
+        return None
+
+    extra_fields = EXTRA_FIELDS + (GLOBAL_EXTRA_FIELDS if source_type == "global" else ())
+    return {
+        "select": list(dict.fromkeys([*mapping["content_fields"], *extra_fields])),
+        "depth": mapping.get("fetch_depth", 0),
+        "relations": mapping.get("relations", {})
+    }
+
+
+def profile_params(profile: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Query parameters for a profile (select[field]=true, populate[collection][field]=true, depth)"""
+    if profile is None:
+        return {"depth": DEFAULT_DEPTH}
+
+    params: Dict[str, Any] = {"depth": profile["depth"]}
+    for field in profile["select"]:
+        params[f"select[{field}]"] = "true"
+    if profile["depth"] > 0:
+        for relation in profile["relations"].values():
+            for field in relation["fields"]:
+                params[f"populate[{relation['collection']}][{field}]"] = "true"
+    return params
+
+
+def project_document(document: Dict[str, Any], profile: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Reduce a fully populated document (e.g. sent inline with a webhook at depth 2)
+    to the shape a profiled fetch returns, so both paths produce the same chunks
+    and source fingerprints.
+    """
+    if profile is None:
+        return document
+
+    keep = set(profile["select"]) | {"id"}
+    projected = {key: value for key, value in document.items() if key in keep}
+    return _project_relations(projected, profile["relations"], profile["depth"] > 0)
+
+
+def _project_relations(value: Any, relations: Dict[str, Dict[str, Any]], populated: bool) -> Any:
+    if isinstance(value, list):
+        return [_project_relations(item, relations, populated) for item in value]
+    if not isinstance(value, dict):
+        return value
+
+    result = {}
+    for key, item in value.items():
+        if isinstance(item, dict) and "id" in item and key in relations:
+            if populated:
+                fields = ["id", *relations[key]["fields"]]
+                result[key] = {field: item[field] for field in fields if field in item}
+            else:
+                result[key] = item["id"]
+        elif isinstance(item, dict) and "id" in item and "createdAt" in item:
+            # Any other populated document comes back as a bare ID under the profile
+            result[key] = item["id"]
+        else:
+            result[key] = _project_relations(item, relations, populated)
+    return result
@@ -0,0 +1,88 @@
+"""
+Ingest job handlers for Rajalakshmi Vector Service
+Shared by the API process (INGEST_MODE=inline) and the standalone ingest worker
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from config import settings
+from job_queue import JobQueue, check_result
+from manual_processor import ProcessingOrchestrator
+
+logger = logging.getLogger(__name__)
+
+
+def job_handlers(manual_processor: ProcessingOrchestrator) -> Dict[str, Callable[..., Awaitable[Dict[str, Any]]]]:
+    """Handlers by job kind, run by the worker pool and raising on failure so the job is retried"""
+
+    async def run_document_processing(collection: str, doc_id: str, operation: str,
+                                      doc: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Job handler for single-document reindex"""
+        return check_result(await manual_processor.process_document(collection, doc_id, operation, doc))
+
+    async def run_global_processing(global_name: str, data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Job handler for single-global reprocess"""
+        return check_result(await manual_processor.process_global(global_name, data))
+
+    async def run_full_processing(force: bool = False, run_id: Optional[str] = None) -> Dict[str, Any]:
+        """Job handler for full processing"""
+        logger.info("Starting full manual processing")
+        result = await manual_processor.full_initial_processing(force, run_id)
+        logger.info(f"Full processing completed: {result.get('summary', {})}")
+        return check_result(result)
+
+    async def run_selective_processing(collections: Optional[List[str]], globals_list: Optional[List[str]],
+                                       force: bool = False) -> Dict[str, Any]:
+        """Job handler for selective processing"""
+        logger.info(f"Starting selective processing: collections={collections}, globals={globals_list}")
+        result = await manual_processor.selective_processing(collections, globals_list, force)
+        logger.info(f"Selective processing completed: {result.get('summary', {})}")
+        return check_result(result)
+
+    async def run_delta_sync(collections: Optional[List[str]]) -> Dict[str, Any]:
+        """Job handler for incremental sync"""
+        result = await manual_processor.delta_sync(collections)
+        logger.info(f"Incremental sync completed: {result.get('summary', {})}")
+        return check_result(result)
+
+    async def run_reconcile(collections: Optional[List[str]]) -> Dict[str, Any]:
+        """Job handler for reconcile"""
+        result = await manual_processor.reconcile(collections)
+        logger.info(f"Reconcile completed: {result.get('deleted_documents', 0)} documents removed")
+        return check_result(result)
+
+    async def run_orphan_gc(dry_run: bool = True, max_deletes: Optional[int] = None) -> Dict[str, Any]:
+        """Job handler for orphan cleanup"""
+        result = await manual_processor.orphan_gc(dry_run, max_deletes)
+        logger.info(f"Orphan cleanup completed: {result.get('deleted_documents', 0)} documents removed")
+        return check_result(result)
+
+    return {
+        "document": run_document_processing,
+        "global": run_global_processing,
+        "full": run_full_processing,
+        "selective": run_selective_processing,
+        "delta_sync": run_delta_sync,
+        "reconcile": run_reconcile,
+        "orphan_gc": run_orphan_gc
+    }
+
+
+async def run_periodically(job_queue: JobQueue, interval: int, kind: str):
+    """Queue a bulk job every `interval` seconds until cancelled"""
+    logger.info(f"Scheduled {kind} every {interval}s")
+    while True:
+        await asyncio.sleep(interval)
+        job_queue.enqueue(kind, {"collections": None}, dedupe_key=kind)
+
+
+def start_scheduled_syncs(job_queue: JobQueue) -> List[asyncio.Task]:
+    """Start the configured periodic syncs (run by whichever process runs the workers)"""
+    scheduled = []
+    if settings.delta_sync_interval > 0:
+        scheduled.append(asyncio.create_task(run_periodically(job_queue, settings.delta_sync_interval, "delta_sync")))
+    if settings.reconcile_interval > 0:
+        scheduled.append(asyncio.create_task(run_periodically(job_queue, settings.reconcile_interval, "reconcile")))
+    return scheduled
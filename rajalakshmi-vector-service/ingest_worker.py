@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Standalone ingest worker for Rajalakshmi Vector Service
+Runs queued ingest jobs outside the API process (INGEST_MODE=api or subprocess),
+so CMS fetching, parsing and embedding never share an event loop with search
+"""
+
+import sys
+import signal
+import asyncio
+import logging
+from pathlib import Path
+from dotenv import load_dotenv
+
+# Same configuration as the API process
+load_dotenv()
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config import settings
+from ingest_jobs import start_scheduled_syncs
+from service_container import ServiceContainer
+
+logging.basicConfig(
+    level=getattr(logging, settings.log_level, logging.INFO),
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+async def main():
+    """Run the job workers and scheduled syncs until SIGTERM/SIGINT"""
+    services = ServiceContainer()
+    worker_pool = services.worker_pool
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, stop.set)
+    await services.warm_up()
+
+    # Jobs interrupted by the last shutdown or crash are picked up again here
+    worker_pool.start()
+    scheduled = start_scheduled_syncs(services.job_queue)
+    logger.info(f"Ingest worker running (state database {settings.state_db_path})")
+
+    await stop.wait()
+
+    logger.info("Ingest worker stopping, releasing running jobs")
+    for task in scheduled:
+        task.cancel()
+    await asyncio.gather(*scheduled, return_exceptions=True)
+    await worker_pool.stop()
+    await services.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
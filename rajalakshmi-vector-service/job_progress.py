@@ -0,0 +1,87 @@
+"""
+Live ingest job progress for Rajalakshmi Vector Service
+Per-stage counters for the job running in the current context, read by the jobs API
+"""
+
+import time
+from contextvars import Context, ContextVar, copy_context
+from typing import Any, Dict, List, Optional
+
+# Counted stages, in pipeline order
+STAGES = ("documents_fetched", "documents_processed", "chunks_produced", "embeddings", "points_upserted")
+
+# Errors kept per job (the oldest are dropped)
+MAX_ERRORS = 20
+
+
+class JobProgress:
+    """Plain counters; recording is a dict update, so it is cheap enough for every batch"""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.counts: Dict[str, int] = {stage: 0 for stage in STAGES}
+        self.expected_documents = 0
+        self.errors: List[str] = []
+
+    def add(self, stage: str, count: int = 1):
+        self.counts[stage] += count
+
+    def expect(self, documents: int):
+        """Add to the number of documents the job is going to process (drives percent and ETA)"""
+        self.expected_documents += documents
+
+    def error(self, message: str):
+        self.errors.append(message)
+        del self.errors[:-MAX_ERRORS]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counts, per-stage throughput, percent done and ETA"""
+        elapsed = max(time.monotonic() - self.started, 1e-6)
+        processed = self.counts["documents_processed"]
+        percent = eta = None
+        if self.expected_documents:
+            percent = round(min(100.0, 100.0 * processed / self.expected_documents), 1)
+            if processed:
+                remaining = max(self.expected_documents - processed, 0)
+                eta = round(remaining * elapsed / processed, 1)
+        return {
+            "elapsed_seconds": round(elapsed, 1),
+            "stages": {
+                stage: {"count": count, "per_second": round(count / elapsed, 2)}
+                for stage, count in self.counts.items()
+            },
+            "expected_documents": self.expected_documents,
+            "percent": percent,
+            "eta_seconds": eta,
+            "errors": list(self.errors)
+        }
+
+
+# Set by the job worker; copied into tasks and worker threads started by the job
+_current: ContextVar[Optional[JobProgress]] = ContextVar("job_progress", default=None)
+
+
+def progress_context(progress: JobProgress) -> Context:
+    """A copy of the current context in which work is counted on `progress` (run the job's task in it)"""
+    context = copy_context()
+    context.run(_current.set, progress)
+    return context
+
+
+def record(stage: str, count: int = 1):
+    """Count work for the current job (no-op outside a job, e.g. direct API calls)"""
+    progress = _current.get()
+    if progress is not None and count:
+        progress.add(stage, count)
+
+
+def expect_documents(count: Optional[int]):
+    progress = _current.get()
+    if progress is not None and count:
+        progress.expect(count)
+
+
+def record_error(message: str):
+    progress = _current.get()
+    if progress is not None:
+        progress.error(message)
@@ -0,0 +1,428 @@
+"""
+Durable ingest job queue for Rajalakshmi Vector Service
+SQLite-backed jobs with priority lanes, retries with backoff, coalescing and recovery after restarts
+"""
+
+import json
+import time
+import uuid
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from config import settings
+from job_progress import JobProgress, progress_context
+from state_store import StateStore
+
+logger = logging.getLogger(__name__)
+
+
+# Lower priority runs first: single-document webhook jobs jump ahead of bulk reindexes
+LANE_REALTIME = "realtime"
+LANE_BULK = "bulk"
+LANE_PRIORITIES = {LANE_REALTIME: 0, LANE_BULK: 10}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ingest_jobs (
+    job_id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    params TEXT NOT NULL,
+    lane TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    run_after REAL NOT NULL,
+    error TEXT,
+    result TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    dedupe_key TEXT,
+    coalesced INTEGER NOT NULL DEFAULT 0,
+    progress TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS ingest_jobs_ready ON ingest_jobs (status, priority, run_after);
+"""
+
+# Added after the table was first created
+_MIGRATIONS = {
+    "dedupe_key": "ALTER TABLE ingest_jobs ADD COLUMN dedupe_key TEXT",
+    "coalesced": "ALTER TABLE ingest_jobs ADD COLUMN coalesced INTEGER NOT NULL DEFAULT 0",
+    "progress": "ALTER TABLE ingest_jobs ADD COLUMN progress TEXT",
+    "cancel_requested": "ALTER TABLE ingest_jobs ADD COLUMN cancel_requested INTEGER NOT NULL DEFAULT 0",
+}
+
+_KEY_INDEXES = """
+CREATE UNIQUE INDEX IF NOT EXISTS ingest_jobs_pending_key ON ingest_jobs (dedupe_key)
+    WHERE status = 'queued' AND dedupe_key IS NOT NULL;
+CREATE INDEX IF NOT EXISTS ingest_jobs_key ON ingest_jobs (dedupe_key, status);
+"""
+
+_COLUMNS = ("job_id", "kind", "params", "lane", "priority", "status", "attempts", "max_attempts",
+            "run_after", "error", "result", "created_at", "started_at", "finished_at",
+            "dedupe_key", "coalesced", "progress")
+
+STATUSES = ("queued", "running", "succeeded", "failed", "superseded", "cancelled")
+
+# A newer queued job with the same key already covers a job that would be requeued
+_HAS_NEWER = (
+    "dedupe_key IS NOT NULL AND EXISTS (SELECT 1 FROM ingest_jobs AS newer WHERE newer.status = 'queued' "
+    "AND newer.dedupe_key = ingest_jobs.dedupe_key)"
+)
+
+# A queued job waits while another job with the same key is running
+_NOT_BLOCKED = (
+    "NOT EXISTS (SELECT 1 FROM ingest_jobs AS running WHERE running.status = 'running' "
+    "AND running.dedupe_key = ingest_jobs.dedupe_key)"
+)
+
+
+def check_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Raise when a processing result reports failure (for the run or any one source), so the job is retried"""
+    summary = result.get("summary") or {}
+    entries = [
+        *(result.get("collections_result") or {}).get("processed_collections", []),
+        *(result.get("globals_result") or {}).get("processed_globals", [])
+    ]
+    if (result.get("status") == "failed" or result.get("success") is False
+            or summary.get("failed_collections") or summary.get("failed_globals")
+            or summary.get("failed_sources") or any(entry.get("success") is False for entry in entries)):
+        raise RuntimeError(result.get("error") or f"Processing reported failures: {summary or result}")
+    return result
+
+
+class JobQueue:
+    """Persistent queue of ingest jobs (queued -> running -> succeeded | failed | superseded | cancelled)"""
+
+    def __init__(self, state_store: Optional[StateStore] = None):
+        self.state_store = state_store or StateStore()
+        self.state_store.create_schema(_SCHEMA)
+        columns = {row[1] for row in self.state_store.execute("PRAGMA table_info(ingest_jobs)")}
+        for column, ddl in _MIGRATIONS.items():
+            if column not in columns:
+                self.state_store.execute(ddl)
+        self.state_store.create_schema(_KEY_INDEXES)
+        # Set on enqueue so idle workers wake up immediately
+        self.available = asyncio.Event()
+
+    def enqueue(self, kind: str, params: Dict[str, Any], lane: str = LANE_BULK,
+                max_attempts: Optional[int] = None, dedupe_key: Optional[str] = None,
+                delay: float = 0.0) -> str:
+        """
+        Persist a job and return its ID
+        
+        With a dedupe_key, a job still queued under the same key is superseded
+        instead: it takes the newer params and its start moves to `delay`
+        seconds from now, so a burst of events collapses into one job that runs
+        once the burst has been quiet for `delay` seconds. Jobs sharing a key
+        never run at the same time.
+        """
+        now = time.time()
+        if dedupe_key:
+            rows = self.state_store.execute(
+                "UPDATE ingest_jobs SET kind = ?, params = ?, run_after = ?, attempts = 0, error = NULL, "
+                "coalesced = coalesced + 1 WHERE dedupe_key = ? AND status = 'queued' RETURNING job_id",
+                (kind, json.dumps(params), now + delay, dedupe_key)
+            )
+            if rows:
+                logger.info(f"Coalesced {kind} into queued job {rows[0][0]} ({dedupe_key})")
+                return rows[0][0]
+        
+        job_id = uuid.uuid4().hex
+        self.state_store.execute(
+            "INSERT INTO ingest_jobs (job_id, kind, params, lane, priority, status, max_attempts, run_after, "
+            "created_at, dedupe_key) VALUES (?, ?, ?, ?, ?, 'queued', ?, ?, ?, ?)",
+            (job_id, kind, json.dumps(params), lane, LANE_PRIORITIES[lane],
+             max_attempts or settings.max_retries + 1, now + delay, now, dedupe_key)
+        )
+        self.available.set()
+        logger.info(f"Queued {lane} job {job_id}: {kind}")
+        return job_id
+
+    def claim(self, lanes: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """Atomically mark the next ready, unblocked job (by priority, then age) as running and return it"""
+        lanes = lanes or list(LANE_PRIORITIES)
+        placeholders = ",".join("?" for _ in lanes)
+        now = time.time()
+        rows = self.state_store.execute(
+            "UPDATE ingest_jobs SET status = 'running', attempts = attempts + 1, started_at = ?, error = NULL "
+            "WHERE job_id = (SELECT job_id FROM ingest_jobs WHERE status = 'queued' AND run_after <= ? "
+            f"AND lane IN ({placeholders}) AND {_NOT_BLOCKED} ORDER BY priority, run_after, created_at LIMIT 1) "
+            f"RETURNING {', '.join(_COLUMNS)}",
+            (now, now, *lanes)
+        )
+        return self._to_job(rows[0]) if rows else None
+
+    def complete(self, job_id: str, result: Dict[str, Any]):
+        """Record a successful run"""
+        self.state_store.execute(
+            "UPDATE ingest_jobs SET status = 'succeeded', result = ?, finished_at = ? WHERE job_id = ?",
+            (json.dumps(result, default=str), time.time(), job_id)
+        )
+
+    def fail(self, job: Dict[str, Any], error: str) -> bool:
+        """
+        Record a failed run; the job is requeued with exponential backoff until
+        it runs out of attempts
+
+        Returns:
+            True if the work will be retried (by this job, or by a newer queued job with its key)
+        """
+        if job["attempts"] < job["max_attempts"]:
+            if self._supersede(job["job_id"], error):
+                return True
+            delay = min(settings.job_retry_base_delay * 2 ** (job["attempts"] - 1), settings.job_retry_max_delay)
+            self.state_store.execute(
+                "UPDATE ingest_jobs SET status = 'queued', error = ?, run_after = ? WHERE job_id = ?",
+                (error, time.time() + delay, job["job_id"])
+            )
+            return True
+        self.state_store.execute(
+            "UPDATE ingest_jobs SET status = 'failed', error = ?, finished_at = ? WHERE job_id = ?",
+            (error, time.time(), job["job_id"])
+        )
+        return False
+
+    def release(self, job_id: str):
+        """Put a job interrupted by shutdown back in the queue without using up an attempt"""
+        if self._supersede(job_id, "interrupted by shutdown"):
+            return
+        self.state_store.execute(
+            "UPDATE ingest_jobs SET status = 'queued', attempts = MAX(attempts - 1, 0), run_after = ? "
+            "WHERE job_id = ? AND status = 'running'",
+            (time.time(), job_id)
+        )
+
+    def recover(self) -> int:
+        """Requeue jobs left running by a crash (the interrupted attempt still counts)"""
+        self.state_store.execute(
+            f"UPDATE ingest_jobs SET status = 'superseded', error = 'interrupted', finished_at = ? "
+            f"WHERE status = 'running' AND {_HAS_NEWER}",
+            (time.time(),)
+        )
+        rows = self.state_store.execute(
+            "UPDATE ingest_jobs SET status = 'queued', run_after = ? WHERE status = 'running' RETURNING job_id",
+            (time.time(),)
+        )
+        if rows:
+            logger.warning(f"Recovered {len(rows)} interrupted jobs")
+        return len(rows)
+
+    def prune(self, older_than_seconds: float) -> int:
+        """Delete finished jobs older than the retention window"""
+        rows = self.state_store.execute(
+            "DELETE FROM ingest_jobs WHERE status IN ('succeeded', 'failed', 'superseded', 'cancelled') "
+            "AND finished_at < ? "
+            "RETURNING job_id",
+            (time.time() - older_than_seconds,)
+        )
+        return len(rows)
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a queued job, or flag a running one for the worker running it
+        (possibly in another process) to cancel; False if it has already finished
+        """
+        rows = self.state_store.execute(
+            "UPDATE ingest_jobs SET status = 'cancelled', finished_at = ? WHERE job_id = ? AND status = 'queued' "
+            "RETURNING job_id",
+            (time.time(), job_id)
+        )
+        if rows:
+            return True
+        rows = self.state_store.execute(
+            "UPDATE ingest_jobs SET cancel_requested = 1 WHERE job_id = ? AND status = 'running' RETURNING job_id",
+            (job_id,)
+        )
+        return bool(rows)
+
+    def cancel_requests(self, job_ids: List[str]) -> List[str]:
+        """Which of these running jobs were flagged for cancellation"""
+        if not job_ids:
+            return []
+        placeholders = ",".join("?" for _ in job_ids)
+        rows = self.state_store.execute(
+            f"SELECT job_id FROM ingest_jobs WHERE cancel_requested = 1 AND job_id IN ({placeholders})",
+            job_ids
+        )
+        return [job_id for (job_id,) in rows]
+
+    def finish_cancelled(self, job_id: str):
+        """Record that a running job was cancelled"""
+        self.state_store.execute(
+            "UPDATE ingest_jobs SET status = 'cancelled', finished_at = ? WHERE job_id = ?",
+            (time.time(), job_id)
+        )
+
+    def save_progress(self, job_id: str, progress: Dict[str, Any]):
+        """Keep the last progress snapshot of a run for the jobs API"""
+        self.state_store.execute(
+            "UPDATE ingest_jobs SET progress = ? WHERE job_id = ?", (json.dumps(progress), job_id)
+        )
+
+    def list_jobs(self, status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Most recent jobs first, optionally of one status"""
+        where, params = ("WHERE status = ?", (status,)) if status else ("", ())
+        rows = self.state_store.execute(
+            f"SELECT {', '.join(_COLUMNS)} FROM ingest_jobs {where} ORDER BY created_at DESC LIMIT ?",
+            (*params, limit)
+        )
+        return [self._to_job(row) for row in rows]
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """A job by ID, or None"""
+        rows = self.state_store.execute(
+            f"SELECT {', '.join(_COLUMNS)} FROM ingest_jobs WHERE job_id = ?", (job_id,)
+        )
+        return self._to_job(rows[0]) if rows else None
+
+    def next_run_delay(self) -> Optional[float]:
+        """Seconds until the earliest unblocked queued job becomes ready, or None if there is none"""
+        rows = self.state_store.execute(
+            f"SELECT MIN(run_after) FROM ingest_jobs WHERE status = 'queued' AND {_NOT_BLOCKED}"
+        )
+        if not rows or rows[0][0] is None:
+            return None
+        return max(0.0, rows[0][0] - time.time())
+
+    def stats(self) -> Dict[str, Any]:
+        """Job counts by status and the number of events coalesced into retained jobs"""
+        counts = {status: 0 for status in STATUSES}
+        for status, count in self.state_store.execute("SELECT status, COUNT(*) FROM ingest_jobs GROUP BY status"):
+            counts[status] = count
+        rows = self.state_store.execute("SELECT COALESCE(SUM(coalesced), 0) FROM ingest_jobs")
+        return {"jobs": counts, "coalesced_events": rows[0][0]}
+
+    def _supersede(self, job_id: str, error: str) -> bool:
+        """Finish a job instead of requeueing it when a newer job with its key is already queued"""
+        rows = self.state_store.execute(
+            f"UPDATE ingest_jobs SET status = 'superseded', error = ?, finished_at = ? "
+            f"WHERE job_id = ? AND {_HAS_NEWER} RETURNING job_id",
+            (error, time.time(), job_id)
+        )
+        if rows:
+            logger.info(f"Job {job_id} superseded by a newer queued job")
+        return bool(rows)
+
+    def _to_job(self, row) -> Dict[str, Any]:
+        job = dict(zip(_COLUMNS, row))
+        job["params"] = json.loads(job["params"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        job["progress"] = json.loads(job["progress"]) if job["progress"] else None
+        return job
+
+
+class JobWorkerPool:
+    """
+    Runs queued jobs with a fixed number of workers. General workers take any
+    lane in priority order; realtime workers only take webhook jobs, so a long
+    reindex never delays a single-document update.
+    """
+
+    def __init__(self, queue: JobQueue, handlers: Dict[str, Callable[..., Awaitable[Dict[str, Any]]]]):
+        self.queue = queue
+        self.handlers = handlers
+        self._workers: List[asyncio.Task] = []
+        # job_id -> (handler task, live progress) for jobs being run right now
+        self._running: Dict[str, Tuple[asyncio.Task, JobProgress]] = {}
+
+    def start(self):
+        """Recover interrupted jobs, prune old ones and start the workers"""
+        self.queue.recover()
+        pruned = self.queue.prune(settings.job_retention_days * 86400)
+        if pruned:
+            logger.info(f"Pruned {pruned} finished jobs")
+        for number in range(max(1, settings.job_workers)):
+            self._workers.append(asyncio.create_task(self._work(f"worker-{number}", None)))
+        for number in range(max(0, settings.job_realtime_workers)):
+            self._workers.append(asyncio.create_task(self._work(f"realtime-{number}", [LANE_REALTIME])))
+        logger.info(f"Started {len(self._workers)} job workers")
+        self._workers.append(asyncio.create_task(self._monitor()))
+
+    async def stop(self):
+        """Stop the workers; running jobs are released back to the queue"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def progress(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Live progress of a running job, or None"""
+        running = self._running.get(job_id)
+        return running[1].snapshot() if running else None
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued or running job; False if it has already finished"""
+        if not self.queue.cancel(job_id):
+            return False
+        running = self._running.get(job_id)
+        if running is not None:
+            running[0].cancel()
+        return True
+
+    async def _monitor(self):
+        # Publish progress of running jobs and act on cancels requested by other processes
+        while True:
+            await asyncio.sleep(settings.job_progress_interval)
+            try:
+                for job_id, (task, progress) in list(self._running.items()):
+                    self.queue.save_progress(job_id, progress.snapshot())
+                for job_id in self.queue.cancel_requests(list(self._running)):
+                    running = self._running.get(job_id)
+                    if running is not None and not running[0].done():
+                        logger.info(f"Cancelling job {job_id} on request")
+                        running[0].cancel()
+            except Exception as e:
+                logger.error(f"Error updating running jobs: {str(e)}")
+
+    async def _work(self, name: str, lanes: Optional[List[str]]):
+        while True:
+            job = self.queue.claim(lanes)
+            if job is None:
+                await self._wait_for_work()
+                continue
+            await self._run(name, job)
+
+    async def _wait_for_work(self):
+        # Wake on enqueue, when the earliest delayed retry becomes ready, or after the
+        # poll interval for jobs queued by another process
+        self.queue.available.clear()
+        delay = self.queue.next_run_delay()
+        timeout = min(delay, settings.job_poll_interval) if delay is not None else settings.job_poll_interval
+        try:
+            await asyncio.wait_for(self.queue.available.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _run(self, name: str, job: Dict[str, Any]):
+        job_id = job["job_id"]
+        logger.info(f"{name} running job {job_id}: {job['kind']} (attempt {job['attempts']}/{job['max_attempts']})")
+        progress = JobProgress()
+        try:
+            handler = self.handlers[job["kind"]]
+            # Processing code counts its work on `progress` through the task's context
+            task = asyncio.create_task(handler(**job["params"]), context=progress_context(progress))
+            self._running[job_id] = (task, progress)
+            result = await task
+            self.queue.complete(job_id, result)
+            logger.info(f"Job {job_id} succeeded")
+        except asyncio.CancelledError:
+            if asyncio.current_task().cancelling():
+                # Shutdown, not a cancel request
+                self.queue.release(job_id)
+                raise
+            self.queue.finish_cancelled(job_id)
+            logger.info(f"Job {job_id} cancelled")
+        except Exception as e:
+            progress.error(str(e))
+            if self.queue.fail(job, str(e)):
+                logger.warning(f"Job {job_id} failed, will retry: {str(e)}")
+            else:
+                logger.error(f"Job {job_id} failed after {job['attempts']} attempts: {str(e)}")
+        finally:
+            self._running.pop(job_id, None)
+            self.queue.save_progress(job_id, progress.snapshot())
+            # A job waiting on this one's key may be runnable now
+            self.queue.available.set()
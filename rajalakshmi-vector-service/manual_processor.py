@@ -3,19 +3,36 @@ Manual Database Fetch and Processing for Existing Payload CMS Data
 Handles bulk processing of existing content from Payload CMS
 """
 
+import time
 import asyncio
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, AsyncIterator, Awaitable, Iterator, Optional, Tuple
 import httpx
 from datetime import datetime
 import json
 
 from config import settings, COLLECTION_MAPPINGS, GLOBAL_MAPPINGS
-from content_processor import ContentProcessor
+from content_processor import ContentProcessor, ContentChunk
+from fetch_profiles import get_fetch_profile, profile_params, project_document
+from job_progress import record, record_error, expect_documents
+from reindex_checkpoints import ReindexCheckpoint, ReindexCheckpointStore
+from source_fingerprints import SourceFingerprintStore, compute_fingerprint
+from sync_state import SyncStateStore
 from vector_db import VectorDatabaseManager
 
+try:
+    import ijson
+except ImportError:  # Optional: without it pages are parsed whole with response.json()
+    ijson = None
+
 logger = logging.getLogger(__name__)
 
+# Marks the end of a prefetched page in its document queue
+_PAGE_END = object()
+
+# Smallest possible response for ID listings (id is always returned)
+ID_ONLY_PROFILE = {"select": ["updatedAt"], "depth": 0, "relations": {}}
+
 
 class PayloadCMSClient:
     """Client for fetching data from Payload CMS API"""
@@ -24,6 +41,48 @@ class PayloadCMSClient:
         self.base_url = settings.payload_api_url
         self.api_secret = settings.payload_api_secret
         self.timeout = httpx.Timeout(30.0)
+        self.limits = httpx.Limits(
+            max_connections=settings.payload_max_connections,
+            max_keepalive_connections=settings.payload_max_keepalive_connections,
+            keepalive_expiry=settings.payload_keepalive_expiry
+        )
+        self._client: Optional[httpx.AsyncClient] = None
+        # Shared by every collection and global so the CMS sees one bounded request budget
+        self.fetch_semaphore = asyncio.Semaphore(max(1, settings.payload_fetch_concurrency))
+    
+    def _http2_available(self) -> bool:
+        """HTTP/2 needs the optional h2 package"""
+        if not settings.payload_http2:
+            return False
+        try:
+            import h2  # noqa: F401
+            return True
+        except ImportError:
+            logger.warning("PAYLOAD_HTTP2 is enabled but h2 is not installed, falling back to HTTP/1.1")
+            return False
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Long-lived pooled client, created on first use and reused across requests"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=self.limits,
+                http2=self._http2_available(),
+                headers=self._get_headers()
+            )
+        return self._client
+    
+    async def warm_up(self) -> bool:
+        """Open a pooled connection ahead of the first webhook or sync (one-document request)"""
+        data = await self.fetch_collection_data(next(iter(COLLECTION_MAPPINGS)), limit=1)
+        return bool(data)
+    
+    async def aclose(self):
+        """Close pooled connections (called on service shutdown)"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
     
     def _get_headers(self) -> Dict[str, str]:
         """Get headers for API requests"""
@@ -37,221 +96,870 @@ class PayloadCMSClient:
         
         return headers
     
+    def _where_params(self, where: Dict[str, Any], prefix: str = "where") -> Dict[str, Any]:
+        """Flatten a Payload where clause into query parameters (where[field][operator]=value)"""
+        params = {}
+        for key, value in where.items():
+            name = f"{prefix}[{key}]"
+            if isinstance(value, dict):
+                params.update(self._where_params(value, name))
+            else:
+                params[name] = value
+        return params
+    
     async def fetch_collection_data(self, collection_name: str, limit: int = 100, 
-                                  page: int = 1) -> Dict[str, Any]:
-        """Fetch data from a specific collection"""
+                                  page: int = 1, where: Optional[Dict[str, Any]] = None,
+                                  profile: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Fetch data from a specific collection (only the fields in its fetch profile)"""
         try:
             url = f"{self.base_url}/{collection_name}"
             params = {
                 "limit": limit,
-                "page": page,
-                "depth": 2  # Include related data
+                "page": page
             }
+            params.update(profile_params(profile or get_fetch_profile(collection_name)))
+            if where:
+                params.update(self._where_params(where))
             
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(
-                    url,
-                    params=params,
-                    headers=self._get_headers()
-                )
-                response.raise_for_status()
-                return response.json()
+            async with self.fetch_semaphore:
+                response = await self.client.get(url, params=params)
+            response.raise_for_status()
+            return response.json()
                 
         except Exception as e:
             logger.error(f"Error fetching collection {collection_name}: {str(e)}")
             return {}
     
+    async def stream_collection_page(self, collection_name: str, limit: int = 100, page: int = 1,
+                                     where: Optional[Dict[str, Any]] = None,
+                                     profile: Optional[Dict[str, Any]] = None,
+                                     page_info: Optional[Dict[str, Any]] = None,
+                                     sort: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield the documents of one collection page while the response is still arriving
+        
+        With ijson installed each entry of `docs` is yielded as soon as it has been
+        parsed, so only one document is held at a time; otherwise the page is parsed
+        whole. totalPages/totalDocs (sent after `docs`) are written to page_info.
+        A failed or truncated response ends the page early and is reported in
+        page_info["error"].
+        """
+        page_info = page_info if page_info is not None else {}
+        url = f"{self.base_url}/{collection_name}"
+        params = {
+            "limit": limit,
+            "page": page
+        }
+        params.update(profile_params(profile or get_fetch_profile(collection_name)))
+        if where:
+            params.update(self._where_params(where))
+        if sort:
+            params["sort"] = sort
+        
+        try:
+            async with self.fetch_semaphore:
+                async with self.client.stream("GET", url, params=params) as response:
+                    response.raise_for_status()
+                    
+                    if ijson is None:
+                        await response.aread()
+                        data = response.json()
+                        page_info.update(totalPages=data.get('totalPages'), totalDocs=data.get('totalDocs'))
+                        for doc in data.get('docs', []):
+                            yield doc
+                        return
+                    
+                    docs = ijson.sendable_list()
+                    total_pages = ijson.sendable_list()
+                    total_docs = ijson.sendable_list()
+                    parsers = [
+                        ijson.items_coro(docs, "docs.item", use_float=True),
+                        ijson.items_coro(total_pages, "totalPages"),
+                        ijson.items_coro(total_docs, "totalDocs")
+                    ]
+                    async for raw in response.aiter_bytes():
+                        for parser in parsers:
+                            parser.send(raw)
+                        for doc in docs:
+                            yield doc
+                        del docs[:]
+                    for parser in parsers:
+                        parser.close()
+                    for doc in docs:
+                        yield doc
+                    page_info.update(
+                        totalPages=int(total_pages[0]) if total_pages else None,
+                        totalDocs=int(total_docs[0]) if total_docs else None
+                    )
+                
+        except Exception as e:
+            logger.error(f"Error fetching page {page} of collection {collection_name}: {str(e)}")
+            page_info["error"] = f"page {page}: {str(e)}"
+    
+    async def _prefetch_page(self, queue: asyncio.Queue, *args, **kwargs):
+        """Stream a page into a bounded queue; a full queue pauses reading the response"""
+        try:
+            async for doc in self.stream_collection_page(*args, **kwargs):
+                await queue.put(doc)
+        finally:
+            await queue.put(_PAGE_END)
+    
     async def fetch_global_data(self, global_name: str) -> Dict[str, Any]:
         """Fetch data from a specific global"""
         try:
             url = f"{self.base_url}/globals/{global_name}"
             
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(
-                    url,
-                    headers=self._get_headers()
-                )
-                response.raise_for_status()
-                return response.json()
+            params = profile_params(get_fetch_profile(global_name, "global"))
+            
+            async with self.fetch_semaphore:
+                response = await self.client.get(url, params=params)
+            response.raise_for_status()
+            return response.json()
                 
         except Exception as e:
             logger.error(f"Error fetching global {global_name}: {str(e)}")
             return {}
     
-    async def fetch_all_collection_data(self, collection_name: str) -> List[Dict[str, Any]]:
-        """Fetch all data from a collection with pagination"""
-        all_docs = []
-        page = 1
-        limit = 100
+    async def fetch_document(self, collection_name: str, doc_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Fetch a single document by ID
         
-        while True:
-            try:
-                data = await self.fetch_collection_data(collection_name, limit, page)
-                docs = data.get('docs', [])
-                
-                if not docs:
-                    break
-                
-                all_docs.extend(docs)
-                
-                # Check if there are more pages
-                total_pages = data.get('totalPages', 1)
-                if page >= total_pages:
-                    break
-                
-                page += 1
-                logger.info(f"Fetched page {page-1} for {collection_name}: {len(docs)} items")
-                
-            except Exception as e:
-                logger.error(f"Error fetching page {page} for {collection_name}: {str(e)}")
-                break
+        Returns:
+            The document, None if it no longer exists (404), or {} on any other error
+        """
+        try:
+            url = f"{self.base_url}/{collection_name}/{doc_id}"
+            
+            params = profile_params(get_fetch_profile(collection_name))
+            
+            async with self.fetch_semaphore:
+                response = await self.client.get(url, params=params)
+            if response.status_code == 404:
+                return None
+            response.raise_for_status()
+            return response.json()
+            
+        except Exception as e:
+            logger.error(f"Error fetching {collection_name}/{doc_id}: {str(e)}")
+            return {}
+    
+    async def iter_collection_documents(self, collection_name: str, limit: int = 100,
+                                        where: Optional[Dict[str, Any]] = None,
+                                        profile: Optional[Dict[str, Any]] = None,
+                                        page_info: Optional[Dict[str, Any]] = None,
+                                        sort: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream all documents of a collection in page order.
+        
+        Documents are parsed out of each response as it arrives and every page
+        is read ahead into a queue of payload_stream_buffer documents. Page 1
+        tells us totalPages; as soon as it has been read the remaining pages
+        are streamed concurrently (bounded by the client-wide fetch semaphore)
+        while earlier pages are still being yielded. page_info receives
+        totalDocs/totalPages once page 1 has been read, and "error" as soon as a
+        page has failed (the remaining pages are still yielded); sort is passed
+        to Payload as is (e.g. "createdAt").
+        """
+        buffer_size = max(1, settings.payload_stream_buffer)
+        page_info = page_info if page_info is not None else {}
+        queues = [asyncio.Queue(maxsize=buffer_size)]
+        page_infos = [page_info]
+        tasks = [asyncio.create_task(
+            self._prefetch_page(queues[0], collection_name, limit, 1, where, profile, page_info, sort)
+        )]
+        remaining_started = closed = False
         
-        logger.info(f"Total fetched for {collection_name}: {len(all_docs)} items")
-        return all_docs
+        def start_remaining_pages():
+            nonlocal remaining_started
+            if remaining_started or closed:
+                return
+            remaining_started = True
+            for page in range(2, (page_info.get('totalPages') or 1) + 1):
+                queue = asyncio.Queue(maxsize=buffer_size)
+                queues.append(queue)
+                page_infos.append({})
+                tasks.append(asyncio.create_task(
+                    self._prefetch_page(queue, collection_name, limit, page, where, profile, page_infos[-1], sort)
+                ))
+        
+        # Start the other pages as soon as page 1 has been read, not when it has been consumed
+        tasks[0].add_done_callback(lambda task: task.cancelled() or start_remaining_pages())
+        try:
+            page_number = 0
+            while page_number < len(queues):
+                queue = queues[page_number]
+                page_number += 1
+                count = 0
+                while (doc := await queue.get()) is not _PAGE_END:
+                    count += 1
+                    yield doc
+                if "error" in page_infos[page_number - 1]:
+                    page_info.setdefault("error", page_infos[page_number - 1]["error"])
+                if page_number == 1:
+                    # The done callback may not have run yet
+                    await tasks[0]
+                    start_remaining_pages()
+                    continue
+                if not count:
+                    logger.warning(f"Page {page_number}/{len(queues)} of {collection_name} returned no documents")
+                    continue
+                logger.info(f"Fetched page {page_number}/{len(queues)} for {collection_name}: {count} items")
+        finally:
+            # Consumer stopped early or a page failed: don't leave requests running
+            closed = True
+            for task in tasks:
+                task.cancel()
+    
+    async def fetch_collection_ids(self, collection_name: str) -> Optional[List[str]]:
+        """
+        List every document ID in a collection (IDs only, large pages)
+        
+        Returns:
+            The IDs, or None when the listing is incomplete (failed page or
+            documents added mid-listing) so callers never act on partial data
+        """
+        first_page = await self.fetch_collection_data(collection_name, limit=1, profile=ID_ONLY_PROFILE)
+        if not first_page:
+            return None
+        expected = first_page.get('totalDocs', 0)
+        
+        page_info: Dict[str, Any] = {}
+        ids = {
+            str(doc['id'])
+            async for doc in self.iter_collection_documents(collection_name, limit=500, profile=ID_ONLY_PROFILE,
+                                                            page_info=page_info)
+            if doc.get('id') is not None
+        }
+        if page_info.get('error') or len(ids) != expected:
+            logger.warning(f"Incomplete ID listing for {collection_name}: got {len(ids)} of {expected}")
+            return None
+        return list(ids)
 
 
 class ManualContentProcessor:
     """Handles manual processing of existing CMS content"""
     
-    def __init__(self):
-        self.cms_client = PayloadCMSClient()
-        self.content_processor = ContentProcessor()
-        self.vector_manager = VectorDatabaseManager()
+    def __init__(self, vector_manager: Optional[VectorDatabaseManager] = None,
+                 content_processor: Optional[ContentProcessor] = None,
+                 cms_client: Optional[PayloadCMSClient] = None):
+        self.cms_client = cms_client or PayloadCMSClient()
+        self.content_processor = content_processor or ContentProcessor()
+        self.vector_manager = vector_manager or VectorDatabaseManager()
+        self.fingerprints = SourceFingerprintStore(self.vector_manager.state_store)
+        self.sync_state = SyncStateStore(self.vector_manager.state_store)
+        self.checkpoints = ReindexCheckpointStore(self.vector_manager.state_store)
+        # Collections and globals processed at the same time
+        self.source_semaphore = asyncio.Semaphore(max(1, settings.ingest_source_concurrency))
+    
+    async def aclose(self):
+        """Release pooled CMS connections"""
+        await self.cms_client.aclose()
     
-    async def process_all_collections(self, collections: Optional[List[str]] = None) -> Dict[str, Any]:
-        """Process all collections or specified collections"""
+    async def process_all_collections(self, collections: Optional[List[str]] = None,
+                                      force: bool = False, incremental: bool = False,
+                                      checkpoint: Optional[ReindexCheckpoint] = None) -> Dict[str, Any]:
+        """
+        Process all collections or specified collections concurrently
+        (unchanged documents are skipped unless forced)
+        
+        With incremental=True only documents updated since each collection's
+        watermark are fetched; collections without a watermark are fetched in full.
+        With a checkpoint, work it records as done is skipped and new work is recorded.
+        """
         
         if collections is None:
             collections = list(COLLECTION_MAPPINGS.keys())
         
+        force = force or self._fingerprints_stale()
+        
         results = {
             "processed_collections": [],
             "failed_collections": [],
+            "checkpointed_collections": [],
             "total_chunks": 0,
+            "unchanged_documents": 0,
+            "resumed_documents": 0,
             "processing_time": None,
             "errors": []
         }
         
         start_time = datetime.now()
         
-        for collection_name in collections:
-            try:
-                logger.info(f"Processing collection: {collection_name}")
-                
-                # Fetch all data for the collection
-                docs = await self.cms_client.fetch_all_collection_data(collection_name)
-                
-                if not docs:
-                    logger.warning(f"No documents found for collection: {collection_name}")
-                    continue
-                
-                # Process documents in batches
-                total_chunks = 0
-                batch_size = 10  # Process 10 documents at a time
-                
-                for i in range(0, len(docs), batch_size):
-                    batch = docs[i:i + batch_size]
-                    batch_chunks = await self._process_document_batch(collection_name, batch, "collection")
-                    total_chunks += len(batch_chunks)
-                    
-                    # Store in vector database
-                    if batch_chunks:
-                        success = await self.vector_manager.process_and_store_chunks(batch_chunks)
-                        if not success:
-                            logger.error(f"Failed to store chunks for batch in {collection_name}")
-                
-                results["processed_collections"].append({
-                    "name": collection_name,
-                    "documents": len(docs),
-                    "chunks": total_chunks
-                })
-                results["total_chunks"] += total_chunks
-                
-                logger.info(f"Completed processing {collection_name}: {len(docs)} docs, {total_chunks} chunks")
-                
-            except Exception as e:
-                error_msg = f"Error processing collection {collection_name}: {str(e)}"
+        outcomes = await asyncio.gather(
+            *(self._run_source(self._process_collection(name, force, incremental, checkpoint)) for name in collections),
+            return_exceptions=True
+        )
+        
+        for collection_name, outcome in zip(collections, outcomes):
+            if isinstance(outcome, Exception):
+                error_msg = f"Error processing collection {collection_name}: {str(outcome)}"
                 logger.error(error_msg)
+                record_error(error_msg)
                 results["failed_collections"].append(collection_name)
                 results["errors"].append(error_msg)
+            elif outcome is None:
+                continue
+            elif outcome.get("checkpointed"):
+                results["checkpointed_collections"].append(collection_name)
+            else:
+                results["processed_collections"].append(outcome)
+                results["total_chunks"] += outcome["chunks"]
+                results["unchanged_documents"] += outcome["unchanged_documents"]
+                results["resumed_documents"] += outcome.get("resumed_documents", 0)
         
         end_time = datetime.now()
         results["processing_time"] = str(end_time - start_time)
         
         return results
     
-    async def process_all_globals(self, globals_list: Optional[List[str]] = None) -> Dict[str, Any]:
-        """Process all globals or specified globals"""
+    async def process_all_globals(self, globals_list: Optional[List[str]] = None,
+                                  force: bool = False,
+                                  checkpoint: Optional[ReindexCheckpoint] = None) -> Dict[str, Any]:
+        """
+        Process all globals or specified globals concurrently
+        (unchanged globals are skipped unless forced, checkpointed ones always)
+        """
         
         if globals_list is None:
             globals_list = list(GLOBAL_MAPPINGS.keys())
         
+        force = force or self._fingerprints_stale()
+        
         results = {
             "processed_globals": [],
             "failed_globals": [],
+            "checkpointed_globals": [],
             "total_chunks": 0,
+            "unchanged_globals": 0,
             "processing_time": None,
             "errors": []
         }
         
         start_time = datetime.now()
         
-        for global_name in globals_list:
+        outcomes = await asyncio.gather(
+            *(self._run_source(self._process_global(name, force, checkpoint=checkpoint)) for name in globals_list),
+            return_exceptions=True
+        )
+        
+        for global_name, outcome in zip(globals_list, outcomes):
+            if isinstance(outcome, Exception):
+                error_msg = f"Error processing global {global_name}: {str(outcome)}"
+                logger.error(error_msg)
+                record_error(error_msg)
+                results["failed_globals"].append(global_name)
+                results["errors"].append(error_msg)
+            elif outcome is None:
+                continue
+            elif outcome.get("checkpointed"):
+                results["checkpointed_globals"].append(global_name)
+            elif outcome.get("unchanged"):
+                results["unchanged_globals"] += 1
+            else:
+                results["processed_globals"].append(outcome)
+                results["total_chunks"] += outcome["chunks"]
+        
+        end_time = datetime.now()
+        results["processing_time"] = str(end_time - start_time)
+        
+        return results
+    
+    async def _run_source(self, coro: Awaitable[Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        """Run one collection or global under the shared source concurrency budget"""
+        async with self.source_semaphore:
+            return await coro
+    
+    async def _process_collection(self, collection_name: str, force: bool,
+                                  incremental: bool = False,
+                                  checkpoint: Optional[ReindexCheckpoint] = None) -> Optional[Dict[str, Any]]:
+        """
+        Fetch, chunk and store one collection; returns its progress entry
+        
+        Documents are handed to processing in groups of ingest_document_batch
+        while later pages are still being fetched and parsed. With a checkpoint
+        the collection is read oldest first, starting at the checkpoint cursor,
+        and documents already stored by the run are skipped.
+        """
+        if checkpoint and checkpoint.is_complete("collection", collection_name):
+            logger.info(f"Collection {collection_name} already done in reindex run {checkpoint.run_id}, skipping")
+            return {"name": collection_name, "checkpointed": True}
+        
+        logger.info(f"Processing collection: {collection_name}")
+        started = time.perf_counter()
+        
+        # Fetch all data for the collection, or only what changed since the last sync
+        since = self.sync_state.get_watermark(collection_name) if incremental else None
+        where = {"updatedAt": {"greater_than_equal": since}} if since else None
+        resume_from, stored_ids, sort = None, set(), None
+        if checkpoint:
+            resume_from = checkpoint.cursor(collection_name)
+            stored_ids = checkpoint.documents(collection_name)
+            sort = "createdAt"
+            if resume_from:
+                # Documents sharing the cursor timestamp are refetched and skipped by ID
+                where = {"createdAt": {"greater_than_equal": resume_from}}
+                logger.info(f"Resuming {collection_name} from createdAt {resume_from} "
+                            f"({len(stored_ids)} documents already stored)")
+        page_info: Dict[str, Any] = {}
+        documents = self.cms_client.iter_collection_documents(
+            collection_name, where=where, page_info=page_info, sort=sort
+        )
+        
+        doc_count, unchanged, resumed, total_chunks, success = 0, 0, 0, 0, True
+        expected_recorded = False
+        watermark: Optional[str] = None
+        stage_times: Dict[str, float] = {}
+        async for docs in self._iter_document_groups(documents, stage_times):
+            if not expected_recorded and page_info.get('totalDocs') is not None:
+                expect_documents(page_info['totalDocs'])
+                expected_recorded = True
+            doc_count += len(docs)
+            updated = [doc['updatedAt'] for doc in docs if doc.get('updatedAt')]
+            watermark = max(filter(None, [watermark, *updated]), default=None)
+            group_cursor = max(filter(None, (doc.get('createdAt') for doc in docs)), default=None)
+            
+            # Skip documents this reindex run already stored
+            if stored_ids:
+                remaining = [doc for doc in docs if str(doc.get('id')) not in stored_ids]
+                resumed += len(docs) - len(remaining)
+                if not remaining:
+                    record("documents_processed", len(docs))
+                    if checkpoint and success and not page_info.get('error'):
+                        checkpoint.record_documents(collection_name, [], group_cursor)
+                    continue
+                record("documents_processed", len(docs) - len(remaining))
+                docs = remaining
+            
+            # Skip documents whose fingerprint matches the last stored version
+            changed_docs, fingerprints = self._filter_unchanged(collection_name, docs, "collection", force)
+            unchanged += len(docs) - len(changed_docs)
+            
+            # Stream chunks into the vector database batch by batch
+            group_chunks, group_success = 0, True
+            if changed_docs:
+                chunk_stream = self._iter_document_chunks(collection_name, changed_docs, "collection")
+                group_chunks, group_success = await self.vector_manager.store_chunk_stream(
+                    chunk_stream, stage_times=stage_times
+                )
+            total_chunks += group_chunks
+            if group_success:
+                self.fingerprints.put_many(fingerprints)
+                doc_ids = [doc['id'] for doc in docs if doc.get('id') is not None]
+                self.sync_state.add_documents(collection_name, doc_ids)
+                if checkpoint:
+                    # The cursor only moves while every earlier group was stored and no page has failed
+                    cursor_ok = success and not page_info.get('error')
+                    checkpoint.record_documents(collection_name, doc_ids, group_cursor if cursor_ok else None)
+            else:
+                success = False
+                record_error(f"Failed to store {len(changed_docs)} documents of {collection_name}")
+            record("documents_processed", len(docs))
+        
+        # A failed page or a short listing means some documents were never seen
+        listing_error = page_info.get('error')
+        total_docs = page_info.get('totalDocs')
+        if not listing_error and total_docs is not None and doc_count < total_docs:
+            listing_error = f"fetched {doc_count} of {total_docs} documents"
+            if checkpoint:
+                # Pages shifted while listing; the skipped documents may lie before the cursor
+                checkpoint.reset_cursor(collection_name)
+        if listing_error:
+            success = False
+            logger.error(f"Incomplete listing of {collection_name}: {listing_error}")
+            record_error(f"Incomplete listing of {collection_name}: {listing_error}")
+        
+        if not doc_count and not listing_error:
+            if since:
+                logger.info(f"No changes in {collection_name} since {since}")
+                return {
+                    "name": collection_name,
+                    "mode": "delta",
+                    "documents": 0,
+                    "unchanged_documents": 0,
+                    "chunks": 0,
+                    "success": True,
+                    "timings": self._timings(started, stage_times)
+                }
+            if not resume_from:
+                logger.warning(f"No documents found for collection: {collection_name}")
+                return None
+        
+        if success:
+            # Only once everything is stored: documents arrive in page order, not updatedAt order.
+            # A resumed collection skipped documents stored earlier in the run, which may have
+            # been edited since, so its watermark is left for the next delta sync to cover.
+            if watermark and not (resume_from or stored_ids):
+                self.sync_state.advance_watermark(collection_name, watermark)
+            # After a full pass every document is stored with a document key, so points
+            # written before keys existed are superseded (a delta pass only saw some documents)
+            if not since:
+                await self.vector_manager.vector_store.delete_unkeyed_chunks("collection", collection_name)
+            if checkpoint:
+                checkpoint.complete("collection", collection_name)
+        else:
+            logger.error(f"Failed to fetch or store some documents of {collection_name}")
+        
+        logger.info(f"Completed processing {collection_name}: {doc_count} docs "
+                    f"({unchanged} unchanged, {resumed} resumed), {total_chunks} chunks")
+        
+        return {
+            "name": collection_name,
+            "mode": "delta" if since else "full",
+            "documents": doc_count,
+            "unchanged_documents": unchanged,
+            "resumed_documents": resumed,
+            "chunks": total_chunks,
+            "success": success,
+            "error": listing_error,
+            "timings": self._timings(started, stage_times)
+        }
+    
+    async def _iter_document_groups(self, documents: AsyncIterator[Dict[str, Any]],
+                                    stage_times: Dict[str, float]) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Group a document stream for processing, recording time spent waiting on the CMS as fetch time"""
+        group_size = max(1, settings.ingest_document_batch)
+        group: List[Dict[str, Any]] = []
+        while True:
+            waited = time.perf_counter()
+            doc = await anext(documents, None)
+            stage_times["fetch"] = stage_times.get("fetch", 0.0) + time.perf_counter() - waited
+            if doc is None:
+                break
+            group.append(doc)
+            if len(group) >= group_size:
+                record("documents_fetched", len(group))
+                yield group
+                group = []
+        if group:
+            record("documents_fetched", len(group))
+            yield group
+    
+    async def _process_global(self, global_name: str, force: bool,
+                              data: Optional[Dict[str, Any]] = None,
+                              checkpoint: Optional[ReindexCheckpoint] = None) -> Optional[Dict[str, Any]]:
+        """Fetch (unless the data was sent inline), chunk and store one global; returns its progress entry"""
+        if checkpoint and checkpoint.is_complete("global", global_name):
+            logger.info(f"Global {global_name} already done in reindex run {checkpoint.run_id}, skipping")
+            return {"name": global_name, "checkpointed": True}
+        
+        logger.info(f"Processing global: {global_name}")
+        started = time.perf_counter()
+        expect_documents(1)
+        
+        # Fetch global data
+        if data is None:
+            data = await self.cms_client.fetch_global_data(global_name)
+        else:
+            data = project_document(data, get_fetch_profile(global_name, "global"))
+        stage_times: Dict[str, float] = {"fetch": time.perf_counter() - started}
+        
+        if not data:
+            logger.warning(f"No data found for global: {global_name}")
+            record("documents_processed")
+            return None
+        record("documents_fetched")
+        
+        changed_docs, fingerprints = self._filter_unchanged(global_name, [data], "global", force)
+        if not changed_docs:
+            logger.info(f"Global {global_name} unchanged, skipping")
+            record("documents_processed")
+            await self.vector_manager.vector_store.delete_unkeyed_chunks("global", global_name)
+            if checkpoint:
+                checkpoint.complete("global", global_name)
+            return {"name": global_name, "unchanged": True}
+        
+        # Process and store the global data
+        chunk_stream = self._iter_document_chunks(global_name, changed_docs, "global")
+        total_chunks, success = await self.vector_manager.store_chunk_stream(chunk_stream, stage_times=stage_times)
+        if success:
+            self.fingerprints.put_many(fingerprints)
+            # The global was rewritten with a document key; drop points stored before keys existed
+            await self.vector_manager.vector_store.delete_unkeyed_chunks("global", global_name)
+            if checkpoint:
+                checkpoint.complete("global", global_name)
+        else:
+            logger.error(f"Failed to store chunks for global {global_name}")
+            record_error(f"Failed to store chunks for global {global_name}")
+        record("documents_processed")
+        
+        logger.info(f"Completed processing {global_name}: {total_chunks} chunks")
+        
+        return {
+            "name": global_name,
+            "chunks": total_chunks,
+            "success": success,
+            "timings": self._timings(started, stage_times)
+        }
+    
+    async def process_document(self, collection_name: str, doc_id: str, operation: str = "update",
+                               force: bool = False, doc: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Reindex a single collection document, replacing only that document's points
+        
+        The document is fetched from the CMS unless it was sent inline with the
+        webhook. A document that no longer exists in the CMS (or a delete
+        operation) is removed from the vector database instead.
+        """
+        started = time.perf_counter()
+        doc_id = str(doc_id)
+        result = {"name": collection_name, "id": doc_id, "operation": operation, "inline": doc is not None}
+        expect_documents(1)
+        
+        if operation == "delete":
+            doc = None
+        elif doc is None:
+            doc = await self.cms_client.fetch_document(collection_name, doc_id)
+        else:
+            # Inline webhook bodies are fully populated; match the profiled fetch shape
+            doc = project_document(doc, get_fetch_profile(collection_name))
+        stage_times: Dict[str, float] = {"fetch": time.perf_counter() - started}
+        
+        if doc is None:
+            deleted = await self.delete_document("collection", collection_name, doc_id)
+            if deleted:
+                self.sync_state.remove_documents(collection_name, [doc_id])
+            result.update(status="deleted" if deleted else "failed", chunks=0)
+            record("documents_processed")
+            return result
+        if not doc:
+            result.update(status="failed", chunks=0, error="fetch failed")
+            return result
+        record("documents_fetched")
+        
+        changed_docs, fingerprints = self._filter_unchanged(collection_name, [doc], "collection", force)
+        if not changed_docs:
+            logger.info(f"{collection_name}/{doc_id} unchanged, skipping")
+            result.update(status="unchanged", chunks=0)
+            record("documents_processed")
+            return result
+        
+        chunk_stream = self._iter_document_chunks(collection_name, changed_docs, "collection")
+        total_chunks, success = await self.vector_manager.store_chunk_stream(chunk_stream, stage_times=stage_times)
+        
+        if success:
+            if not total_chunks:
+                # Nothing left to index: drop the previous version's points
+                await self.delete_document("collection", collection_name, doc_id)
+            self.fingerprints.put_many(fingerprints)
+            # The watermark is left alone: other documents may have changed without a webhook
+            self.sync_state.add_documents(collection_name, [doc_id])
+        else:
+            logger.error(f"Failed to store chunks for {collection_name}/{doc_id}")
+        record("documents_processed")
+        
+        logger.info(f"Reindexed {collection_name}/{doc_id}: {total_chunks} chunks")
+        result.update(
+            status="processed" if success else "failed",
+            chunks=total_chunks,
+            timings=self._timings(started, stage_times)
+        )
+        return result
+    
+    async def process_global(self, global_name: str, data: Optional[Dict[str, Any]] = None,
+                             force: bool = False) -> Dict[str, Any]:
+        """Reprocess a single global, skipping it when unchanged"""
+        return await self._process_global(global_name, force, data) or {"name": global_name, "status": "empty"}
+    
+    async def reconcile_collections(self, collections: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Remove documents that were deleted in the CMS
+        
+        Compares the IDs recorded during syncs with a full ID listing of each
+        collection. Collections whose listing is incomplete are skipped.
+        """
+        if collections is None:
+            collections = list(COLLECTION_MAPPINGS.keys())
+        
+        results = {
+            "reconciled_collections": [],
+            "skipped_collections": [],
+            "deleted_documents": 0,
+            "errors": []
+        }
+        
+        for collection_name in collections:
             try:
-                logger.info(f"Processing global: {global_name}")
-                
-                # Fetch global data
-                data = await self.cms_client.fetch_global_data(global_name)
-                
-                if not data:
-                    logger.warning(f"No data found for global: {global_name}")
+                current_ids = await self.cms_client.fetch_collection_ids(collection_name)
+                if current_ids is None:
+                    results["skipped_collections"].append(collection_name)
                     continue
                 
-                # Process the global data
-                chunks = await self._process_single_document(global_name, data, "global")
+                known_ids = self.sync_state.get_documents(collection_name)
+                deleted_ids = known_ids - set(current_ids)
                 
-                # Store in vector database
-                if chunks:
-                    success = await self.vector_manager.process_and_store_chunks(chunks)
-                    if not success:
-                        logger.error(f"Failed to store chunks for global {global_name}")
+                removed = []
+                for doc_id in deleted_ids:
+                    if await self.delete_document("collection", collection_name, doc_id):
+                        removed.append(doc_id)
+                self.sync_state.remove_documents(collection_name, removed)
                 
-                results["processed_globals"].append({
-                    "name": global_name,
-                    "chunks": len(chunks)
+                results["reconciled_collections"].append({
+                    "name": collection_name,
+                    "in_cms": len(current_ids),
+                    "indexed": len(known_ids),
+                    "deleted": len(removed)
                 })
-                results["total_chunks"] += len(chunks)
-                
-                logger.info(f"Completed processing {global_name}: {len(chunks)} chunks")
+                results["deleted_documents"] += len(removed)
+                if removed:
+                    logger.info(f"Reconciled {collection_name}: removed {len(removed)} deleted documents")
                 
             except Exception as e:
-                error_msg = f"Error processing global {global_name}: {str(e)}"
+                error_msg = f"Error reconciling collection {collection_name}: {str(e)}"
                 logger.error(error_msg)
-                results["failed_globals"].append(global_name)
                 results["errors"].append(error_msg)
         
-        end_time = datetime.now()
-        results["processing_time"] = str(end_time - start_time)
+        return results
+    
+    async def collect_orphans(self, dry_run: bool = True, max_deletes: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Remove points whose CMS document or global no longer exists
+        
+        Every document key stored in the vector database is compared with the
+        keys the CMS has now (a full ID listing of each mapped collection plus
+        the mapped globals), so deleted documents are found even when the
+        local sync state never saw them, as are whole collections that were
+        renamed or unmapped. Collections whose listing is incomplete are left
+        alone. Nothing is deleted in a dry run, or when there are more orphans
+        than orphan_gc_max_deletes or orphan_gc_max_fraction of the indexed
+        documents allow (max_deletes overrides both once a dry run has been
+        reviewed).
+        """
+        scan = await self.vector_manager.vector_store.scan_document_keys()
+        if scan is None:
+            raise RuntimeError("Could not list document keys in the vector database")
+        indexed_keys, unkeyed = scan
+        
+        live_keys = {self.content_processor.document_key("global", name) for name in GLOBAL_MAPPINGS}
+        collections = list(COLLECTION_MAPPINGS.keys())
+        listings = await asyncio.gather(*(self.cms_client.fetch_collection_ids(name) for name in collections))
+        skipped = []
+        for collection_name, ids in zip(collections, listings):
+            if ids is None:
+                skipped.append(collection_name)
+                continue
+            live_keys.update(self.content_processor.document_key("collection", collection_name, doc_id) for doc_id in ids)
+        
+        orphans_by_type: Dict[str, List[str]] = {}
+        for document_key in indexed_keys - live_keys:
+            source_type, _, rest = document_key.partition(":")
+            content_type = rest.partition(":")[0]
+            if source_type == "collection" and content_type in skipped:
+                continue
+            orphans_by_type.setdefault(content_type, []).append(document_key)
+        orphans = sorted(key for keys in orphans_by_type.values() for key in keys)
+        
+        if max_deletes is None:
+            max_deletes = min(settings.orphan_gc_max_deletes,
+                              int(len(indexed_keys) * settings.orphan_gc_max_fraction))
+        
+        results = {
+            "dry_run": dry_run,
+            "indexed_documents": len(indexed_keys),
+            "unkeyed_points": unkeyed,
+            "skipped_collections": skipped,
+            "orphan_documents": len(orphans),
+            "orphans_by_type": {content_type: len(keys) for content_type, keys in sorted(orphans_by_type.items())},
+            "sample": orphans[:50],
+            "max_deletes": max_deletes,
+            "deleted_documents": 0,
+            "aborted": None,
+            "errors": []
+        }
+        
+        if dry_run or not orphans:
+            return results
+        if len(orphans) > max_deletes:
+            results["aborted"] = (f"{len(orphans)} orphans exceed the limit of {max_deletes}; "
+                                  f"review a dry run and pass max_deletes to proceed")
+            logger.warning(f"Orphan cleanup aborted: {results['aborted']}")
+            return results
+        
+        batch_size = max(1, settings.orphan_gc_batch_size)
+        for start in range(0, len(orphans), batch_size):
+            batch = orphans[start:start + batch_size]
+            if not await self.vector_manager.delete_documents(batch):
+                results["errors"].append(f"Failed to delete orphan batch starting at {batch[0]}")
+                continue
+            self.fingerprints.delete_many(batch)
+            for document_key in batch:
+                source_type, _, rest = document_key.partition(":")
+                content_type, _, doc_id = rest.partition(":")
+                if source_type == "collection" and doc_id:
+                    self.sync_state.remove_documents(content_type, [doc_id])
+            results["deleted_documents"] += len(batch)
         
+        logger.info(f"Orphan cleanup removed {results['deleted_documents']} of {len(orphans)} orphaned documents")
         return results
     
-    async def _process_document_batch(self, content_type: str, documents: List[Dict[str, Any]], 
-                                    source_type: str) -> List:
-        """Process a batch of documents"""
-        all_chunks = []
+    async def delete_document(self, source_type: str, content_type: str, doc_id: Optional[str] = None) -> bool:
+        """Remove a document (or global) from the vector database and forget its fingerprint"""
+        document_key = self.content_processor.document_key(source_type, content_type, doc_id)
+        if not await self.vector_manager.delete_document(document_key):
+            return False
+        self.fingerprints.delete_many([document_key])
+        return True
+    
+    def _timings(self, started: float, stage_times: Dict[str, float]) -> Dict[str, float]:
+        """Per-source timings in seconds (stages of a streamed collection overlap)"""
+        return {
+            "fetch_seconds": round(stage_times.get("fetch", 0.0), 3),
+            "process_seconds": round(stage_times.get("process", 0.0), 3),
+            "store_seconds": round(stage_times.get("store", 0.0), 3),
+            "total_seconds": round(time.perf_counter() - started, 3)
+        }
+    
+    def _fingerprints_stale(self) -> bool:
+        """Stored fingerprints are meaningless once the vector collection is empty"""
+        if self.vector_manager.is_empty():
+            logger.info("Vector collection is empty, ignoring stored source fingerprints and watermarks")
+            self.fingerprints.clear()
+            self.sync_state.clear_watermarks()
+            return True
+        return False
+    
+    def _filter_unchanged(self, content_type: str, documents: List[Dict[str, Any]], source_type: str,
+                          force: bool = False) -> Tuple[List[Dict[str, Any]], Dict[str, str]]:
+        """
+        Split off documents whose fingerprint matches the stored one
         
+        Returns:
+            Tuple of (documents to process, new fingerprints to record once they are stored)
+        """
+        keyed = []
+        for doc in documents:
+            # Collection documents without an ID cannot be told apart, always process them
+            if source_type == "collection" and not doc.get('id'):
+                keyed.append((None, None, doc))
+                continue
+            document_key = self.content_processor.document_key(source_type, content_type, doc.get('id'))
+            keyed.append((document_key, compute_fingerprint(doc), doc))
+        
+        stored = {} if force else self.fingerprints.get_many(key for key, _, _ in keyed if key)
+        
+        changed_docs = []
+        fingerprints = {}
+        for document_key, fingerprint, doc in keyed:
+            if document_key and stored.get(document_key) == fingerprint:
+                continue
+            changed_docs.append(doc)
+            if document_key:
+                fingerprints[document_key] = fingerprint
+        
+        return changed_docs, fingerprints
+    
+    def _iter_document_chunks(self, content_type: str, documents: List[Dict[str, Any]], 
+                              source_type: str) -> Iterator[ContentChunk]:
+        """Lazily yield chunks for a sequence of documents (a processing error aborts the stream)"""
         for doc in documents:
             try:
-                chunks = await self._process_single_document(content_type, doc, source_type)
-                all_chunks.extend(chunks)
+                yield from self._iter_single_document(content_type, doc, source_type)
             except Exception as e:
                 logger.error(f"Error processing document {doc.get('id', 'unknown')}: {str(e)}")
-        
-        return all_chunks
+                raise
     
-    async def _process_single_document(self, content_type: str, data: Dict[str, Any], 
-                                     source_type: str):
-        """Process a single document"""
+    def _iter_single_document(self, content_type: str, data: Dict[str, Any], 
+                              source_type: str) -> Iterator[ContentChunk]:
+        """Yield chunks for a single document"""
         
         # Create a webhook-like payload for processing
         payload = {
@@ -262,8 +970,7 @@ class ManualContentProcessor:
         }
         
         # Use the content processor
-        chunks = self.content_processor.process_webhook_payload(payload)
-        return chunks
+        return self.content_processor.iter_webhook_payload(payload)
     
     async def reprocess_collection(self, collection_name: str) -> Dict[str, Any]:
         """Reprocess a specific collection (useful for updates)"""
@@ -273,7 +980,7 @@ class ManualContentProcessor:
         await self._delete_collection_data(collection_name)
         
         # Then process fresh data
-        return await self.process_all_collections([collection_name])
+        return await self.process_all_collections([collection_name], force=True)
     
     async def reprocess_global(self, global_name: str) -> Dict[str, Any]:
         """Reprocess a specific global (useful for updates)"""
@@ -283,23 +990,31 @@ class ManualContentProcessor:
         await self._delete_global_data(global_name)
         
         # Then process fresh data
-        return await self.process_all_globals([global_name])
+        return await self.process_all_globals([global_name], force=True)
     
     async def _delete_collection_data(self, collection_name: str):
         """Delete all existing data for a collection from vector database"""
         try:
-            # This would require implementing a method to delete by content_type
-            # For now, we'll rely on the upsert mechanism to overwrite
-            logger.info(f"Preparing to overwrite data for collection: {collection_name}")
+            scan = await self.vector_manager.vector_store.scan_document_keys()
+            if scan is None:
+                return
+            prefix = self.content_processor.document_key("collection", collection_name) + ":"
+            document_keys = [key for key in scan[0] if key.startswith(prefix)]
+            batch_size = max(1, settings.orphan_gc_batch_size)
+            for start in range(0, len(document_keys), batch_size):
+                batch = document_keys[start:start + batch_size]
+                if await self.vector_manager.delete_documents(batch):
+                    self.fingerprints.delete_many(batch)
+            self.sync_state.remove_documents(collection_name, self.sync_state.get_documents(collection_name))
+            logger.info(f"Deleted {len(document_keys)} documents of collection: {collection_name}")
         except Exception as e:
             logger.error(f"Error deleting collection data: {str(e)}")
     
     async def _delete_global_data(self, global_name: str):
         """Delete all existing data for a global from vector database"""
         try:
-            # This would require implementing a method to delete by content_type
-            # For now, we'll rely on the upsert mechanism to overwrite
-            logger.info(f"Preparing to overwrite data for global: {global_name}")
+            if await self.delete_document("global", global_name):
+                logger.info(f"Deleted data for global: {global_name}")
         except Exception as e:
             logger.error(f"Error deleting global data: {str(e)}")
     
@@ -359,11 +1074,21 @@ class ManualContentProcessor:
 class ProcessingOrchestrator:
     """Orchestrates the entire manual processing workflow"""
     
-    def __init__(self):
-        self.processor = ManualContentProcessor()
+    def __init__(self, processor: Optional[ManualContentProcessor] = None):
+        self.processor = processor or ManualContentProcessor()
+    
+    async def aclose(self):
+        """Release resources held by the processor"""
+        await self.processor.aclose()
     
-    async def full_initial_processing(self) -> Dict[str, Any]:
-        """Perform full initial processing of all CMS content"""
+    async def full_initial_processing(self, force: bool = False, run_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Perform full initial processing of all CMS content
+        
+        Progress is checkpointed under run_id: calling again with the ID of a run
+        that did not finish (a retried or recovered job, or an explicit resume)
+        skips the collections, pages and documents it already stored.
+        """
         logger.info("Starting full initial processing of CMS content")
         
         start_time = datetime.now()
@@ -389,12 +1114,20 @@ class ProcessingOrchestrator:
         }
         
         try:
-            # Process all collections
-            collections_result = await self.processor.process_all_collections()
-            results["collections_result"] = collections_result
+            # Decide once, before either side starts writing points. An emptied vector
+            # collection also invalidates the checkpoint; a resumed run keeps its force flag.
+            stale = self.processor._fingerprints_stale()
+            checkpoint = self.processor.checkpoints.open(run_id, force or stale, restart=stale)
+            force = checkpoint.force
+            results["run_id"] = checkpoint.run_id
+            results["resumed"] = checkpoint.resumed
             
-            # Process all globals
-            globals_result = await self.processor.process_all_globals()
+            # Process collections and globals concurrently
+            collections_result, globals_result = await asyncio.gather(
+                self.processor.process_all_collections(force=force, checkpoint=checkpoint),
+                self.processor.process_all_globals(force=force, checkpoint=checkpoint)
+            )
+            results["collections_result"] = collections_result
             results["globals_result"] = globals_result
             
             # Generate summary
@@ -406,11 +1139,20 @@ class ProcessingOrchestrator:
                 "total_collections_processed": len(collections_result["processed_collections"]),
                 "total_globals_processed": len(globals_result["processed_globals"]),
                 "total_chunks_created": total_chunks,
+                "unchanged_documents": collections_result["unchanged_documents"] + globals_result["unchanged_globals"],
                 "failed_collections": collections_result["failed_collections"],
                 "failed_globals": globals_result["failed_globals"],
+                "checkpointed_sources": (len(collections_result["checkpointed_collections"])
+                                         + len(globals_result["checkpointed_globals"])),
+                "resumed_documents": collections_result["resumed_documents"],
+                "failed_sources": self._failed_sources(collections_result, globals_result),
                 "total_errors": len(collections_result["errors"]) + len(globals_result["errors"])
             }
             
+            summary = results["summary"]
+            if not (summary["failed_sources"] or summary["failed_collections"] or summary["failed_globals"]):
+                checkpoint.finish()
+            
             # Get final database stats
             results["final_db_stats"] = await self.processor.get_processing_stats()
             
@@ -423,8 +1165,15 @@ class ProcessingOrchestrator:
         
         return results
     
+    @staticmethod
+    def _failed_sources(collections_result: Dict[str, Any], globals_result: Dict[str, Any]) -> List[str]:
+        """Collections and globals that were processed but not fully stored"""
+        entries = collections_result.get("processed_collections", []) + globals_result.get("processed_globals", [])
+        return [entry["name"] for entry in entries if entry.get("success") is False]
+    
     async def selective_processing(self, collections: Optional[List[str]] = None, 
-                                 globals_list: Optional[List[str]] = None) -> Dict[str, Any]:
+                                 globals_list: Optional[List[str]] = None,
+                                 force: bool = False) -> Dict[str, Any]:
         """Process only selected collections and globals"""
         logger.info(f"Starting selective processing: collections={collections}, globals={globals_list}")
         
@@ -437,21 +1186,26 @@ class ProcessingOrchestrator:
         
         try:
             total_chunks = 0
+            unchanged = 0
             
             if collections:
-                collections_result = await self.processor.process_all_collections(collections)
+                collections_result = await self.processor.process_all_collections(collections, force)
                 results["collections_result"] = collections_result
                 total_chunks += collections_result["total_chunks"]
+                unchanged += collections_result["unchanged_documents"]
             
             if globals_list:
-                globals_result = await self.processor.process_all_globals(globals_list)
+                globals_result = await self.processor.process_all_globals(globals_list, force)
                 results["globals_result"] = globals_result
                 total_chunks += globals_result["total_chunks"]
+                unchanged += globals_result["unchanged_globals"]
             
             results["summary"] = {
                 "total_chunks_created": total_chunks,
+                "unchanged_documents": unchanged,
                 "collections_processed": len(collections or []),
-                "globals_processed": len(globals_list or [])
+                "globals_processed": len(globals_list or []),
+                "failed_sources": self._failed_sources(results["collections_result"], results["globals_result"])
             }
             
             logger.info(f"Completed selective processing: {total_chunks} chunks created")
@@ -462,3 +1216,100 @@ class ProcessingOrchestrator:
             logger.error(f"Error in selective processing: {str(e)}")
         
         return results
+    
+    async def delta_sync(self, collections: Optional[List[str]] = None,
+                         globals_list: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Sync only what changed since the last run (collections by watermark, globals by fingerprint)"""
+        logger.info("Starting incremental sync")
+        
+        results = {
+            "status": "success",
+            "collections_result": {},
+            "globals_result": {},
+            "summary": {}
+        }
+        
+        try:
+            collections_result, globals_result = await asyncio.gather(
+                self.processor.process_all_collections(collections, incremental=True),
+                self.processor.process_all_globals(globals_list)
+            )
+            results["collections_result"] = collections_result
+            results["globals_result"] = globals_result
+            
+            total_chunks = collections_result["total_chunks"] + globals_result["total_chunks"]
+            results["summary"] = {
+                "total_chunks_created": total_chunks,
+                "changed_documents": sum(
+                    c["documents"] - c["unchanged_documents"] for c in collections_result["processed_collections"]
+                ),
+                "globals_processed": len(globals_result["processed_globals"]),
+                "failed_collections": collections_result["failed_collections"],
+                "failed_globals": globals_result["failed_globals"],
+                "failed_sources": self._failed_sources(collections_result, globals_result)
+            }
+            
+            logger.info(f"Completed incremental sync: {total_chunks} chunks created")
+            
+        except Exception as e:
+            results["status"] = "failed"
+            results["error"] = str(e)
+            logger.error(f"Error in incremental sync: {str(e)}")
+        
+        return results
+    
+    async def reconcile(self, collections: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Remove vectors of documents deleted in the CMS"""
+        logger.info("Starting deletion reconcile")
+        
+        try:
+            results = await self.processor.reconcile_collections(collections)
+            results["status"] = "success"
+            logger.info(f"Completed reconcile: {results['deleted_documents']} documents removed")
+        except Exception as e:
+            results = {"status": "failed", "error": str(e)}
+            logger.error(f"Error in reconcile: {str(e)}")
+        
+        return results
+    
+    async def orphan_gc(self, dry_run: bool = True, max_deletes: Optional[int] = None) -> Dict[str, Any]:
+        """Report (and unless dry_run, remove) vectors whose CMS source no longer exists"""
+        logger.info(f"Starting orphan cleanup ({'dry run' if dry_run else 'deleting'})")
+        
+        try:
+            results = await self.processor.collect_orphans(dry_run, max_deletes)
+            results["status"] = "failed" if results["errors"] else "success"
+            logger.info(f"Completed orphan cleanup: {results['orphan_documents']} orphans, "
+                        f"{results['deleted_documents']} removed")
+        except Exception as e:
+            results = {"status": "failed", "error": str(e)}
+            logger.error(f"Error in orphan cleanup: {str(e)}")
+        
+        return results
+    
+    async def process_document(self, collection_name: str, doc_id: str, operation: str = "update",
+                               doc: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Reindex one collection document (webhook path)"""
+        logger.info(f"Starting document reindex: {collection_name}/{doc_id} ({operation})")
+        
+        try:
+            result = await self.processor.process_document(collection_name, doc_id, operation, doc=doc)
+            logger.info(f"Completed document reindex: {result}")
+        except Exception as e:
+            result = {"name": collection_name, "id": doc_id, "status": "failed", "error": str(e)}
+            logger.error(f"Error reindexing {collection_name}/{doc_id}: {str(e)}")
+        
+        return result
+    
+    async def process_global(self, global_name: str, data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Reprocess one global (webhook path), using inline data when it was sent"""
+        logger.info(f"Starting global reprocess: {global_name}")
+        
+        try:
+            result = await self.processor.process_global(global_name, data=data)
+            logger.info(f"Completed global reprocess: {result}")
+        except Exception as e:
+            result = {"name": global_name, "status": "failed", "error": str(e)}
+            logger.error(f"Error reprocessing global {global_name}: {str(e)}")
+        
+        return result
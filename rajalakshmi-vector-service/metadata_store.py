@@ -0,0 +1,118 @@
+"""
+Shared document metadata store for Rajalakshmi Vector Service
+Document and table level metadata is stored once per reference instead of in every point
+"""
+
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+
+from config import settings
+from state_store import StateStore
+from search_cache import IndexVersions
+
+logger = logging.getLogger(__name__)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS document_metadata (
+    ref TEXT PRIMARY KEY,
+    document_key TEXT NOT NULL,
+    metadata TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_document_metadata_document_key ON document_metadata (document_key);
+"""
+
+
+class DocumentMetadataStore:
+    """
+    Stores shared metadata keyed by metadata_ref, with an in-memory LRU for hydration
+
+    The LRU is dropped whenever the index version has moved since it was
+    filled, so writes made by an ingest worker in another process are seen.
+    """
+
+    def __init__(self, state_store: Optional[StateStore] = None, cache_size: Optional[int] = None,
+                 index_versions: Optional[IndexVersions] = None):
+        self.state_store = state_store or StateStore()
+        self.state_store.create_schema(_SCHEMA)
+        self.index_versions = index_versions or IndexVersions(self.state_store)
+        self.cache_size = cache_size or settings.metadata_cache_size
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._cache_version = None
+        self._cache_lock = threading.Lock()
+
+    def _check_cache_version(self):
+        version = self.index_versions.current()
+        with self._cache_lock:
+            if version != self._cache_version:
+                self._cache.clear()
+                self._cache_version = version
+
+    def _cache_put(self, ref: str, metadata: Dict[str, Any]):
+        with self._cache_lock:
+            self._cache[ref] = metadata
+            self._cache.move_to_end(ref)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def put_many(self, entries: Dict[str, Dict[str, Any]], document_keys: Dict[str, str]):
+        """Insert or replace shared metadata for many references in one transaction"""
+        if not entries:
+            return
+
+        rows = [
+            (ref, document_keys.get(ref, ""), json.dumps(metadata, default=str))
+            for ref, metadata in entries.items()
+        ]
+        self.state_store.executemany(
+            "INSERT OR REPLACE INTO document_metadata (ref, document_key, metadata) VALUES (?, ?, ?)",
+            rows
+        )
+        for ref, metadata in entries.items():
+            self._cache_put(ref, metadata)
+
+    def get_many(self, refs: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Return shared metadata for the given references (missing refs are omitted)"""
+        found = {}
+        missing = []
+
+        self._check_cache_version()
+        with self._cache_lock:
+            for ref in set(refs):
+                if ref in self._cache:
+                    self._cache.move_to_end(ref)
+                    found[ref] = self._cache[ref]
+                else:
+                    missing.append(ref)
+
+        if missing:
+            placeholders = ",".join("?" for _ in missing)
+            rows = self.state_store.execute(
+                f"SELECT ref, metadata FROM document_metadata WHERE ref IN ({placeholders})",
+                missing
+            )
+            for ref, raw in rows:
+                metadata = json.loads(raw)
+                found[ref] = metadata
+                self._cache_put(ref, metadata)
+
+        return found
+
+    def delete_document(self, document_key: str):
+        """Drop all shared metadata of a deleted document"""
+        self.state_store.execute("DELETE FROM document_metadata WHERE document_key = ?", (document_key,))
+        with self._cache_lock:
+            for ref in [ref for ref in self._cache if ref == document_key or ref.startswith(f"{document_key}#")]:
+                del self._cache[ref]
+
+    def hydrate(self, metadata_ref: Optional[str], chunk_metadata: Dict[str, Any],
+                shared: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Merge shared metadata under the chunk-specific fields"""
+        if not metadata_ref or metadata_ref not in shared:
+            return chunk_metadata
+        hydrated = dict(shared[metadata_ref])
+        hydrated.update(chunk_metadata)
+        return hydrated
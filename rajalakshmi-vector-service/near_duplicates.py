@@ -0,0 +1,227 @@
+"""
+Near-duplicate chunk detection for Rajalakshmi Vector Service
+MinHash signatures with a persistent LSH index, used to skip or alias
+boilerplate chunks (vision/mission text, footer links) before embedding
+"""
+
+import re
+import json
+import hashlib
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import settings
+from content_processor import ContentChunk, INDEXED_METADATA_FIELDS
+from source_fingerprints import SourceFingerprintStore
+from state_store import StateStore
+
+logger = logging.getLogger(__name__)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS chunk_signatures (
+    chunk_id TEXT PRIMARY KEY,
+    document_key TEXT NOT NULL,
+    signature BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_chunk_signatures_document_key ON chunk_signatures (document_key);
+CREATE TABLE IF NOT EXISTS chunk_signature_bands (
+    bucket TEXT NOT NULL,
+    chunk_id TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_chunk_signature_bands_bucket ON chunk_signature_bands (bucket);
+CREATE INDEX IF NOT EXISTS idx_chunk_signature_bands_chunk_id ON chunk_signature_bands (chunk_id);
+CREATE TABLE IF NOT EXISTS chunk_skips (
+    document_key TEXT NOT NULL,
+    canonical_document_key TEXT NOT NULL,
+    PRIMARY KEY (document_key, canonical_document_key)
+);
+CREATE INDEX IF NOT EXISTS idx_chunk_skips_canonical ON chunk_skips (canonical_document_key);
+"""
+
+# Columns added after the first release
+_MIGRATIONS = {
+    "indexed_fields": "ALTER TABLE chunk_signatures ADD COLUMN indexed_fields TEXT NOT NULL DEFAULT ''",
+}
+
+# Prime just above 2**32 so (a * x + b) stays within uint64 for 32-bit shingle hashes
+_PRIME = np.uint64(4294967311)
+
+
+class MinHasher:
+    """Computes MinHash signatures over word shingles"""
+
+    def __init__(self, num_perm: int, shingle_size: int = 3, seed: int = 42):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.a = rng.integers(1, int(_PRIME), size=num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, int(_PRIME), size=num_perm, dtype=np.uint64)
+
+    def _shingles(self, text: str) -> set:
+        words = re.findall(r'\w+', text.lower())
+        if len(words) <= self.shingle_size:
+            return {" ".join(words)}
+        return {" ".join(words[i:i + self.shingle_size]) for i in range(len(words) - self.shingle_size + 1)}
+
+    def signature(self, text: str) -> np.ndarray:
+        """Return the MinHash signature of a text"""
+        hashes = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(s.encode(), digest_size=4).digest(), "little")
+             for s in self._shingles(text)),
+            dtype=np.uint64
+        )
+        permuted = (self.a[:, None] * hashes[None, :] + self.b[:, None]) % _PRIME
+        return permuted.min(axis=1)
+
+    @staticmethod
+    def similarity(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+        """Estimated Jaccard similarity of two signatures"""
+        return float(np.mean(sig_a == sig_b))
+
+
+class NearDuplicateIndex:
+    """Persistent LSH index of stored chunk signatures"""
+
+    def __init__(self, state_store: Optional[StateStore] = None):
+        self.state_store = state_store or StateStore()
+        self.state_store.create_schema(_SCHEMA)
+        columns = {row[1] for row in self.state_store.execute("PRAGMA table_info(chunk_signatures)")}
+        for column, ddl in _MIGRATIONS.items():
+            if column not in columns:
+                self.state_store.execute(ddl)
+        self.fingerprints = SourceFingerprintStore(self.state_store)
+        self.mode = settings.near_duplicate_mode
+        self.threshold = settings.near_duplicate_threshold
+        self.bands = settings.minhash_bands
+        self.hasher = MinHasher(settings.minhash_num_perm)
+        self.rows_per_band = self.hasher.num_perm // self.bands
+        self.stats = {"checked": 0, "skipped": 0, "aliased": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode in ("skip", "alias")
+
+    def _buckets(self, signature: np.ndarray) -> List[str]:
+        buckets = []
+        for band in range(self.bands):
+            rows = signature[band * self.rows_per_band:(band + 1) * self.rows_per_band]
+            buckets.append(f"{band}:{hashlib.md5(rows.tobytes()).hexdigest()[:16]}")
+        return buckets
+
+    @staticmethod
+    def _indexed_fields(chunk: ContentChunk) -> str:
+        """Values of the fields searches filter on; a chunk is only skipped when they match its canonical"""
+        return json.dumps([chunk.metadata.get(field) for field in INDEXED_METADATA_FIELDS], default=str)
+
+    def _find_stored(self, signature: np.ndarray, buckets: List[str]) -> Optional[Tuple[str, float, str, str]]:
+        """Find the most similar stored chunk above the threshold (chunk ID, score, document key, indexed fields)"""
+        placeholders = ",".join("?" for _ in buckets)
+        rows = self.state_store.execute(
+            f"SELECT s.chunk_id, s.signature, s.document_key, s.indexed_fields FROM chunk_signatures s WHERE s.chunk_id IN "
+            f"(SELECT DISTINCT chunk_id FROM chunk_signature_bands WHERE bucket IN ({placeholders}))",
+            buckets
+        )
+        best = None
+        for chunk_id, raw, document_key, indexed_fields in rows:
+            score = MinHasher.similarity(signature, np.frombuffer(raw, dtype=np.uint64))
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (chunk_id, score, document_key, indexed_fields)
+        return best
+
+    def clear_document(self, document_key: str):
+        """
+        Forget signatures of a document that is about to be replaced or deleted
+
+        Documents that had chunks skipped against this one lose their
+        fingerprint, so the next sync stores those chunks again instead of
+        relying on a canonical that may no longer exist.
+        """
+        dependents = [
+            key for (key,) in self.state_store.execute(
+                "SELECT DISTINCT document_key FROM chunk_skips WHERE canonical_document_key = ? AND document_key != ?",
+                (document_key, document_key)
+            )
+        ]
+        if dependents:
+            self.fingerprints.delete_many(dependents)
+            logger.info(f"Invalidated fingerprints of {len(dependents)} documents with chunks skipped against {document_key}")
+        self.state_store.execute(
+            "DELETE FROM chunk_skips WHERE document_key = ? OR canonical_document_key = ?",
+            (document_key, document_key)
+        )
+        self.state_store.execute(
+            "DELETE FROM chunk_signature_bands WHERE chunk_id IN "
+            "(SELECT chunk_id FROM chunk_signatures WHERE document_key = ?)",
+            (document_key,)
+        )
+        self.state_store.execute("DELETE FROM chunk_signatures WHERE document_key = ?", (document_key,))
+
+    def filter_batch(self, chunks: List[ContentChunk]) -> Tuple[List[ContentChunk], Dict[str, Tuple[str, np.ndarray, List[str], str]]]:
+        """
+        Check a batch against the index and against itself.
+
+        Returns:
+            Tuple of (chunks to store, pending signatures to register once the batch is stored).
+            In "skip" mode near-duplicates are dropped when their department, category and
+            content type match the canonical (and recorded against its document), otherwise
+            aliased; in "alias" mode they are kept with canonical_id pointing at the matching point.
+        """
+        kept = []
+        pending: Dict[str, Tuple[str, np.ndarray, List[str], str]] = {}
+        skips = set()
+
+        for chunk in chunks:
+            self.stats["checked"] += 1
+            signature = self.hasher.signature(chunk.content)
+            buckets = self._buckets(signature)
+            indexed_fields = self._indexed_fields(chunk)
+
+            match = self._find_stored(signature, buckets)
+            if match is None:
+                for chunk_id, (document_key, pending_signature, _, pending_fields) in pending.items():
+                    score = MinHasher.similarity(signature, pending_signature)
+                    if score >= self.threshold:
+                        match = (chunk_id, score, document_key, pending_fields)
+                        break
+
+            if match is None:
+                kept.append(chunk)
+                pending[chunk.chunk_id] = (chunk.document_key or chunk.source_id, signature, buckets, indexed_fields)
+            elif self.mode == "alias" or match[3] != indexed_fields:
+                # A skipped chunk would be missing from searches filtered on its own department or category
+                chunk.canonical_id = match[0]
+                kept.append(chunk)
+                self.stats["aliased"] += 1
+            else:
+                if chunk.document_key and chunk.document_key != match[2]:
+                    skips.add((chunk.document_key, match[2]))
+                self.stats["skipped"] += 1
+                logger.debug(f"Skipping near-duplicate chunk {chunk.source_id} (similarity {match[1]:.2f})")
+
+        if skips:
+            self.state_store.executemany(
+                "INSERT OR IGNORE INTO chunk_skips (document_key, canonical_document_key) VALUES (?, ?)",
+                sorted(skips)
+            )
+        return kept, pending
+
+    def register(self, pending: Dict[str, Tuple[str, np.ndarray, List[str], str]]):
+        """Add signatures of successfully stored chunks to the index"""
+        if not pending:
+            return
+        self.state_store.executemany(
+            "INSERT OR REPLACE INTO chunk_signatures (chunk_id, document_key, signature, indexed_fields) VALUES (?, ?, ?, ?)",
+            [(chunk_id, document_key, signature.tobytes(), indexed_fields)
+             for chunk_id, (document_key, signature, _, indexed_fields) in pending.items()]
+        )
+        self.state_store.executemany(
+            "INSERT INTO chunk_signature_bands (bucket, chunk_id) VALUES (?, ?)",
+            [(bucket, chunk_id) for chunk_id, (_, _, buckets, _) in pending.items() for bucket in buckets]
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters for near-duplicate checks since startup"""
+        return dict(self.stats, mode=self.mode)
@@ -0,0 +1,153 @@
+"""
+Reindex checkpoints for Rajalakshmi Vector Service
+Records how far a full reindex got so a restarted or resumed run skips finished work
+"""
+
+import uuid
+import logging
+from typing import Iterable, Optional, Set
+
+from state_store import StateStore
+
+logger = logging.getLogger(__name__)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reindex_runs (
+    run_id TEXT PRIMARY KEY,
+    force INTEGER NOT NULL DEFAULT 0,
+    started_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    finished_at TEXT
+);
+CREATE TABLE IF NOT EXISTS reindex_sources (
+    run_id TEXT NOT NULL,
+    source_type TEXT NOT NULL,
+    name TEXT NOT NULL,
+    cursor TEXT,
+    completed INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (run_id, source_type, name)
+);
+CREATE TABLE IF NOT EXISTS reindex_documents (
+    run_id TEXT NOT NULL,
+    collection TEXT NOT NULL,
+    doc_id TEXT NOT NULL,
+    PRIMARY KEY (run_id, collection, doc_id)
+);
+"""
+
+
+class ReindexCheckpoint:
+    """
+    Progress of one full reindex run
+
+    Collections are read in createdAt order, so the cursor marks a prefix of
+    pages that is fully stored; documents stored past it (or sharing its
+    timestamp) are remembered by ID. Finished collections and globals are
+    skipped outright.
+    """
+
+    def __init__(self, state_store: StateStore, run_id: str, force: bool, resumed: bool):
+        self.state_store = state_store
+        self.run_id = run_id
+        self.force = force
+        self.resumed = resumed
+
+    def is_complete(self, source_type: str, name: str) -> bool:
+        rows = self.state_store.execute(
+            "SELECT completed FROM reindex_sources WHERE run_id = ? AND source_type = ? AND name = ?",
+            (self.run_id, source_type, name)
+        )
+        return bool(rows and rows[0][0])
+
+    def cursor(self, collection: str) -> Optional[str]:
+        """createdAt up to which every document of the collection is stored"""
+        rows = self.state_store.execute(
+            "SELECT cursor FROM reindex_sources WHERE run_id = ? AND source_type = 'collection' AND name = ?",
+            (self.run_id, collection)
+        )
+        return rows[0][0] if rows else None
+
+    def documents(self, collection: str) -> Set[str]:
+        """IDs stored by this run in a collection that is not complete yet"""
+        rows = self.state_store.execute(
+            "SELECT doc_id FROM reindex_documents WHERE run_id = ? AND collection = ?",
+            (self.run_id, collection)
+        )
+        return {doc_id for (doc_id,) in rows}
+
+    def record_documents(self, collection: str, doc_ids: Iterable[str], cursor: Optional[str] = None):
+        """Remember stored documents and, when the pages before them are stored too, move the cursor"""
+        self.state_store.executemany(
+            "INSERT OR IGNORE INTO reindex_documents (run_id, collection, doc_id) VALUES (?, ?, ?)",
+            [(self.run_id, collection, str(doc_id)) for doc_id in doc_ids]
+        )
+        if cursor:
+            self.state_store.execute(
+                "INSERT INTO reindex_sources (run_id, source_type, name, cursor) VALUES (?, 'collection', ?, ?) "
+                "ON CONFLICT(run_id, source_type, name) DO UPDATE SET cursor = MAX(COALESCE(cursor, ''), excluded.cursor)",
+                (self.run_id, collection, cursor)
+            )
+
+    def reset_cursor(self, collection: str):
+        """Forget the cursor when the listing may have skipped documents before it (stored IDs are kept)"""
+        self.state_store.execute(
+            "UPDATE reindex_sources SET cursor = NULL WHERE run_id = ? AND source_type = 'collection' AND name = ?",
+            (self.run_id, collection)
+        )
+
+    def complete(self, source_type: str, name: str):
+        """Mark a collection or global as finished (its document IDs are no longer needed)"""
+        self.state_store.execute(
+            "INSERT INTO reindex_sources (run_id, source_type, name, completed) VALUES (?, ?, ?, 1) "
+            "ON CONFLICT(run_id, source_type, name) DO UPDATE SET completed = 1",
+            (self.run_id, source_type, name)
+        )
+        if source_type == "collection":
+            self.state_store.execute(
+                "DELETE FROM reindex_documents WHERE run_id = ? AND collection = ?", (self.run_id, name)
+            )
+
+    def finish(self):
+        """The whole run succeeded: nothing is left to resume"""
+        self.state_store.execute(
+            "UPDATE reindex_runs SET finished_at = CURRENT_TIMESTAMP WHERE run_id = ?", (self.run_id,)
+        )
+        self.state_store.execute("DELETE FROM reindex_sources WHERE run_id = ?", (self.run_id,))
+        self.state_store.execute("DELETE FROM reindex_documents WHERE run_id = ?", (self.run_id,))
+
+
+class ReindexCheckpointStore:
+    """Creates and resumes reindex runs (only the latest run is kept)"""
+
+    def __init__(self, state_store: Optional[StateStore] = None):
+        self.state_store = state_store or StateStore()
+        self.state_store.create_schema(_SCHEMA)
+
+    def latest_unfinished(self) -> Optional[str]:
+        """ID of the most recent run that did not finish, if any"""
+        rows = self.state_store.execute(
+            "SELECT run_id FROM reindex_runs WHERE finished_at IS NULL ORDER BY started_at DESC, rowid DESC LIMIT 1"
+        )
+        return rows[0][0] if rows else None
+
+    def open(self, run_id: Optional[str] = None, force: bool = False, restart: bool = False) -> ReindexCheckpoint:
+        """
+        Resume run_id if it is unfinished (keeping its force flag), otherwise start it afresh
+
+        restart=True discards the checkpoint, e.g. when the vector collection was emptied
+        since it was written.
+        """
+        run_id = run_id or uuid.uuid4().hex
+        rows = self.state_store.execute(
+            "SELECT force FROM reindex_runs WHERE run_id = ? AND finished_at IS NULL", (run_id,)
+        )
+        if rows and not restart:
+            logger.info(f"Resuming reindex run {run_id}")
+            return ReindexCheckpoint(self.state_store, run_id, bool(rows[0][0]) or force, resumed=True)
+
+        # One run at a time: older checkpoints describe an index that is about to be rewritten
+        self.state_store.execute("DELETE FROM reindex_documents")
+        self.state_store.execute("DELETE FROM reindex_sources")
+        self.state_store.execute("DELETE FROM reindex_runs")
+        self.state_store.execute("INSERT INTO reindex_runs (run_id, force) VALUES (?, ?)", (run_id, int(force)))
+        return ReindexCheckpoint(self.state_store, run_id, force, resumed=False)
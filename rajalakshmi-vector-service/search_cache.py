@@ -0,0 +1,212 @@
+"""
+Search result cache for Rajalakshmi Vector Service
+Results are keyed by the index version they were read at, so writes invalidate them without a purge
+"""
+
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from config import settings
+from state_store import StateStore
+
+logger = logging.getLogger(__name__)
+
+
+_VERSIONS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS index_versions (
+    content_type TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS search_cache (
+    key TEXT PRIMARY KEY,
+    results TEXT NOT NULL,
+    stored_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_search_cache_stored_at ON search_cache (stored_at);
+"""
+
+# Bumped by every write; unfiltered searches depend on it
+ANY_WRITE = "*"
+# Bumped by writes whose content types are unknown (deletes by document or source),
+# which may affect a search filtered to any content type
+UNSCOPED_WRITE = "?"
+
+# The persistent tier is trimmed to search_cache_persist_size every this many stores
+PERSIST_PRUNE_INTERVAL = 100
+
+
+class IndexVersions:
+    """
+    Per-content-type write counters, shared through the state database
+
+    Writers bump after the write has landed and readers take the version
+    before querying, so a result is never stored under a version newer than
+    the data it was read from. The ingest worker process bumps the same rows
+    the API process reads.
+    """
+
+    def __init__(self, state_store: Optional[StateStore] = None):
+        self.state_store = state_store or StateStore()
+        self.state_store.create_schema(_VERSIONS_SCHEMA)
+
+    def bump(self, content_types: Optional[Iterable[str]] = None):
+        """Record a write to the given content types (None: unknown, may touch any type)"""
+        names = {ANY_WRITE}
+        names.update(content_types if content_types is not None else [UNSCOPED_WRITE])
+        self.state_store.executemany(
+            "INSERT INTO index_versions (content_type, version) VALUES (?, 1) "
+            "ON CONFLICT(content_type) DO UPDATE SET version = version + 1",
+            [(name,) for name in sorted(names)]
+        )
+
+    def current(self, content_types: Optional[List[str]] = None) -> Tuple[int, ...]:
+        """Versions a search depends on: its content types if it filters on them, otherwise any write"""
+        versions = dict(self.state_store.execute("SELECT content_type, version FROM index_versions"))
+        if not content_types:
+            return (versions.get(ANY_WRITE, 0),)
+        return tuple(versions.get(name, 0) for name in [UNSCOPED_WRITE, *content_types])
+
+
+class SearchCache:
+    """
+    LRU of search results bounded by entry count and approximate size,
+    with an optional SQLite tier that survives restarts
+
+    Entries are keyed by normalized query, filters, limit and the index
+    versions the search depends on; entries older than cache_ttl are ignored
+    as a safety net for writes made outside this service.
+    """
+
+    def __init__(self, versions: IndexVersions, max_entries: Optional[int] = None,
+                 max_bytes: Optional[int] = None, persist_path: Optional[str] = None):
+        self.versions = versions
+        self.max_entries = settings.search_cache_size if max_entries is None else max_entries
+        self.max_bytes = settings.search_cache_max_bytes if max_bytes is None else max_bytes
+        self.ttl = settings.cache_ttl
+        self._entries: "OrderedDict[str, Tuple[float, int, List[Dict[str, Any]]]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.counts = {"hits": 0, "persistent_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+        persist_path = persist_path or (settings.search_cache_db_path if settings.search_cache_persist else None)
+        self.persistent: Optional[StateStore] = None
+        if self.enabled and persist_path:
+            self.persistent = StateStore(persist_path)
+            self.persistent.create_schema(_CACHE_SCHEMA)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def key(self, query: str, filters: Optional[Dict[str, Any]], limit: int) -> str:
+        """Cache key for a search at the current index versions"""
+        filters = {
+            name: sorted(value) if isinstance(value, list) else value
+            for name, value in (filters or {}).items() if value is not None
+        }
+        content_type = filters.get("content_type")
+        content_types = content_type if isinstance(content_type, list) else [content_type] if content_type else None
+        raw = json.dumps([
+            " ".join(query.casefold().split()),
+            sorted(filters.items()),
+            limit,
+            self.versions.current(content_types)
+        ], default=str)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """Cached results, or None (results are shared: callers must not modify them)"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] <= self.ttl:
+                self._entries.move_to_end(key)
+                self.counts["hits"] += 1
+                return entry[2]
+
+        if self.persistent is not None:
+            try:
+                rows = self.persistent.execute(
+                    "SELECT results, stored_at FROM search_cache WHERE key = ? AND stored_at >= ?",
+                    (key, now - self.ttl)
+                )
+                if rows:
+                    raw, stored_at = rows[0]
+                    results = json.loads(raw)
+                    self._put_memory(key, results, len(raw), stored_at)
+                    with self._lock:
+                        self.counts["persistent_hits"] += 1
+                    return results
+            except Exception as e:
+                logger.warning(f"Error reading persistent search cache: {str(e)}")
+
+        with self._lock:
+            self.counts["misses"] += 1
+        return None
+
+    def put(self, key: str, results: List[Dict[str, Any]]):
+        """Store results in memory and, when enabled, in the persistent tier"""
+        raw = json.dumps(results, default=str)
+        now = time.time()
+        self._put_memory(key, results, len(raw), now)
+        with self._lock:
+            self.counts["stores"] += 1
+
+        if self.persistent is not None:
+            try:
+                self.persistent.execute(
+                    "INSERT OR REPLACE INTO search_cache (key, results, stored_at) VALUES (?, ?, ?)",
+                    (key, raw, now)
+                )
+                # Entries of superseded index versions are never read again; keep the newest ones
+                if self.counts["stores"] % PERSIST_PRUNE_INTERVAL == 0:
+                    self.persistent.execute(
+                        "DELETE FROM search_cache WHERE stored_at < ? OR key NOT IN "
+                        "(SELECT key FROM search_cache ORDER BY stored_at DESC LIMIT ?)",
+                        (now - self.ttl, settings.search_cache_persist_size)
+                    )
+            except Exception as e:
+                logger.warning(f"Error writing persistent search cache: {str(e)}")
+
+    def _put_memory(self, key: str, results: List[Dict[str, Any]], size: int, stored_at: float):
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (stored_at, size, results)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.counts["evictions"] += 1
+
+    def close(self):
+        """Close the persistent tier"""
+        if self.persistent is not None:
+            self.persistent.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Entries, approximate size and hit ratio since startup"""
+        with self._lock:
+            lookups = self.counts["hits"] + self.counts["persistent_hits"] + self.counts["misses"]
+            hits = self.counts["hits"] + self.counts["persistent_hits"]
+            return {
+                "enabled": self.enabled,
+                "persistent": self.persistent is not None,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hit_ratio": round(hits / lookups, 3) if lookups else None,
+                **self.counts
+            }
@@ -0,0 +1,66 @@
+"""
+Shared services for Rajalakshmi Vector Service
+One client per backend, built when the service starts and closed when it stops
+"""
+
+import time
+import asyncio
+import logging
+from typing import Dict
+
+from state_store import StateStore
+from metadata_store import DocumentMetadataStore
+from content_processor import ContentProcessor
+from vector_db import EmbeddingGenerator, QdrantVectorStore, VectorDatabaseManager
+from manual_processor import ManualContentProcessor, ProcessingOrchestrator
+from job_queue import JobQueue, JobWorkerPool
+from ingest_jobs import job_handlers
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceContainer:
+    """
+    The long-lived objects of one process, wired together once
+
+    Search, webhooks and ingest jobs share one SQLite connection, one Qdrant
+    client, one embedding client and one CMS connection pool, so there is a
+    single metadata cache and a single connection budget per backend.
+    Construction makes no network calls: warm_up() connects to every backend
+    in parallel and aclose() releases them.
+    """
+
+    def __init__(self):
+        self.state_store = StateStore()
+        self.content_processor = ContentProcessor()
+        self.vector_manager = VectorDatabaseManager(QdrantVectorStore(
+            embedding_generator=EmbeddingGenerator(),
+            metadata_store=DocumentMetadataStore(self.state_store)
+        ))
+        self.orchestrator = ProcessingOrchestrator(ManualContentProcessor(
+            vector_manager=self.vector_manager,
+            content_processor=self.content_processor
+        ))
+        self.job_queue = JobQueue(self.state_store)
+        self.worker_pool = JobWorkerPool(self.job_queue, job_handlers(self.orchestrator))
+
+    async def warm_up(self) -> Dict[str, bool]:
+        """Connect to Qdrant, the embedding backend and the CMS in parallel (failures are logged, not raised)"""
+        start = time.monotonic()
+        vector_store = self.vector_manager.vector_store
+        qdrant, embeddings, cms = await asyncio.gather(
+            asyncio.to_thread(vector_store.warm_up),
+            vector_store.embedding_generator.warm_up(),
+            self.orchestrator.processor.cms_client.warm_up()
+        )
+        reachable = {"qdrant": qdrant, "embeddings": embeddings, "cms": cms}
+        logger.info(f"Warm-up finished in {time.monotonic() - start:.2f}s: {reachable}")
+        return reachable
+
+    async def aclose(self):
+        """Close every client (stop the worker pool first)"""
+        await self.orchestrator.aclose()
+        await self.vector_manager.vector_store.embedding_generator.aclose()
+        self.vector_manager.vector_store.close()
+        self.vector_manager.search_cache.close()
+        self.state_store.close()
@@ -0,0 +1,98 @@
+"""
+Source fingerprints for Rajalakshmi Vector Service
+Remembers a hash of every processed CMS document so unchanged sources can be skipped
+"""
+
+import json
+import hashlib
+import logging
+from typing import Any, Dict, Iterable, Optional
+
+from config import settings, TABLE_CHUNKING
+from content_processor import PROCESSOR_VERSION
+from state_store import StateStore
+
+logger = logging.getLogger(__name__)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS source_fingerprints (
+    document_key TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    processor_version TEXT NOT NULL,
+    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+# Keys that change on every save without changing the indexed content
+VOLATILE_KEYS = frozenset({"createdAt", "updatedAt"})
+
+
+def _normalize(value: Any) -> Any:
+    """Drop volatile keys at every depth (related documents carry their own timestamps)"""
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in value.items() if key not in VOLATILE_KEYS}
+    if isinstance(value, list):
+        return [_normalize(item) for item in value]
+    return value
+
+
+def _processor_signature() -> str:
+    """Processor version plus the settings that change how documents are chunked"""
+    return json.dumps([
+        PROCESSOR_VERSION,
+        settings.chunk_size,
+        settings.chunk_overlap,
+        settings.table_window_max_tokens,
+        settings.table_row_mode_max_rows,
+        TABLE_CHUNKING,
+    ], sort_keys=True)
+
+
+def compute_fingerprint(document: Dict[str, Any]) -> str:
+    """SHA-256 over the processor signature and the canonical JSON of the normalized document"""
+    canonical = json.dumps(_normalize(document), sort_keys=True, separators=(",", ":"), default=str)
+    digest = hashlib.sha256(_processor_signature().encode())
+    digest.update(canonical.encode())
+    return digest.hexdigest()
+
+
+class SourceFingerprintStore:
+    """Persistent map of document_key -> fingerprint of the last successfully stored version"""
+
+    def __init__(self, state_store: Optional[StateStore] = None):
+        self.state_store = state_store or StateStore()
+        self.state_store.create_schema(_SCHEMA)
+
+    def get_many(self, document_keys: Iterable[str]) -> Dict[str, str]:
+        """Return stored fingerprints for the given document keys"""
+        keys = list(set(document_keys))
+        if not keys:
+            return {}
+        placeholders = ",".join("?" for _ in keys)
+        rows = self.state_store.execute(
+            f"SELECT document_key, fingerprint FROM source_fingerprints WHERE document_key IN ({placeholders})",
+            keys
+        )
+        return {document_key: fingerprint for document_key, fingerprint in rows}
+
+    def put_many(self, fingerprints: Dict[str, str]):
+        """Record fingerprints of documents that were stored successfully"""
+        if not fingerprints:
+            return
+        self.state_store.executemany(
+            "INSERT OR REPLACE INTO source_fingerprints (document_key, fingerprint, processor_version, updated_at) "
+            "VALUES (?, ?, ?, CURRENT_TIMESTAMP)",
+            [(document_key, fingerprint, PROCESSOR_VERSION) for document_key, fingerprint in fingerprints.items()]
+        )
+
+    def delete_many(self, document_keys: Iterable[str]):
+        """Forget fingerprints of deleted documents"""
+        self.state_store.executemany(
+            "DELETE FROM source_fingerprints WHERE document_key = ?",
+            [(document_key,) for document_key in document_keys]
+        )
+
+    def clear(self):
+        """Forget every fingerprint (e.g. after the vector collection was recreated)"""
+        self.state_store.execute("DELETE FROM source_fingerprints")
@@ -0,0 +1,58 @@
+"""
+Local SQLite state store for Rajalakshmi Vector Service
+Shared by the metadata store and other ingest bookkeeping
+"""
+
+import os
+import sqlite3
+import logging
+import threading
+from typing import Any, Iterable, List, Optional, Sequence
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class StateStore:
+    """Thread-safe wrapper around a single SQLite connection"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or settings.state_db_path
+
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        logger.info(f"Opened state store at {self.db_path}")
+
+    def create_schema(self, ddl: str):
+        """Create tables and indexes (statements must be idempotent)"""
+        with self._lock:
+            self._conn.executescript(ddl)
+
+    def execute(self, sql: str, params: Sequence[Any] = ()) -> List[sqlite3.Row]:
+        """Execute a single statement and return all fetched rows"""
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            return cursor.fetchall()
+
+    def executemany(self, sql: str, rows: Iterable[Sequence[Any]]):
+        """Execute a statement for many parameter rows in one transaction"""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(sql, rows)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def close(self):
+        """Close the underlying connection"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,74 @@
+"""
+Incremental sync state for Rajalakshmi Vector Service
+Per-collection updatedAt watermarks and the document IDs known to be indexed
+"""
+
+import logging
+from typing import Iterable, Optional, Set
+
+from state_store import StateStore
+
+logger = logging.getLogger(__name__)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sync_watermarks (
+    collection TEXT PRIMARY KEY,
+    watermark TEXT NOT NULL,
+    synced_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS synced_documents (
+    collection TEXT NOT NULL,
+    doc_id TEXT NOT NULL,
+    PRIMARY KEY (collection, doc_id)
+);
+"""
+
+
+class SyncStateStore:
+    """Watermarks for delta syncs and seen IDs for the deletion reconcile pass"""
+
+    def __init__(self, state_store: Optional[StateStore] = None):
+        self.state_store = state_store or StateStore()
+        self.state_store.create_schema(_SCHEMA)
+
+    def get_watermark(self, collection: str) -> Optional[str]:
+        """Highest updatedAt stored for a collection, or None if it was never synced"""
+        rows = self.state_store.execute(
+            "SELECT watermark FROM sync_watermarks WHERE collection = ?", (collection,)
+        )
+        return rows[0][0] if rows else None
+
+    def advance_watermark(self, collection: str, watermark: str):
+        """Move the watermark forward (never backwards)"""
+        self.state_store.execute(
+            "INSERT INTO sync_watermarks (collection, watermark) VALUES (?, ?) "
+            "ON CONFLICT(collection) DO UPDATE SET watermark = MAX(watermark, excluded.watermark), "
+            "synced_at = CURRENT_TIMESTAMP",
+            (collection, watermark)
+        )
+
+    def clear_watermarks(self):
+        """Forget all watermarks so the next sync fetches every collection in full"""
+        self.state_store.execute("DELETE FROM sync_watermarks")
+
+    def add_documents(self, collection: str, doc_ids: Iterable[str]):
+        """Remember IDs that are now indexed"""
+        self.state_store.executemany(
+            "INSERT OR IGNORE INTO synced_documents (collection, doc_id) VALUES (?, ?)",
+            [(collection, str(doc_id)) for doc_id in doc_ids]
+        )
+
+    def get_documents(self, collection: str) -> Set[str]:
+        """All IDs recorded for a collection"""
+        rows = self.state_store.execute(
+            "SELECT doc_id FROM synced_documents WHERE collection = ?", (collection,)
+        )
+        return {doc_id for (doc_id,) in rows}
+
+    def remove_documents(self, collection: str, doc_ids: Iterable[str]):
+        """Forget IDs whose documents were deleted"""
+        self.state_store.executemany(
+            "DELETE FROM synced_documents WHERE collection = ? AND doc_id = ?",
+            [(collection, str(doc_id)) for doc_id in doc_ids]
+        )
@@ -0,0 +1,127 @@
+"""
+Test script for streaming chunk generation
+Checks that consuming chunks in batches keeps peak memory far below materialising them,
+and that an error part-way through a document reaches the consumer
+"""
+import sys
+import itertools
+import tracemalloc
+
+from content_processor import ContentProcessor
+
+# Department sections processed per run, each with a large faculty table
+DOCUMENTS = 200
+TABLE_ROWS = 300
+BATCH_SIZE = 100
+
+# Streaming peak must stay below this fraction of the materialised peak (about 1/25 when measured)
+MAX_PEAK_RATIO = 0.2
+
+def department_section(doc_id: int) -> dict:
+    """A department-sections document shaped like the CMS sends it"""
+    return {
+        "id": f"section-{doc_id}",
+        "title": "Faculty",
+        "department": {"name": "CSE"},
+        "updatedAt": "2024-01-01T00:00:00Z",
+        "dynamicSections": [
+            {"contentType": "table", "title": "Faculty List", "tableConfig": {
+                "headers": ["Name", "Designation", "Qualification", "Email"],
+                "rows": [[f"Dr. Person {i}", "Professor", "PhD", f"person{i}@rajalakshmi.edu.in"] for i in range(TABLE_ROWS)]
+            }},
+            {"contentType": "dynamicTable", "title": "Curriculum", "dynamicTableConfig": {
+                "columns": [{"label": "Code"}, {"label": "Subject"}, {"label": "Credits"}],
+                "rows": [{"rowData": [f"CS{i:03}", f"Subject {i}", "3"]} for i in range(60)]
+            }}
+        ]
+    }
+
+def iter_chunks(processor: ContentProcessor, documents: list):
+    for doc in documents:
+        yield from processor.iter_webhook_payload({"collection": "department-sections", "operation": "create", "data": doc})
+
+def peak_memory(consume) -> int:
+    """Peak traced allocation (bytes) while running consume()"""
+    tracemalloc.start()
+    try:
+        consume()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def test_streaming_peak_memory() -> bool:
+    """Test that batched consumption holds one batch of chunks, not the whole stream"""
+    try:
+        print("Measuring peak memory of chunk generation...")
+        processor = ContentProcessor()
+        documents = [department_section(i) for i in range(DOCUMENTS)]
+        counts = {}
+
+        def materialise():
+            counts["materialised"] = len(list(iter_chunks(processor, documents)))
+
+        def stream():
+            chunk_iter = iter_chunks(processor, documents)
+            total = 0
+            while True:
+                batch = list(itertools.islice(chunk_iter, BATCH_SIZE))
+                if not batch:
+                    break
+                total += len(batch)
+            counts["streamed"] = total
+
+        materialised_peak = peak_memory(materialise)
+        streamed_peak = peak_memory(stream)
+
+        if counts["streamed"] != counts["materialised"]:
+            print(f"❌ Streaming produced {counts['streamed']} chunks, materialising {counts['materialised']}")
+            return False
+        print(f"✅ {counts['streamed']} chunks from {DOCUMENTS} documents")
+
+        ratio = streamed_peak / materialised_peak
+        print(f"   materialised peak {materialised_peak / 1e6:.1f} MB, streamed peak {streamed_peak / 1e6:.1f} MB")
+        if ratio > MAX_PEAK_RATIO:
+            print(f"❌ Streaming peak is {ratio:.0%} of the materialised peak (limit {MAX_PEAK_RATIO:.0%})")
+            return False
+        print(f"✅ Streaming peak is {ratio:.1%} of the materialised peak")
+        return True
+
+    except Exception as e:
+        print(f"❌ Streaming peak memory test failed: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+class FailingProcessor(ContentProcessor):
+    """Fails on the second dynamic section, after the first one has yielded chunks"""
+
+    def _process_dynamic_table_section(self, *args, **kwargs):
+        raise RuntimeError("malformed dynamic table")
+        yield
+
+def test_errors_propagate() -> bool:
+    """Test that a document failing part-way raises instead of ending the stream early"""
+    try:
+        print("\nTesting error propagation...")
+        chunks = []
+        try:
+            for chunk in iter_chunks(FailingProcessor(), [department_section(0)]):
+                chunks.append(chunk)
+        except RuntimeError:
+            print(f"✅ Error reached the consumer after {len(chunks)} chunks")
+            return True
+
+        print(f"❌ Stream ended after {len(chunks)} chunks without raising")
+        return False
+
+    except Exception as e:
+        print(f"❌ Error propagation test failed: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    success = test_streaming_peak_memory() and test_errors_propagate()
+    if success:
+        print(f"\n🎉 Chunk streaming tests completed successfully!")
+    sys.exit(0 if success else 1)
@@ -0,0 +1,91 @@
+"""
+Test script for upgrading points stored before document keys existed
+Runs against an in-memory Qdrant, so no server or embedding backend is needed
+"""
+import os
+import sys
+import uuid
+import asyncio
+import tempfile
+
+os.environ.setdefault("STATE_DB_PATH", os.path.join(tempfile.mkdtemp(), "state.db"))
+
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import PointStruct
+
+from config import settings
+from vector_db import QdrantVectorStore
+
+def point(source_type: str, content_type: str, source_id: str, document_key: str = None) -> PointStruct:
+    """A point shaped like the baseline stored it, plus a document key when given"""
+    payload = {
+        "content": f"{content_type} {source_id}",
+        "metadata": {"content_type": content_type},
+        "source_id": source_id,
+        "source_type": source_type,
+        "content_type": content_type,
+        "chunk_index": 0,
+        "total_chunks": 1
+    }
+    if document_key:
+        payload["document_key"] = document_key
+    return PointStruct(id=str(uuid.uuid4()), vector=[1.0] * settings.openai_embedding_dimension, payload=payload)
+
+async def check_legacy_points() -> bool:
+    """Drop unkeyed points of rewritten sources and check everything else is kept"""
+    try:
+        print("Setting up an in-memory collection with baseline points...")
+        store = QdrantVectorStore()
+        store.client = QdrantClient(":memory:")
+        store._retry_ensure_collection()
+
+        store.client.upsert(collection_name=store.collection_name, points=[
+            # Stored before document keys existed
+            point("collection", "announcements", "a1"),
+            point("collection", "announcements", "a2"),
+            point("collection", "department-sections", "table-1-rows-0-15"),
+            point("global", "about", "about"),
+            # The same announcements rewritten by a keyed reindex
+            point("collection", "announcements", "a1", "collection:announcements:a1"),
+            point("collection", "announcements", "a2", "collection:announcements:a2")
+        ])
+        keys, unkeyed = await store.scan_document_keys()
+        print(f"✅ {len(keys)} keyed documents, {unkeyed} unkeyed points")
+
+        deleted = await store.delete_unkeyed_chunks("collection", "announcements")
+        if deleted != 2:
+            print(f"❌ Deleted {deleted} unkeyed announcements, expected 2")
+            return False
+        print(f"✅ Deleted {deleted} unkeyed announcements")
+
+        keys, unkeyed = await store.scan_document_keys()
+        if keys != {"collection:announcements:a1", "collection:announcements:a2"} or unkeyed != 2:
+            print(f"❌ Left {sorted(keys)} and {unkeyed} unkeyed points, expected both announcements and 2 unkeyed")
+            return False
+        print("✅ Keyed announcements and other sources' unkeyed points kept")
+
+        deleted = await store.delete_unkeyed_chunks("global", "about")
+        if deleted != 1:
+            print(f"❌ Deleted {deleted} unkeyed points of the about global, expected 1")
+            return False
+        if await store.delete_unkeyed_chunks("global", "about") != 0:
+            print("❌ Second pass deleted points again")
+            return False
+        print("✅ Global upgraded once, second pass is a no-op")
+
+        print(f"\n🎉 Legacy point upgrade test completed successfully!")
+        return True
+
+    except Exception as e:
+        print(f"❌ Legacy point upgrade test failed: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+def test_legacy_points() -> bool:
+    """Test that unkeyed points of a rewritten source are dropped and everything else is kept"""
+    return asyncio.run(check_legacy_points())
+
+if __name__ == "__main__":
+    success = test_legacy_points()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,68 @@
+"""
+Test script to guard the vector service cold start
+Imports the app in a fresh interpreter with -X importtime and checks it stays within budget
+"""
+import os
+import sys
+import subprocess
+
+# Budget for `import webhook_listener` (cumulative import time, ms); about 2.7s when measured,
+# mostly fastapi, qdrant_client and openai
+IMPORT_BUDGET_MS = 4000
+
+# HTML parsing is loaded on first use and local models only with requirements-local-models.txt,
+# never while importing the app
+LAZY_MODULES = ["bs4", "html2text", "torch", "sentence_transformers", "nltk"]
+
+def import_times() -> dict:
+    """Cumulative import time (microseconds) per module for `import webhook_listener` in a fresh interpreter"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import webhook_listener"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing webhook_listener failed:\n{result.stderr}")
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+def test_startup_budget() -> bool:
+    """Test that importing the app stays within budget and leaves heavy clients unloaded"""
+    try:
+        print("Measuring import time of webhook_listener...")
+        times = import_times()
+
+        total_ms = times["webhook_listener"] / 1000
+        if total_ms > IMPORT_BUDGET_MS:
+            print(f"❌ import webhook_listener took {total_ms:.0f} ms (budget {IMPORT_BUDGET_MS} ms)")
+            slowest = sorted(times.items(), key=lambda item: item[1], reverse=True)[1:6]
+            for name, cumulative in slowest:
+                print(f"   {cumulative / 1000:7.0f} ms  {name}")
+            return False
+        print(f"✅ import webhook_listener took {total_ms:.0f} ms (budget {IMPORT_BUDGET_MS} ms)")
+
+        loaded = [module for module in LAZY_MODULES if module in times]
+        if loaded:
+            print(f"❌ Imported at startup instead of on first use: {', '.join(loaded)}")
+            return False
+        print(f"✅ Not imported at startup: {', '.join(LAZY_MODULES)}")
+
+        print(f"\n🎉 Startup budget test completed successfully!")
+        return True
+
+    except Exception as e:
+        print(f"❌ Startup budget test failed: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    success = test_startup_budget()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,136 @@
+"""
+Test script for table row windows
+Ingests large department tables once with one chunk per row and once with row windows,
+and compares stored points and end-to-end ingest time
+Runs against an in-memory Qdrant and an embedding backend with a fixed simulated round trip
+"""
+import os
+import sys
+import time
+import asyncio
+import tempfile
+from types import SimpleNamespace
+
+os.environ.setdefault("STATE_DB_PATH", os.path.join(tempfile.mkdtemp(), "state.db"))
+
+from qdrant_client import QdrantClient
+
+from config import settings
+from content_processor import ContentProcessor
+from metadata_store import DocumentMetadataStore
+from state_store import StateStore
+from vector_db import QdrantVectorStore, VectorDatabaseManager
+
+# Department sections ingested per run, each with a 300-row faculty table and a 60-row curriculum
+DOCUMENTS = 10
+TABLE_ROWS = 300
+
+# Round trip of one embeddings request to a remote backend (seconds)
+REQUEST_LATENCY = 0.02
+
+# Windowed ingest must take at most this fraction of per-row ingest (about 1/10 when measured)
+MAX_TIME_RATIO = 0.5
+
+class FakeEmbeddings:
+    """Stands in for AsyncOpenAI().embeddings: one constant vector per input after REQUEST_LATENCY"""
+
+    def __init__(self):
+        self.requests = 0
+
+    async def create(self, model: str, input):
+        self.requests += 1
+        await asyncio.sleep(REQUEST_LATENCY)
+        texts = input if isinstance(input, list) else [input]
+        return SimpleNamespace(data=[
+            SimpleNamespace(embedding=[1.0] * settings.openai_embedding_dimension) for _ in texts
+        ])
+
+class RowProcessor(ContentProcessor):
+    """Chunks every table one row per chunk, as before row windows existed"""
+
+    def _use_row_windows(self, table_type: str, row_count: int) -> bool:
+        return False
+
+def department_section(doc_id: int) -> dict:
+    """A department-sections document shaped like the CMS sends it"""
+    return {
+        "id": f"section-{doc_id}",
+        "title": "Faculty",
+        "department": {"name": "CSE"},
+        "updatedAt": "2024-01-01T00:00:00Z",
+        "dynamicSections": [
+            {"contentType": "table", "title": "Faculty List", "tableConfig": {
+                "headers": ["Name", "Designation", "Qualification", "Email"],
+                "rows": [[f"Dr. Person {i}", "Professor", "PhD", f"person{i}@rajalakshmi.edu.in"] for i in range(TABLE_ROWS)]
+            }},
+            {"contentType": "dynamicTable", "title": "Curriculum", "dynamicTableConfig": {
+                "columns": [{"label": "Code"}, {"label": "Subject"}, {"label": "Credits"}],
+                "rows": [{"rowData": [f"CS{i:03}", f"Subject {i}", "3"]} for i in range(60)]
+            }}
+        ]
+    }
+
+async def ingest(processor: ContentProcessor, documents: list) -> dict:
+    """Chunk, embed and store the documents into a fresh collection and state database"""
+    state_store = StateStore(os.path.join(tempfile.mkdtemp(), "state.db"))
+    store = QdrantVectorStore(metadata_store=DocumentMetadataStore(state_store))
+    store.client = QdrantClient(":memory:")
+    embeddings = FakeEmbeddings()
+    store.embedding_generator.client = SimpleNamespace(embeddings=embeddings)
+    manager = VectorDatabaseManager(store)
+    # Row windows predate near-duplicate detection; measure the chunking change on its own
+    manager.near_duplicates.mode = "off"
+
+    def chunks():
+        for doc in documents:
+            yield from processor.iter_webhook_payload({"collection": "department-sections", "operation": "create", "data": doc})
+
+    started = time.perf_counter()
+    total, success = await manager.store_chunk_stream(chunks())
+    elapsed = time.perf_counter() - started
+
+    points = store.client.count(collection_name=store.collection_name).count
+    state_store.close()
+    return {"chunks": total, "success": success, "points": points, "requests": embeddings.requests, "seconds": elapsed}
+
+async def check_ingest_time() -> bool:
+    """Ingest the same tables per row and in windows and compare the two runs"""
+    try:
+        print("Ingesting department tables one chunk per row and in row windows...")
+        documents = [department_section(i) for i in range(DOCUMENTS)]
+        rows = await ingest(RowProcessor(), documents)
+        windows = await ingest(ContentProcessor(), documents)
+
+        if not (rows["success"] and windows["success"]):
+            print("❌ Ingest reported a failed batch")
+            return False
+        for name, run in (("per row", rows), ("windows", windows)):
+            print(f"   {name:8}: {run['points']:5} points, {run['requests']:3} embedding requests, {run['seconds']:.2f}s")
+
+        if windows["points"] >= rows["points"]:
+            print(f"❌ Windows stored {windows['points']} points, per row {rows['points']}")
+            return False
+        print(f"✅ Points {rows['points']} -> {windows['points']}")
+
+        ratio = windows["seconds"] / rows["seconds"]
+        if ratio > MAX_TIME_RATIO:
+            print(f"❌ Windowed ingest took {ratio:.0%} of per-row ingest (limit {MAX_TIME_RATIO:.0%})")
+            return False
+        print(f"✅ Ingest time {rows['seconds']:.2f}s -> {windows['seconds']:.2f}s ({ratio:.1%})")
+
+        print(f"\n🎉 Table window ingest test completed successfully!")
+        return True
+
+    except Exception as e:
+        print(f"❌ Table window ingest test failed: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+def test_table_window_ingest_time() -> bool:
+    """Test that row windows store fewer points and ingest faster than one chunk per row"""
+    return asyncio.run(check_ingest_time())
+
+if __name__ == "__main__":
+    success = test_table_window_ingest_time()
+    sys.exit(0 if success else 1)
@@ -3,45 +3,91 @@ Qdrant Vector Database Handler for Rajalakshmi Engineering College
 Handles vector storage, retrieval, and management
 """
 
+import time
 import logging
 import asyncio
-from typing import List, Dict, Any, Optional, Tuple
+import itertools
+from typing import List, Dict, Any, Iterable, Optional, Set, Tuple
 from qdrant_client import QdrantClient
 from qdrant_client.http import models
 from qdrant_client.http.models import (
     VectorParams, Distance, CollectionStatus, PointStruct, Filter, FieldCondition, 
-    MatchValue, UpdateResult, ScoredPoint
+    MatchValue, MatchAny, UpdateResult, ScoredPoint, PayloadSchemaType
 )
 import openai
-from openai import OpenAI
+from openai import AsyncOpenAI
 import numpy as np
 from tenacity import retry, stop_after_attempt, wait_exponential
 
 from config import settings
 from content_processor import ContentChunk
+from embedding_limiter import get_embedding_limiter, SEARCH, BULK, SUCCESS, ERROR, TIMEOUT, IGNORED
+from job_progress import record
+from metadata_store import DocumentMetadataStore
+from near_duplicates import NearDuplicateIndex
+from search_cache import IndexVersions, SearchCache
 
 logger = logging.getLogger(__name__)
 
+# Payload fields used by filtered deletes; indexed so they don't scan the collection
+INDEXED_PAYLOAD_FIELDS = ("document_key", "source_id", "source_type")
+
 
 class EmbeddingGenerator:
     """Handles embedding generation using OpenAI API (compatible with LM Studio)"""
     
     def __init__(self):
-        self.client = OpenAI(
+        # Retries are left to tenacity so the concurrency limiter sees every failure
+        self.client = AsyncOpenAI(
             api_key=settings.openai_api_key,
-            base_url=settings.openai_base_url
+            base_url=settings.openai_base_url,
+            timeout=settings.embed_timeout,
+            max_retries=0
         )
         self.model = settings.openai_model
         self.dimension = settings.openai_embedding_dimension
+        self.limiter = get_embedding_limiter()
+    
+    async def warm_up(self) -> bool:
+        """Embed a short text once so the first search doesn't pay for connecting (or model loading)"""
+        try:
+            await self.generate_embedding("warm up")
+            return True
+        except Exception as e:
+            logger.warning(f"Embedding backend not reachable on startup: {str(e)}")
+            return False
+    
+    async def aclose(self):
+        """Close the OpenAI client's pooled connections"""
+        await self.client.close()
+    
+    async def _create(self, texts: Any, priority: str):
+        """One embeddings request, admitted and measured by the shared adaptive limiter"""
+        await self.limiter.acquire(priority)
+        started = time.perf_counter()
+        outcome = IGNORED
+        try:
+            response = await self.client.embeddings.create(model=self.model, input=texts)
+            outcome = SUCCESS
+            return response
+        except openai.APITimeoutError:
+            outcome = TIMEOUT
+            raise
+        except openai.APIStatusError as e:
+            # Rejected input is not a sign of overload; rate limits and server errors are
+            outcome = ERROR if e.status_code == 429 or e.status_code >= 500 else IGNORED
+            raise
+        except Exception:
+            outcome = ERROR
+            raise
+        finally:
+            await self.limiter.release(priority, time.perf_counter() - started, outcome)
     
     @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
     async def generate_embedding(self, text: str) -> List[float]:
-        """Generate embedding for a single text"""
+        """Generate embedding for a single text (search priority)"""
         try:
-            response = self.client.embeddings.create(
-                model=self.model,
-                input=text
-            )
+            response = await self._create(text, SEARCH)
             return response.data[0].embedding
         except Exception as e:
             logger.error(f"Error generating embedding: {str(e)}")
@@ -57,10 +103,7 @@ class EmbeddingGenerator:
             
             for i in range(0, len(texts), batch_size):
                 batch = texts[i:i + batch_size]
-                response = self.client.embeddings.create(
-                    model=self.model,
-                    input=batch
-                )
+                response = await self._create(batch, BULK)
                 batch_embeddings = [item.embedding for item in response.data]
                 all_embeddings.extend(batch_embeddings)
             
@@ -73,24 +116,42 @@ class EmbeddingGenerator:
 class QdrantVectorStore:
     """Qdrant vector database operations"""
     
-    def __init__(self):
+    def __init__(self, embedding_generator: Optional[EmbeddingGenerator] = None,
+                 metadata_store: Optional[DocumentMetadataStore] = None,
+                 index_versions: Optional[IndexVersions] = None):
+        # No network calls here: the collection is checked by warm_up() or the first operation
         self.client = QdrantClient(
             url=settings.qdrant_url,
             api_key=settings.qdrant_api_key,
             timeout=settings.qdrant_timeout
         )
         self.collection_name = settings.qdrant_collection_name
-        self.embedding_generator = EmbeddingGenerator()
-        # Try to ensure collection, but don't fail hard if Qdrant not up yet
+        # Set once the collection and its payload indexes are known to exist
+        self._collection_ready = False
+        self.embedding_generator = embedding_generator or EmbeddingGenerator()
+        self.metadata_store = metadata_store or DocumentMetadataStore()
+        # Bumped after every write so cached search results of older versions are not served
+        self.index_versions = index_versions or self.metadata_store.index_versions
+    
+    def warm_up(self) -> bool:
+        """Open the connection and ensure the collection, but don't fail hard if Qdrant is not up yet"""
         try:
             self._ensure_collection_exists()
+            return True
         except Exception as e:
             logger.warning(
                 "Qdrant not reachable on startup (will retry on first DB operation): %s", str(e)
             )
+            return False
+    
+    def close(self):
+        """Close the Qdrant client"""
+        self.client.close()
 
     def _retry_ensure_collection(self):
-        """Retry ensuring collection exists when first operation is executed."""
+        """Ensure the collection exists on the first operation (and again after it was found missing)"""
+        if self._collection_ready:
+            return
         try:
             self._ensure_collection_exists()
         except Exception as e:
@@ -116,11 +177,31 @@ class QdrantVectorStore:
                 logger.info(f"Collection {self.collection_name} created successfully")
             else:
                 logger.info(f"Collection {self.collection_name} already exists")
+            
+            self._ensure_payload_indexes()
+            self._collection_ready = True
                 
         except Exception as e:
             logger.error(f"Error ensuring collection exists: {str(e)}")
             raise
     
+    def _note_failure(self, error: Exception):
+        """Check the collection again before the next operation if a request failed because it is missing"""
+        if getattr(error, "status_code", None) == 404 or "not found" in str(error).lower():
+            self._collection_ready = False
+    
+    def _ensure_payload_indexes(self):
+        """Create keyword indexes for the fields deletes filter on (existing collections included)"""
+        existing = self.client.get_collection(self.collection_name).payload_schema or {}
+        for field in INDEXED_PAYLOAD_FIELDS:
+            if field not in existing:
+                self.client.create_payload_index(
+                    collection_name=self.collection_name,
+                    field_name=field,
+                    field_schema=PayloadSchemaType.KEYWORD
+                )
+                logger.info(f"Created payload index on {field}")
+    
     async def upsert_chunks(self, chunks: List[ContentChunk]) -> bool:
         """Insert or update content chunks in the vector database"""
         try:
@@ -130,25 +211,19 @@ class QdrantVectorStore:
             # Ensure collection available (lazy retry)
             self._retry_ensure_collection()
             
-            # Generate embeddings for all chunks
-            texts = [chunk.content for chunk in chunks]
-            embeddings = await self.embedding_generator.generate_embeddings_batch(texts)
+            # Store shared metadata once per reference instead of in every point
+            self._store_shared_metadata(chunks)
+            
+            # Generate embeddings for all chunks, reusing canonical vectors for aliases
+            vectors = await self._resolve_vectors(chunks)
             
             # Prepare points for Qdrant
             points = []
-            for chunk, embedding in zip(chunks, embeddings):
+            for chunk in chunks:
                 point = PointStruct(
                     id=chunk.chunk_id,
-                    vector=embedding,
-                    payload={
-                        "content": chunk.content,
-                        "metadata": chunk.metadata,
-                        "source_id": chunk.source_id,
-                        "source_type": chunk.source_type,
-                        "content_type": chunk.content_type,
-                        "chunk_index": chunk.chunk_index,
-                        "total_chunks": chunk.total_chunks
-                    }
+                    vector=vectors[chunk.chunk_id],
+                    payload=self._build_payload(chunk)
                 )
                 points.append(point)
             
@@ -156,18 +231,97 @@ class QdrantVectorStore:
             batch_size = settings.batch_size
             for i in range(0, len(points), batch_size):
                 batch = points[i:i + batch_size]
-                result = self.client.upsert(
+                result = await asyncio.to_thread(
+                    self.client.upsert,
                     collection_name=self.collection_name,
                     points=batch
                 )
+                record("points_upserted", len(batch))
                 logger.info(f"Upserted batch {i//batch_size + 1}: {len(batch)} points")
             
             logger.info(f"Successfully upserted {len(chunks)} chunks")
             return True
             
         except Exception as e:
+            self._note_failure(e)
             logger.error(f"Error upserting chunks: {str(e)}")
             return False
+        finally:
+            # Even a failed upsert may have written some batches
+            if chunks:
+                self.index_versions.bump({chunk.content_type for chunk in chunks})
+    
+    async def _resolve_vectors(self, chunks: List[ContentChunk]) -> Dict[str, List[float]]:
+        """Embed chunks, copying the canonical point's vector for near-duplicate aliases"""
+        vectors: Dict[str, List[float]] = {}
+        to_embed = [chunk for chunk in chunks if not chunk.canonical_id]
+        
+        # Aliases of points stored in earlier batches: fetch the canonical vectors
+        batch_ids = {chunk.chunk_id for chunk in to_embed}
+        stored_ids = list({chunk.canonical_id for chunk in chunks if chunk.canonical_id and chunk.canonical_id not in batch_ids})
+        canonical_vectors: Dict[str, List[float]] = {}
+        if stored_ids:
+            points = await asyncio.to_thread(
+                self.client.retrieve,
+                collection_name=self.collection_name,
+                ids=stored_ids,
+                with_payload=False,
+                with_vectors=True
+            )
+            for point in points:
+                canonical_vectors[str(point.id)] = point.vector
+        
+        # Canonical point no longer exists: embed the alias normally
+        for chunk in chunks:
+            if chunk.canonical_id and chunk.canonical_id not in batch_ids and chunk.canonical_id not in canonical_vectors:
+                chunk.canonical_id = None
+                to_embed.append(chunk)
+        
+        if to_embed:
+            embeddings = await self.embedding_generator.generate_embeddings_batch([chunk.content for chunk in to_embed])
+            for chunk, embedding in zip(to_embed, embeddings):
+                vectors[chunk.chunk_id] = embedding
+            record("embeddings", len(to_embed))
+        
+        for chunk in chunks:
+            if chunk.canonical_id:
+                vectors[chunk.chunk_id] = vectors.get(chunk.canonical_id) or canonical_vectors[chunk.canonical_id]
+        
+        return vectors
+    
+    def _build_payload(self, chunk: ContentChunk) -> Dict[str, Any]:
+        """Build the point payload (shared metadata is referenced, not embedded)"""
+        return {
+            "content": chunk.content,
+            "metadata": chunk.metadata,
+            "metadata_ref": chunk.metadata_ref,
+            "document_key": chunk.document_key,
+            "source_id": chunk.source_id,
+            "source_type": chunk.source_type,
+            "content_type": chunk.content_type,
+            "chunk_index": chunk.chunk_index,
+            "total_chunks": chunk.total_chunks,
+            "canonical_id": chunk.canonical_id
+        }
+    
+    def _store_shared_metadata(self, chunks: List[ContentChunk]):
+        """Write each distinct shared metadata dict to the metadata store once"""
+        entries = {}
+        document_keys = {}
+        for chunk in chunks:
+            if chunk.metadata_ref and chunk.shared_metadata is not None and chunk.metadata_ref not in entries:
+                entries[chunk.metadata_ref] = chunk.shared_metadata
+                document_keys[chunk.metadata_ref] = chunk.document_key
+        self.metadata_store.put_many(entries, document_keys)
+    
+    def _hydrate_results(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Merge shared metadata into results (only for the points actually returned)"""
+        refs = [result["metadata_ref"] for result in results if result.get("metadata_ref")]
+        shared = self.metadata_store.get_many(refs) if refs else {}
+        for result in results:
+            metadata_ref = result.pop("metadata_ref", None)
+            result["metadata"] = self.metadata_store.hydrate(metadata_ref, result["metadata"], shared)
+        return results
     
     async def search_similar(self, query: str, filters: Optional[Dict[str, Any]] = None, 
                            limit: int = 10, score_threshold: float = 0.5) -> List[Dict[str, Any]]:
@@ -209,12 +363,16 @@ class QdrantVectorStore:
                 if conditions:
                     filter_conditions = Filter(must=conditions)
             
+            # Aliased near-duplicates share a vector, so over-fetch and collapse them below
+            # (skip mode aliases near-duplicates whose department or category differ)
+            collapse_aliases = settings.near_duplicate_mode in ("skip", "alias")
+            
             # Search with lower score threshold to get more results
             search_result = self.client.search(
                 collection_name=self.collection_name,
                 query_vector=query_embedding,
                 query_filter=filter_conditions,
-                limit=limit,
+                limit=limit * 2 if collapse_aliases else limit,
                 score_threshold=score_threshold,
                 with_payload=True,
                 with_vectors=False
@@ -222,7 +380,15 @@ class QdrantVectorStore:
             
             # Format results
             results = []
+            seen_canonical = set()
             for point in search_result:
+                if collapse_aliases:
+                    canonical = point.payload.get("canonical_id") or str(point.id)
+                    if canonical in seen_canonical:
+                        continue
+                    seen_canonical.add(canonical)
+                    if len(results) >= limit:
+                        break
                 result = {
                     "id": point.id,
                     "score": float(point.score),
@@ -230,14 +396,18 @@ class QdrantVectorStore:
                     "metadata": point.payload.get("metadata", {}),
                     "source_id": point.payload.get("source_id", ""),
                     "source_type": point.payload.get("source_type", ""),
-                    "content_type": point.payload.get("content_type", "")
+                    "content_type": point.payload.get("content_type", ""),
+                    "metadata_ref": point.payload.get("metadata_ref")
                 }
                 results.append(result)
             
+            self._hydrate_results(results)
+            
             logger.info(f"Found {len(results)} similar chunks for query: '{query}'")
             return results
             
         except Exception as e:
+            self._note_failure(e)
             logger.error(f"Error searching similar content: {str(e)}")
             return []
     
@@ -266,10 +436,13 @@ class QdrantVectorStore:
                     "content": point.payload.get("content", ""),
                     "metadata": point.payload.get("metadata", {}),
                     "chunk_index": point.payload.get("chunk_index", 0),
-                    "total_chunks": point.payload.get("total_chunks", 1)
+                    "total_chunks": point.payload.get("total_chunks", 1),
+                    "metadata_ref": point.payload.get("metadata_ref")
                 }
                 results.append(result)
             
+            self._hydrate_results(results)
+            
             # Sort by chunk index
             results.sort(key=lambda x: x["chunk_index"])
             
@@ -277,31 +450,155 @@ class QdrantVectorStore:
             return results
             
         except Exception as e:
+            self._note_failure(e)
             logger.error(f"Error retrieving chunks by source: {str(e)}")
             return []
     
     async def delete_chunks_by_source(self, source_id: str, source_type: str) -> bool:
         """Delete all chunks for a specific source document"""
+        return await self.delete_chunks_by_sources([source_id], source_type)
+    
+    async def delete_chunks_by_sources(self, source_ids: List[str], source_type: str) -> bool:
+        """Delete the chunks of many sources of one type in a single request"""
         try:
+            if not source_ids:
+                return True
             self._retry_ensure_collection()
             filter_conditions = Filter(
                 must=[
-                    FieldCondition(key="source_id", match=MatchValue(value=source_id)),
+                    FieldCondition(key="source_id", match=MatchAny(any=list(source_ids))),
                     FieldCondition(key="source_type", match=MatchValue(value=source_type))
                 ]
             )
             
-            result = self.client.delete(
+            await asyncio.to_thread(
+                self.client.delete,
                 collection_name=self.collection_name,
                 points_selector=models.FilterSelector(filter=filter_conditions)
             )
             
-            logger.info(f"Deleted chunks for source {source_id}")
+            logger.info(f"Deleted chunks for {len(source_ids)} {source_type} sources")
             return True
             
         except Exception as e:
+            self._note_failure(e)
             logger.error(f"Error deleting chunks by source: {str(e)}")
             return False
+        finally:
+            if source_ids:
+                self.index_versions.bump()
+    
+    async def delete_chunks_by_document(self, document_key: str) -> bool:
+        """Delete all chunks produced from a CMS document or global"""
+        return await self.delete_chunks_by_documents([document_key])
+    
+    async def delete_chunks_by_documents(self, document_keys: List[str]) -> bool:
+        """Delete all chunks of many CMS documents or globals in a single request"""
+        try:
+            if not document_keys:
+                return True
+            self._retry_ensure_collection()
+            filter_conditions = Filter(
+                must=[FieldCondition(key="document_key", match=MatchAny(any=list(document_keys)))]
+            )
+            
+            await asyncio.to_thread(
+                self.client.delete,
+                collection_name=self.collection_name,
+                points_selector=models.FilterSelector(filter=filter_conditions)
+            )
+            
+            logger.info(f"Deleted chunks for {len(document_keys)} documents")
+            return True
+            
+        except Exception as e:
+            self._note_failure(e)
+            logger.error(f"Error deleting chunks by document: {str(e)}")
+            return False
+        finally:
+            if document_keys:
+                self.index_versions.bump()
+    
+    async def scan_document_keys(self, page_size: int = 1000) -> Optional[Tuple[Set[str], int]]:
+        """
+        Distinct document keys of every point, scrolled page by page with only
+        the document_key payload field (no vectors)
+        
+        Returns:
+            Tuple of (document keys, points without a document key), or None on error
+        """
+        try:
+            self._retry_ensure_collection()
+            document_keys: Set[str] = set()
+            unkeyed = 0
+            offset = None
+            while True:
+                points, offset = await asyncio.to_thread(
+                    self.client.scroll,
+                    collection_name=self.collection_name,
+                    limit=page_size,
+                    offset=offset,
+                    with_payload=["document_key"],
+                    with_vectors=False
+                )
+                for point in points:
+                    document_key = (point.payload or {}).get("document_key")
+                    if document_key:
+                        document_keys.add(document_key)
+                    else:
+                        unkeyed += 1
+                if offset is None:
+                    break
+            return document_keys, unkeyed
+            
+        except Exception as e:
+            self._note_failure(e)
+            logger.error(f"Error scanning document keys: {str(e)}")
+            return None
+
+    async def delete_unkeyed_chunks(self, source_type: str, content_type: str) -> Optional[int]:
+        """
+        Delete the points of a collection or global that have no document key
+
+        Points stored before document keys were introduced cannot be replaced
+        by document, so they are dropped once every current document of the
+        source has been rewritten with a key.
+
+        Returns:
+            Number of points deleted, or None on error
+        """
+        deleted = 0
+        try:
+            self._retry_ensure_collection()
+            filter_conditions = Filter(
+                must=[
+                    FieldCondition(key="source_type", match=MatchValue(value=source_type)),
+                    FieldCondition(key="content_type", match=MatchValue(value=content_type)),
+                    models.IsEmptyCondition(is_empty=models.PayloadField(key="document_key"))
+                ]
+            )
+            deleted = (await asyncio.to_thread(
+                self.client.count,
+                collection_name=self.collection_name,
+                count_filter=filter_conditions,
+                exact=True
+            )).count
+            if deleted:
+                await asyncio.to_thread(
+                    self.client.delete,
+                    collection_name=self.collection_name,
+                    points_selector=models.FilterSelector(filter=filter_conditions)
+                )
+                logger.info(f"Deleted {deleted} unkeyed chunks of {source_type} {content_type}")
+            return deleted
+
+        except Exception as e:
+            self._note_failure(e)
+            logger.error(f"Error deleting unkeyed chunks: {str(e)}")
+            return None
+        finally:
+            if deleted:
+                self.index_versions.bump([content_type])
     
     async def update_chunk(self, chunk_id: str, chunk: ContentChunk) -> bool:
         """Update a specific chunk"""
@@ -310,19 +607,13 @@ class QdrantVectorStore:
             # Generate embedding
             embedding = await self.embedding_generator.generate_embedding(chunk.content)
             
+            self._store_shared_metadata([chunk])
+            
             # Create point
             point = PointStruct(
                 id=chunk_id,
                 vector=embedding,
-                payload={
-                    "content": chunk.content,
-                    "metadata": chunk.metadata,
-                    "source_id": chunk.source_id,
-                    "source_type": chunk.source_type,
-                    "content_type": chunk.content_type,
-                    "chunk_index": chunk.chunk_index,
-                    "total_chunks": chunk.total_chunks
-                }
+                payload=self._build_payload(chunk)
             )
             
             # Upsert single point
@@ -335,8 +626,11 @@ class QdrantVectorStore:
             return True
             
         except Exception as e:
+            self._note_failure(e)
             logger.error(f"Error updating chunk {chunk_id}: {str(e)}")
             return False
+        finally:
+            self.index_versions.bump({chunk.content_type})
     
     def get_collection_info(self) -> Dict[str, Any]:
         """Get collection information and statistics"""
@@ -403,34 +697,34 @@ class QdrantVectorStore:
                 with_vectors=False
             )
             
+            candidates = []
+            for point in points:
+                candidates.append({
+                    "id": point.id,
+                    "content": point.payload.get("content", "")[:200] + "...",
+                    "metadata": point.payload.get("metadata", {}),
+                    "source_type": point.payload.get("source_type", ""),
+                    "content_type": point.payload.get("content_type", ""),
+                    "metadata_ref": point.payload.get("metadata_ref")
+                })
+            
+            # last_updated lives in the shared metadata, so hydrate before filtering
+            self._hydrate_results(candidates)
+            
             results = []
             from datetime import datetime, timedelta
             cutoff_time = datetime.now() - timedelta(hours=hours)
             
-            for point in points:
+            for result in candidates:
                 try:
-                    last_updated_str = point.payload.get("metadata", {}).get("last_updated", "")
+                    last_updated_str = result["metadata"].get("last_updated", "")
                     if last_updated_str:
                         # Parse the ISO datetime string
                         last_updated = datetime.fromisoformat(last_updated_str.replace('Z', '+00:00'))
                         if last_updated.replace(tzinfo=None) >= cutoff_time:
-                            result = {
-                                "id": point.id,
-                                "content": point.payload.get("content", "")[:200] + "...",
-                                "metadata": point.payload.get("metadata", {}),
-                                "source_type": point.payload.get("source_type", ""),
-                                "content_type": point.payload.get("content_type", "")
-                            }
                             results.append(result)
                 except Exception as date_error:
                     # If date parsing fails, include the item anyway
-                    result = {
-                        "id": point.id,
-                        "content": point.payload.get("content", "")[:200] + "...",
-                        "metadata": point.payload.get("metadata", {}),
-                        "source_type": point.payload.get("source_type", ""),
-                        "content_type": point.payload.get("content_type", "")
-                    }
                     results.append(result)
             
             logger.info(f"Retrieved {len(results)} recent content chunks")
@@ -444,50 +738,132 @@ class QdrantVectorStore:
 class VectorDatabaseManager:
     """Main manager for vector database operations"""
     
-    def __init__(self):
-        self.vector_store = QdrantVectorStore()
+    def __init__(self, vector_store: Optional[QdrantVectorStore] = None):
+        self.vector_store = vector_store or QdrantVectorStore()
+        self.state_store = self.vector_store.metadata_store.state_store
+        self.near_duplicates = NearDuplicateIndex(self.state_store)
+        self.search_cache = SearchCache(self.vector_store.index_versions)
+        # Ingest budget shared by every concurrently processed collection and global
+        self.process_semaphore = asyncio.Semaphore(max(1, settings.ingest_process_concurrency))
+        self.embed_semaphore = asyncio.Semaphore(max(1, settings.ingest_embed_concurrency))
     
-    async def process_and_store_chunks(self, chunks: List[ContentChunk]) -> bool:
-        """Process content chunks and store in vector database"""
-        try:
-            if not chunks:
-                logger.warning("No chunks to process")
-                return True
+    async def _delete_previous_versions(self, chunks: List[ContentChunk]) -> bool:
+        """
+        Remove the stored points of every document the chunks belong to, with one
+        MatchAny request for all document keys (and one per source type for
+        chunks without a document key).
+        
+        Synthetic source IDs (e.g. "table-1-rows-0-15") repeat across documents,
+        so chunks are replaced by document rather than by source.
+        """
+        document_keys = list(dict.fromkeys(chunk.document_key for chunk in chunks if chunk.document_key))
+        legacy_sources: Dict[str, List[str]] = {}
+        for chunk in chunks:
+            if not chunk.document_key:
+                legacy_sources.setdefault(chunk.source_type, []).append(chunk.source_id)
+        
+        if not await self.vector_store.delete_chunks_by_documents(document_keys):
+            return False
+        for source_type, source_ids in legacy_sources.items():
+            if not await self.vector_store.delete_chunks_by_sources(list(dict.fromkeys(source_ids)), source_type):
+                return False
+        
+        if self.near_duplicates.enabled:
+            for document_key in document_keys:
+                self.near_duplicates.clear_document(document_key)
+        return True
+    
+    async def store_chunk_stream(self, chunks: Iterable[ContentChunk],
+                                 batch_size: Optional[int] = None,
+                                 stage_times: Optional[Dict[str, float]] = None) -> Tuple[int, bool]:
+        """
+        Store chunks from an iterator in fixed-size batches so that at most one
+        batch is held in memory. Each document is cleared once, just before its
+        first batch is written, and near-duplicates of already stored chunks
+        are skipped or aliased before embedding.
+        
+        Chunking runs in a worker thread under process_semaphore and
+        embedding/upserting under embed_semaphore, so concurrent streams
+        share one ingest budget without blocking the event loop.
+        
+        Returns:
+            Tuple of (chunks processed, whether every batch was stored)
+        """
+        batch_size = batch_size or settings.batch_size
+        stage_times = stage_times if stage_times is not None else {}
+        cleared_documents = set()
+        chunk_iter = iter(chunks)
+        total = 0
+        success = True
+        
+        def take_batch() -> List[ContentChunk]:
+            return list(itertools.islice(chunk_iter, batch_size))
+        
+        async def flush(batch: List[ContentChunk]):
+            nonlocal success
+            new_documents = [
+                chunk for chunk in batch
+                if (chunk.document_key or f"{chunk.source_type}:{chunk.source_id}") not in cleared_documents
+            ]
+            if new_documents:
+                if not await self._delete_previous_versions(new_documents):
+                    logger.error(f"Failed to clear previous versions, skipping batch of {len(batch)} chunks")
+                    success = False
+                    return
+                cleared_documents.update(
+                    chunk.document_key or f"{chunk.source_type}:{chunk.source_id}" for chunk in new_documents
+                )
             
-            logger.info(f"Processing {len(chunks)} chunks for storage")
+            to_store, pending_signatures = batch, {}
+            if self.near_duplicates.enabled:
+                to_store, pending_signatures = self.near_duplicates.filter_batch(batch)
             
-            # Group chunks by source for potential deletion of old content
-            source_groups = {}
-            for chunk in chunks:
-                key = f"{chunk.source_type}:{chunk.source_id}"
-                if key not in source_groups:
-                    source_groups[key] = []
-                source_groups[key].append(chunk)
-            
-            # Process each source group
-            for source_key, source_chunks in source_groups.items():
-                source_type, source_id = source_key.split(":", 1)
-                
-                # Delete existing chunks for this source (for updates)
-                await self.vector_store.delete_chunks_by_source(source_id, source_type)
+            if to_store:
+                if await self.vector_store.upsert_chunks(to_store):
+                    self.near_duplicates.register(pending_signatures)
+                else:
+                    logger.error(f"Failed to store batch of {len(to_store)} chunks")
+                    success = False
+        
+        try:
+            while True:
+                started = time.perf_counter()
+                async with self.process_semaphore:
+                    batch = await asyncio.to_thread(take_batch)
+                stage_times["process"] = stage_times.get("process", 0.0) + time.perf_counter() - started
+                if not batch:
+                    break
+                total += len(batch)
+                record("chunks_produced", len(batch))
                 
-                # Insert new chunks
-                success = await self.vector_store.upsert_chunks(source_chunks)
-                if not success:
-                    logger.error(f"Failed to store chunks for source {source_id}")
-                    return False
-            
-            logger.info("Successfully processed and stored all chunks")
-            return True
-            
+                started = time.perf_counter()
+                async with self.embed_semaphore:
+                    await flush(batch)
+                stage_times["store"] = stage_times.get("store", 0.0) + time.perf_counter() - started
         except Exception as e:
-            logger.error(f"Error processing and storing chunks: {str(e)}")
-            return False
+            logger.error(f"Error storing chunk stream: {str(e)}")
+            return total, False
+        
+        logger.info(f"Stored {total} chunks from stream")
+        return total, success
     
     async def search_content(self, query: str, filters: Optional[Dict[str, Any]] = None,
                            limit: int = 10) -> List[Dict[str, Any]]:
-        """Search for content with optional filters"""
-        return await self.vector_store.search_similar(query, filters, limit)
+        """Search for content with optional filters (served from the search cache when the index is unchanged)"""
+        if not self.search_cache.enabled:
+            return await self.vector_store.search_similar(query, filters, limit)
+        
+        # Taken before searching, so results are never stored under a version newer than what they saw
+        key = self.search_cache.key(query, filters, limit)
+        cached = self.search_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        results = await self.vector_store.search_similar(query, filters, limit)
+        # Errors also come back as [], so only non-empty results are cached
+        if results:
+            self.search_cache.put(key, results)
+        return results
     
     async def search_similar(self, query: str, filters: Optional[Dict[str, Any]] = None,
                            limit: int = 10) -> List[Dict[str, Any]]:
@@ -502,6 +878,33 @@ class VectorDatabaseManager:
         """Delete all content for a specific source"""
         return await self.vector_store.delete_chunks_by_source(source_id, source_type)
     
+    async def delete_document(self, document_key: str) -> bool:
+        """Delete a document's points, shared metadata and near-duplicate signatures"""
+        return await self.delete_documents([document_key])
+    
+    async def delete_documents(self, document_keys: List[str]) -> bool:
+        """Delete the points of many documents in one request, then their local state"""
+        if not await self.vector_store.delete_chunks_by_documents(document_keys):
+            return False
+        for document_key in document_keys:
+            self.vector_store.metadata_store.delete_document(document_key)
+            self.near_duplicates.clear_document(document_key)
+        return True
+    
+    def is_empty(self) -> bool:
+        """Whether the vector collection holds no points (e.g. it was just recreated)"""
+        try:
+            self.vector_store._retry_ensure_collection()
+            result = self.vector_store.client.count(
+                collection_name=self.vector_store.collection_name,
+                exact=True
+            )
+            return result.count == 0
+        except Exception as e:
+            self.vector_store._note_failure(e)
+            logger.error(f"Error counting points: {str(e)}")
+            return False
+    
     def get_database_stats(self) -> Dict[str, Any]:
         """Get database statistics"""
         return self.vector_store.get_collection_info()
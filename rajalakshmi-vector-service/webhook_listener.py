@@ -1,24 +1,74 @@
 # Enhanced FastAPI Webhook Listener with Content Processing
 # Receives webhooks from Payload CMS, processes content, and stores in vector database
 
-from fastapi import FastAPI, Request, HTTPException, BackgroundTasks
+from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 from typing import Dict, Any, Optional, List
 import logging
 import json
+import zlib
+import base64
+import sys
 import asyncio
+import uuid
 import uvicorn
+from pathlib import Path
 from datetime import datetime
+from dataclasses import dataclass
+from contextlib import asynccontextmanager
 
-from content_processor import ContentProcessor
-from vector_db import VectorDatabaseManager
-from manual_processor import ProcessingOrchestrator
+from config import settings, COLLECTION_MAPPINGS
+from embedding_limiter import get_embedding_limiter
+from job_queue import LANE_REALTIME
+from ingest_jobs import start_scheduled_syncs
+from service_container import ServiceContainer
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Own long-lived clients, job workers and scheduled syncs for the lifetime of the service"""
+    # Built here rather than at import, so importing the app opens no connections
+    services = ServiceContainer()
+    app.state.services = services
+    # Backends are warmed in the background: /health answers while Qdrant or the CMS is still starting
+    warm_up = asyncio.create_task(services.warm_up())
+    app.state.warm_up = warm_up
+    worker_pool = services.worker_pool
+    scheduled = []
+    ingest_process = None
+    if settings.ingest_mode == "inline":
+        # Jobs interrupted by the last shutdown or crash are picked up again here
+        worker_pool.start()
+        scheduled = start_scheduled_syncs(services.job_queue)
+    elif settings.ingest_mode == "subprocess":
+        # Same container, separate interpreter: ingest CPU work can't stall search requests
+        ingest_process = await asyncio.create_subprocess_exec(
+            sys.executable, str(Path(__file__).with_name("ingest_worker.py"))
+        )
+        logger.info(f"Started ingest worker process {ingest_process.pid}")
+    else:
+        logger.info("INGEST_MODE=api: jobs are only queued here, run ingest_worker.py to process them")
+    
+    yield
+    
+    for task in [warm_up, *scheduled]:
+        task.cancel()
+    await asyncio.gather(warm_up, *scheduled, return_exceptions=True)
+    await worker_pool.stop()
+    if ingest_process is not None and ingest_process.returncode is None:
+        # The worker releases running jobs back to the queue on SIGTERM
+        ingest_process.terminate()
+        await ingest_process.wait()
+    # Close pooled connections on shutdown
+    await services.aclose()
 
 app = FastAPI(
     title="Rajalakshmi Vector Service", 
     description="Content processing and vector storage service for Rajalakshmi Engineering College",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -37,10 +87,13 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Initialize processors
-content_processor = ContentProcessor()
-vector_manager = VectorDatabaseManager()
-manual_processor = ProcessingOrchestrator()
+def get_services() -> ServiceContainer:
+    """
+    Shared clients and processors, built by the lifespan
+    (the worker pool is only started with INGEST_MODE=inline; otherwise it just
+    cancels jobs and reports progress)
+    """
+    return app.state.services
 
 class WebhookPayload(BaseModel):
     collection: Optional[str] = None
@@ -49,34 +102,42 @@ class WebhookPayload(BaseModel):
     timestamp: str
     id: Optional[str] = None
     user: Optional[Dict[str, Any]] = None
+    # Populated document sent inline by the CMS hook (WEBHOOK_INLINE_DOC), plain or gzip+base64
+    doc: Optional[Dict[str, Any]] = None
+    doc_gzip: Optional[str] = Field(None, alias='docGzip')
 
-async def process_webhook_content(payload_data: Dict[str, Any]):
-    """Background task to process webhook content"""
+@dataclass(slots=True)
+class SearchResponse:
+    """
+    /search response body, serialized by orjson as is: results are built from
+    Qdrant payloads and are already JSON types, so FastAPI's jsonable_encoder
+    (several ms for 50 results) is skipped
+    """
+    query: str
+    filters: Dict[str, Any]
+    results_count: int
+    results: List[Dict[str, Any]]
+    timestamp: str
+
+def inline_document(payload: WebhookPayload) -> Optional[Dict[str, Any]]:
+    """Decode the inline document, or None when absent, too large or invalid (the caller then fetches it)"""
     try:
-        logger.info("Starting background processing of webhook content")
-        logger.info(f"Payload data: {payload_data}")
-        
-        # Process content into chunks
-        chunks = content_processor.process_webhook_payload(payload_data)
-        logger.info(f"Generated {len(chunks)} chunks from webhook payload")
-        
-        if chunks:
-            # Store in vector database
-            success = await vector_manager.process_and_store_chunks(chunks)
-            if success:
-                logger.info(f"Successfully processed and stored {len(chunks)} chunks")
-            else:
-                logger.error("Failed to store chunks in vector database")
-        else:
-            logger.warning("No chunks generated from webhook payload")
-            
+        if payload.doc is not None:
+            return payload.doc
+        if payload.doc_gzip:
+            # Bounded decompression so a small body cannot expand without limit
+            decompressor = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+            raw = decompressor.decompress(base64.b64decode(payload.doc_gzip), settings.webhook_inline_max_bytes + 1)
+            if len(raw) > settings.webhook_inline_max_bytes:
+                logger.warning("Inline document exceeds WEBHOOK_INLINE_MAX_BYTES, fetching instead")
+                return None
+            return json.loads(raw)
     except Exception as e:
-        logger.error(f"Error in background processing: {str(e)}")
-        import traceback
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.warning(f"Could not decode inline document, fetching instead: {str(e)}")
+    return None
 
 @app.post("/webhook/payload")
-async def receive_webhook(payload: WebhookPayload, request: Request, background_tasks: BackgroundTasks):
+async def receive_webhook(payload: WebhookPayload, request: Request):
     """
     Receives webhooks from Payload CMS, logs payload data, and triggers processing
     """
@@ -87,7 +148,9 @@ async def receive_webhook(payload: WebhookPayload, request: Request, background_
         # Log the webhook reception
         logger.info("=== WEBHOOK RECEIVED ===")
         
-        # Check if it's a collection or global webhook and trigger processing
+        # Check if it's a collection or global webhook and queue processing
+        services = get_services()
+        job_id = None
         if payload.collection:
             logger.info(f"Type: COLLECTION")
             logger.info(f"Collection: {payload.collection}")
@@ -99,9 +162,25 @@ async def receive_webhook(payload: WebhookPayload, request: Request, background_
                 logger.info(f"User Email: {payload.user.get('email', 'N/A')}")
                 logger.info(f"User Role: {payload.user.get('role', 'N/A')}")
             
-            # Trigger collection processing
-            logger.info(f"Triggering processing for collection: {payload.collection}")
-            background_tasks.add_task(run_selective_processing, [payload.collection], None)
+            # Reindex just the saved document; fall back to the collection when no ID is sent
+            if payload.collection not in COLLECTION_MAPPINGS:
+                logger.info(f"Collection {payload.collection} is not indexed, ignoring")
+            elif payload.id:
+                logger.info(f"Queueing reindex for document: {payload.collection}/{payload.id}")
+                # Repeated saves of one document within the quiet window collapse into one job
+                job_id = services.job_queue.enqueue("document", {
+                    "collection": payload.collection,
+                    "doc_id": payload.id,
+                    "operation": payload.operation,
+                    "doc": inline_document(payload)
+                }, lane=LANE_REALTIME,
+                    dedupe_key=services.content_processor.document_key("collection", payload.collection, payload.id),
+                    delay=settings.webhook_quiet_window)
+            else:
+                logger.info(f"Queueing processing for collection: {payload.collection}")
+                job_id = services.job_queue.enqueue("selective", {"collections": [payload.collection], "globals_list": None},
+                                                    dedupe_key=services.content_processor.document_key("collection", payload.collection),
+                                                    delay=settings.webhook_quiet_window)
             
         elif payload.global_:
             logger.info(f"Type: GLOBAL")
@@ -113,26 +192,32 @@ async def receive_webhook(payload: WebhookPayload, request: Request, background_
                 logger.info(f"User Email: {payload.user.get('email', 'N/A')}")
                 logger.info(f"User Role: {payload.user.get('role', 'N/A')}")
             
-            # Trigger global processing
-            logger.info(f"Triggering processing for global: {payload.global_}")
-            background_tasks.add_task(run_selective_processing, None, [payload.global_])
+            # Queue processing of just this global
+            logger.info(f"Queueing processing for global: {payload.global_}")
+            job_id = services.job_queue.enqueue("global", {
+                "global_name": payload.global_,
+                "data": inline_document(payload)
+            }, lane=LANE_REALTIME,
+                dedupe_key=services.content_processor.document_key("global", payload.global_),
+                delay=settings.webhook_quiet_window)
             
         else:
             logger.warning("Unknown webhook type - neither collection nor global")
         
         logger.info(f"Headers: {headers}")
-        logger.info(f"Full Payload: {payload.model_dump()}")
+        logger.info(f"Full Payload: {payload.model_dump(exclude={'doc', 'doc_gzip'})}")
         
         # Return immediate response
         return {
             "status": "success", 
-            "message": "Webhook received and processing triggered",
+            "message": "Webhook received and processing queued" if job_id else "Webhook received",
             "received_at": payload.timestamp,
             "operation": payload.operation,
             "collection": payload.collection,
             "global": payload.global_,
             "type": "collection" if payload.collection else "global" if payload.global_ else "unknown",
-            "processing": "triggered"
+            "processing": "queued" if job_id else "ignored",
+            "job_id": job_id
         }
         
     except Exception as e:
@@ -142,19 +227,26 @@ async def receive_webhook(payload: WebhookPayload, request: Request, background_
 # New endpoints for manual processing and management
 
 @app.post("/manual/process-all")
-async def manual_process_all(background_tasks: BackgroundTasks):
+async def manual_process_all(force: bool = False, resume: bool = False):
     """
     Manually trigger full processing of all CMS content
+    (documents unchanged since their last ingest are skipped unless force=true;
+    resume=true continues the last unfinished run from its checkpoint)
     """
     try:
         logger.info("Manual full processing triggered")
         
-        # Add background task for processing
-        background_tasks.add_task(run_full_processing)
+        # The run ID travels with the job, so a retried or recovered job resumes its own checkpoint
+        services = get_services()
+        run_id = services.orchestrator.processor.checkpoints.latest_unfinished() if resume else None
+        job_id = services.job_queue.enqueue("full", {"force": force, "run_id": run_id or uuid.uuid4().hex})
         
         return {
-            "status": "started",
-            "message": "Full processing started in background",
+            "status": "queued",
+            "message": "Full processing queued" + (f" (resuming run {run_id})" if run_id else ""),
+            "job_id": job_id,
+            "force": force,
+            "resumed_run": run_id,
             "timestamp": datetime.now().isoformat()
         }
         
@@ -162,29 +254,20 @@ async def manual_process_all(background_tasks: BackgroundTasks):
         logger.error(f"Error starting manual processing: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to start processing: {str(e)}")
 
-async def run_full_processing():
-    """Background task for full processing"""
-    try:
-        logger.info("Starting full manual processing")
-        result = await manual_processor.full_initial_processing()
-        logger.info(f"Full processing completed: {result.get('summary', {})}")
-    except Exception as e:
-        logger.error(f"Error in full processing: {str(e)}")
-
 @app.post("/manual/process-collections")
-async def manual_process_collections(collections: List[str], background_tasks: BackgroundTasks):
+async def manual_process_collections(collections: List[str], force: bool = False):
     """
     Manually process specific collections
     """
     try:
         logger.info(f"Manual processing triggered for collections: {collections}")
         
-        # Add background task for processing
-        background_tasks.add_task(run_selective_processing, collections, None)
+        job_id = get_services().job_queue.enqueue("selective", {"collections": collections, "globals_list": None, "force": force})
         
         return {
-            "status": "started",
-            "message": f"Processing started for collections: {collections}",
+            "status": "queued",
+            "message": f"Processing queued for collections: {collections}",
+            "job_id": job_id,
             "collections": collections,
             "timestamp": datetime.now().isoformat()
         }
@@ -194,19 +277,19 @@ async def manual_process_collections(collections: List[str], background_tasks: B
         raise HTTPException(status_code=500, detail=f"Failed to start processing: {str(e)}")
 
 @app.post("/manual/process-globals")
-async def manual_process_globals(globals_list: List[str], background_tasks: BackgroundTasks):
+async def manual_process_globals(globals_list: List[str], force: bool = False):
     """
     Manually process specific globals
     """
     try:
         logger.info(f"Manual processing triggered for globals: {globals_list}")
         
-        # Add background task for processing
-        background_tasks.add_task(run_selective_processing, None, globals_list)
+        job_id = get_services().job_queue.enqueue("selective", {"collections": None, "globals_list": globals_list, "force": force})
         
         return {
-            "status": "started",
-            "message": f"Processing started for globals: {globals_list}",
+            "status": "queued",
+            "message": f"Processing queued for globals: {globals_list}",
+            "job_id": job_id,
             "globals": globals_list,
             "timestamp": datetime.now().isoformat()
         }
@@ -215,14 +298,139 @@ async def manual_process_globals(globals_list: List[str], background_tasks: Back
         logger.error(f"Error starting globals processing: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to start processing: {str(e)}")
 
-async def run_selective_processing(collections: Optional[List[str]], globals_list: Optional[List[str]]):
-    """Background task for selective processing"""
+@app.post("/manual/sync")
+async def manual_sync(collections: Optional[List[str]] = None):
+    """
+    Incremental sync: fetch only documents updated since the last sync
+    """
     try:
-        logger.info(f"Starting selective processing: collections={collections}, globals={globals_list}")
-        result = await manual_processor.selective_processing(collections, globals_list)
-        logger.info(f"Selective processing completed: {result.get('summary', {})}")
+        logger.info(f"Incremental sync triggered for collections: {collections or 'all'}")
+        
+        job_id = get_services().job_queue.enqueue("delta_sync", {"collections": collections})
+        
+        return {
+            "status": "queued",
+            "message": "Incremental sync queued",
+            "job_id": job_id,
+            "collections": collections,
+            "timestamp": datetime.now().isoformat()
+        }
+        
     except Exception as e:
-        logger.error(f"Error in selective processing: {str(e)}")
+        logger.error(f"Error starting incremental sync: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to start sync: {str(e)}")
+
+@app.post("/manual/reconcile")
+async def manual_reconcile(collections: Optional[List[str]] = None):
+    """
+    Remove vectors of documents that were deleted in the CMS
+    """
+    try:
+        logger.info(f"Reconcile triggered for collections: {collections or 'all'}")
+        
+        job_id = get_services().job_queue.enqueue("reconcile", {"collections": collections})
+        
+        return {
+            "status": "queued",
+            "message": "Reconcile queued",
+            "job_id": job_id,
+            "collections": collections,
+            "timestamp": datetime.now().isoformat()
+        }
+        
+    except Exception as e:
+        logger.error(f"Error starting reconcile: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to start reconcile: {str(e)}")
+
+@app.post("/manual/orphan-gc")
+async def manual_orphan_gc(dry_run: bool = True, max_deletes: Optional[int] = None):
+    """
+    Find vectors whose CMS document or global no longer exists and, with
+    dry_run=false, delete them (the job result is the report)
+    """
+    try:
+        logger.info(f"Orphan cleanup triggered (dry_run={dry_run})")
+        
+        job_id = get_services().job_queue.enqueue(
+            "orphan_gc", {"dry_run": dry_run, "max_deletes": max_deletes}, dedupe_key="orphan_gc"
+        )
+        
+        return {
+            "status": "queued",
+            "message": "Orphan cleanup queued" + (" (dry run)" if dry_run else ""),
+            "job_id": job_id,
+            "dry_run": dry_run,
+            "timestamp": datetime.now().isoformat()
+        }
+        
+    except Exception as e:
+        logger.error(f"Error starting orphan cleanup: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to start orphan cleanup: {str(e)}")
+
+def job_response(job: Dict[str, Any], detail: bool = False) -> Dict[str, Any]:
+    """API view of a job: live progress while it runs, ISO timestamps, inline documents left out"""
+    def timestamp(value: Optional[float]) -> Optional[str]:
+        return datetime.fromtimestamp(value).isoformat() if value else None
+    
+    response = {
+        "job_id": job["job_id"],
+        "kind": job["kind"],
+        "lane": job["lane"],
+        "status": job["status"],
+        "attempts": job["attempts"],
+        "max_attempts": job["max_attempts"],
+        "coalesced_events": job["coalesced"],
+        "error": job["error"],
+        "created_at": timestamp(job["created_at"]),
+        "started_at": timestamp(job["started_at"]),
+        "finished_at": timestamp(job["finished_at"]),
+        "progress": get_services().worker_pool.progress(job["job_id"]) or job["progress"]
+    }
+    if detail:
+        response["params"] = {key: value for key, value in job["params"].items() if key not in ("doc", "data")}
+        response["result"] = job["result"]
+    return response
+
+@app.get("/jobs")
+async def list_jobs(status: Optional[str] = None, limit: int = 50):
+    """
+    Recent ingest jobs, newest first, with per-stage progress
+    """
+    jobs = get_services().job_queue.list_jobs(status, limit)
+    return {
+        "jobs": [job_response(job) for job in jobs],
+        "count": len(jobs),
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    One ingest job with live progress (counts, throughput, ETA, errors) and its result
+    """
+    job = get_services().job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job_response(job, detail=True)
+
+@app.post("/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    """
+    Cancel a queued or running ingest job
+    """
+    services = get_services()
+    job = services.job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    if not services.worker_pool.cancel(job_id):
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is already {job['status']}")
+    
+    logger.info(f"Cancel requested for job {job_id}")
+    return {
+        "status": "cancelling" if job["status"] == "running" else "cancelled",
+        "job_id": job_id,
+        "timestamp": datetime.now().isoformat()
+    }
 
 @app.get("/search")
 async def search_content(
@@ -246,15 +454,15 @@ async def search_content(
             filters["content_type"] = content_type
         
         # Search
-        results = await vector_manager.search_content(query, filters, limit)
+        results = await get_services().vector_manager.search_content(query, filters, limit)
         
-        return {
-            "query": query,
-            "filters": filters,
-            "results_count": len(results),
-            "results": results,
-            "timestamp": datetime.now().isoformat()
-        }
+        return ORJSONResponse(SearchResponse(
+            query=query,
+            filters=filters,
+            results_count=len(results),
+            results=results,
+            timestamp=datetime.now().isoformat()
+        ))
         
     except Exception as e:
         logger.error(f"Error searching content: {str(e)}")
@@ -266,10 +474,14 @@ async def get_database_stats():
     Get database statistics and processing information
     """
     try:
-        stats = vector_manager.get_database_stats()
+        services = get_services()
+        stats = services.vector_manager.get_database_stats()
         
         return {
             "database_stats": stats,
+            "job_queue": services.job_queue.stats(),
+            "embedding_concurrency": get_embedding_limiter().stats(),
+            "search_cache": services.vector_manager.search_cache.stats(),
             "timestamp": datetime.now().isoformat(),
             "service_status": "running"
         }
@@ -284,7 +496,7 @@ async def test_cms_connection():
     Test connection to Payload CMS
     """
     try:
-        processor = manual_processor.processor
+        processor = get_services().orchestrator.processor
         result = await processor.test_cms_connection()
         
         return result
@@ -300,6 +512,18 @@ async def health_check():
     """
     return {"status": "healthy", "service": "webhook-listener"}
 
+@app.get("/ready")
+async def readiness_check():
+    """
+    Readiness check: 503 until the startup warm-up has finished (or when it failed), then which backends it reached
+    """
+    warm_up = app.state.warm_up
+    if not warm_up.done() or warm_up.cancelled():
+        raise HTTPException(status_code=503, detail="Service is warming up")
+    if warm_up.exception() is not None:
+        raise HTTPException(status_code=503, detail=f"Warm-up failed: {str(warm_up.exception())}")
+    return {"status": "ready", "service": "webhook-listener", "backends": warm_up.result()}
+
 @app.get("/")
 async def root():
     """
@@ -310,7 +534,8 @@ async def root():
         "description": "Simple webhook receiver for Payload CMS",
         "endpoints": {
             "webhook": "/webhook/payload",
-            "health": "/health"
+            "health": "/health",
+            "ready": "/ready"
         }
     }
 
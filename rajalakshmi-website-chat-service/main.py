@@ -1,9 +1,12 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 import uvicorn
+import asyncio
 import logging
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Optional
 
 from models.chat_models import ChatRequest, ChatResponse, ConversationSummary
 from models.conversation import ConversationManager, MessageRole
@@ -18,11 +21,35 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+async def warm_up_services() -> Dict[str, bool]:
+    """Connect to the vector service and build the LLM client in parallel"""
+    vector_service, llm = await asyncio.gather(
+        rag_service.warm_up(),
+        asyncio.to_thread(llm_service.warm_up)
+    )
+    return {"vector_service": vector_service, "llm_service": llm}
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm up backend clients in the background and close them on shutdown"""
+    # /health answers while the warm-up runs; /ready waits for it
+    warm_up = asyncio.create_task(warm_up_services())
+    app.state.warm_up = warm_up
+    
+    yield
+    
+    warm_up.cancel()
+    await asyncio.gather(warm_up, return_exceptions=True)
+    await rag_service.aclose()
+    llm_service.close()
+
 # Create FastAPI app
 app = FastAPI(
     title="REC Chatbot API",
     description="Conversational AI interface for Rajalakshmi Engineering College",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -88,7 +115,7 @@ async def chat(request: ChatRequest, background_tasks: BackgroundTasks):
         # Schedule cleanup task
         background_tasks.add_task(conversation_manager.cleanup_expired_conversations)
         
-        return ChatResponse(
+        response = ChatResponse(
             message=response_text,
             conversation_id=conversation_id,
             sources=sources,
@@ -98,6 +125,9 @@ async def chat(request: ChatRequest, background_tasks: BackgroundTasks):
                 "has_context": bool(context.strip())
             }
         )
+        # Serialized by pydantic directly: returning the model would validate it
+        # against response_model again and run it through jsonable_encoder
+        return Response(content=response.model_dump_json(), media_type="application/json")
         
     except Exception as e:
         logger.error(f"Error in chat endpoint: {str(e)}")
@@ -166,6 +196,18 @@ async def health_check():
             "timestamp": datetime.now().isoformat()
         }
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness check: 503 until the startup warm-up has finished"""
+    warm_up = app.state.warm_up
+    if not warm_up.done() or warm_up.cancelled():
+        raise HTTPException(status_code=503, detail="Service is warming up")
+    return {
+        "status": "ready",
+        "services": warm_up.result(),
+        "timestamp": datetime.now().isoformat()
+    }
+
 @app.get("/search")
 async def search_content(
     query: str,
@@ -186,13 +228,14 @@ async def search_content(
         
         results = await rag_service.search_relevant_content(query, filters, limit)
         
-        return {
+        # Results are plain JSON from the vector service: let orjson write them without jsonable_encoder
+        return ORJSONResponse({
             "query": query,
             "filters": filters,
             "results": results,
             "results_count": len(results),
             "timestamp": datetime.now().isoformat()
-        }
+        })
         
     except Exception as e:
         logger.error(f"Error in search endpoint: {str(e)}")
@@ -1,4 +1,3 @@
-from openai import OpenAI
 import logging
 from typing import List, Dict, Any
 from models.chat_models import ChatMessage
@@ -10,12 +9,34 @@ class LLMService:
     """Service for LLM interactions using LM Studio"""
     
     def __init__(self):
-        self.client = OpenAI(
-            api_key=settings.openai_api_key,  # Not required for LM Studio
-            base_url=settings.openai_base_url.replace("/v1", "/v1")  # Ensure proper endpoint
-        )
+        self._client = None
         self.chat_model = getattr(settings, 'chat_model', 'local-model')
     
+    @property
+    def client(self):
+        """OpenAI client, built on first use (importing openai is the slowest part of startup)"""
+        if self._client is None:
+            from openai import OpenAI
+            self._client = OpenAI(
+                api_key=settings.openai_api_key,  # Not required for LM Studio
+                base_url=settings.openai_base_url.replace("/v1", "/v1")  # Ensure proper endpoint
+            )
+        return self._client
+    
+    def warm_up(self) -> bool:
+        """Build the client ahead of the first chat request"""
+        try:
+            self.client
+            return True
+        except Exception as e:
+            logger.error(f"Error creating LLM client: {str(e)}")
+            return False
+    
+    def close(self):
+        """Close the client's pooled connections"""
+        if self._client is not None:
+            self._client.close()
+    
     async def generate_response(
         self,
         user_query: str,
@@ -1,4 +1,5 @@
 import httpx
+import orjson
 import logging
 from typing import List, Dict, Any, Optional
 from config import settings
@@ -12,6 +13,20 @@ class RAGService:
         self.vector_service_url = vector_service_url
         self.client = httpx.AsyncClient(timeout=30.0)
     
+    async def warm_up(self) -> bool:
+        """Open a pooled connection to the vector service ahead of the first chat request"""
+        try:
+            response = await self.client.get(f"{self.vector_service_url}/health")
+            response.raise_for_status()
+            return True
+        except Exception as e:
+            logger.error(f"Error reaching vector service: {str(e)}")
+            return False
+    
+    async def aclose(self):
+        """Close pooled connections"""
+        await self.client.aclose()
+    
     async def search_relevant_content(
         self, 
         query: str, 
@@ -40,7 +55,7 @@ class RAGService:
             )
             response.raise_for_status()
             
-            data = response.json()
+            data = orjson.loads(response.content)
             return data.get("results", [])
             
         except Exception as e:
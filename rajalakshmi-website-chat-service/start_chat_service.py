@@ -21,6 +21,7 @@ def print_startup_info():
     print("- GET  /conversations/{id}      - Get conversation history") 
     print("- DELETE /conversations/{id}    - Delete conversation")
     print("- GET  /health                  - Health check")
+    print("- GET  /ready                   - Readiness check")
     print("- GET  /search                  - Direct search (passthrough)")
     print()
     print("💡 Example Usage:")
@@ -1,4 +1,44 @@
-import { CollectionAfterChangeHook, GlobalAfterChangeHook } from 'payload'
+import { gzipSync } from 'zlib'
+import type { CollectionAfterChangeHook, CollectionSlug, GlobalAfterChangeHook, GlobalSlug } from 'payload'
+
+// Opt-in: send the populated document with the webhook so the vector service
+// does not have to fetch it back from the API
+const INLINE_DOC = process.env.WEBHOOK_INLINE_DOC === 'true'
+const INLINE_GZIP = process.env.WEBHOOK_INLINE_GZIP === 'true'
+const INLINE_MAX_BYTES = parseInt(process.env.WEBHOOK_INLINE_MAX_BYTES || '524288', 10)
+
+// Returns `doc` or `docGzip` (base64) to merge into the webhook body, or nothing
+// when disabled, too large or on error - the receiver then fetches the document itself
+const buildInlineDoc = async (
+  label: string,
+  load: () => Promise<unknown>,
+): Promise<{ doc?: unknown; docGzip?: string }> => {
+  if (!INLINE_DOC) return {}
+
+  try {
+    const populated = await load()
+    const json = JSON.stringify(populated)
+
+    if (INLINE_GZIP) {
+      const compressed = gzipSync(json)
+      if (compressed.length > INLINE_MAX_BYTES) {
+        console.log(`Inline document for ${label} too large (${compressed.length} bytes gzipped), sending ID only`)
+        return {}
+      }
+      return { docGzip: compressed.toString('base64') }
+    }
+
+    const size = Buffer.byteLength(json)
+    if (size > INLINE_MAX_BYTES) {
+      console.log(`Inline document for ${label} too large (${size} bytes), sending ID only`)
+      return {}
+    }
+    return { doc: populated }
+  } catch (error) {
+    console.error(`Could not inline document for ${label}:`, error)
+    return {}
+  }
+}
 
 export const createWebhookHook = (collectionSlug: string): CollectionAfterChangeHook => {
   return async ({ doc, req, operation }) => {
@@ -17,6 +57,9 @@ export const createWebhookHook = (collectionSlug: string): CollectionAfterChange
             email: req.user.email,
             role: req.user.role
           } : null,
+          ...(await buildInlineDoc(`${collectionSlug}/${doc.id}`, () =>
+            req.payload.findByID({ collection: collectionSlug as CollectionSlug, id: doc.id, depth: 2, req }),
+          )),
         }
 
         console.log(`Sending webhook for ${collectionSlug} ${operation}:`, payload.id)
@@ -62,6 +105,9 @@ export const createGlobalWebhookHook = (globalSlug: string): GlobalAfterChangeHo
           email: req.user.email,
           role: req.user.role
         } : null,
+        ...(await buildInlineDoc(globalSlug, () =>
+          req.payload.findGlobal({ slug: globalSlug as GlobalSlug, depth: 2, req }),
+        )),
       }
 
       console.log(`Sending webhook for global ${globalSlug} update`)